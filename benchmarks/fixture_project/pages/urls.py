@@ -0,0 +1,12 @@
+from django.urls import path
+
+from pages import views
+
+# The benchmark rewrites this list with one section per requested route.
+urlpatterns = [
+    path("", views.home, name="home"),
+    path("section-1/", views.section, name="section_1"),
+    path("section-2/", views.section, name="section_2"),
+    path("section-3/", views.section, name="section_3"),
+    path("section-4/", views.section, name="section_4"),
+]
@@ -0,0 +1,23 @@
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+
+
+def home(request):
+    from pages.urls import urlpatterns
+
+    links = "".join(
+        f'<li><a href="/{pattern.pattern}">{pattern.name}</a></li>' for pattern in urlpatterns if str(pattern.pattern)
+    )
+    return HttpResponse(f"<html><head><title>Home</title></head><body><h1>Benchmark fixture</h1><ul>{links}</ul></body></html>")
+
+
+@csrf_exempt
+def section(request):
+    message = f"<p class=\"saved\">Saved {request.POST.get('title', '')}</p>" if request.method == "POST" else ""
+    return HttpResponse(
+        "<html><head><title>Section</title></head><body>"
+        f"<h1>{request.path}</h1>{message}"
+        '<form method="post"><input type="text" name="title" required>'
+        '<button type="submit">Save</button></form>'
+        '<a href="/">Home</a></body></html>'
+    )
@@ -0,0 +1,103 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_MODULES = ["langgraph_app.langgraph_app", "langgraph_app.batch"]
+DEFAULT_TARGET_MS = 2000
+
+TIMING_SNIPPET = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    # Imports must not need credentials.
+    env.pop("OPENAI_API_KEY", None)
+    return env
+
+
+def _created_files(directory):
+    return sorted(os.path.relpath(os.path.join(root, name), directory)
+                  for root, _, files in os.walk(directory) for name in files)
+
+
+def measure_import(module, repeat=5):
+    """
+    Imports `module` in `repeat` fresh interpreters, each in an empty scratch
+    directory without OPENAI_API_KEY.
+
+    Returns:
+        dict: module, median_ms, min_ms, created_files (anything the import
+        wrote to its working directory) and error (stderr of a failed import).
+    """
+    timings, created, error = [], [], None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="fst_import_") as scratch:
+            completed = subprocess.run(
+                [sys.executable, "-c", TIMING_SNIPPET.format(module=module)],
+                cwd=scratch, env=_env(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+            created = created or _created_files(scratch)
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"exit code {completed.returncode}"
+            break
+        timings.append(float(completed.stdout.strip().splitlines()[-1]) * 1000)
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(timings), 1) if timings else None,
+        "min_ms": round(min(timings), 1) if timings else None,
+        "created_files": created,
+        "error": error,
+    }
+
+
+def slowest_imports(module, limit=10):
+    """
+    Returns the `limit` imports with the largest cumulative time under
+    `python -X importtime`, as (cumulative ms, module name).
+    """
+    with tempfile.TemporaryDirectory(prefix="fst_import_") as scratch:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=scratch, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cumulative.isdigit():
+            rows.append((int(cumulative) / 1000, name))
+    return sorted(rows, reverse=True)[:limit]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Check that importing the workflow is fast and has no side effects.")
+    arg_parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import (default: the workflow entry points)")
+    arg_parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS, help=f"Median import time budget per module (default: {DEFAULT_TARGET_MS})")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (default: 5)")
+    arg_parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module (default: 10)")
+    args = arg_parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        result = measure_import(module, args.repeat)
+        if result["error"]:
+            print(f"[✗] {module}: import failed: {result['error']}")
+            failed = True
+            continue
+        within_budget = result["median_ms"] <= args.target_ms
+        print(f"[{'✓' if within_budget else '✗'}] {module}: median {result['median_ms']} ms, min {result['min_ms']} ms (target {args.target_ms:g} ms)")
+        if result["created_files"]:
+            print(f"[✗] {module}: import created files: {', '.join(result['created_files'])}")
+            failed = True
+        if not within_budget:
+            failed = True
+        for cumulative_ms, name in slowest_imports(module, args.top):
+            print(f"      {cumulative_ms:8.1f} ms  {name}")
+
+    sys.exit(1 if failed else 0)
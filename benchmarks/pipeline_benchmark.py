@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixture_project")
+DEFAULT_ROUTE_COUNTS = [5, 50, 500]
+
+URLS_TEMPLATE = '''from django.urls import path
+
+from pages import views
+
+# Generated by the pipeline benchmark: {sections} section route(s).
+urlpatterns = [
+    path("", views.home, name="home"),
+{patterns}]
+'''
+
+
+def _git(*args, cwd=None):
+    subprocess.run(
+        ["git", "-c", "user.name=benchmark", "-c", "user.email=benchmark@localhost", *args],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True
+    )
+
+
+def build_fixture_repo(route_count, work_dir):
+    """
+    Copies the bundled Django fixture with `route_count` routes (home plus
+    sections) into a local bare repository, standing in for GitHub.
+
+    Returns:
+        str: The file:// URL of the bare repository.
+    """
+    source_dir = os.path.join(work_dir, "fixture_src")
+    shutil.copytree(FIXTURE_DIR, source_dir, ignore=shutil.ignore_patterns("__pycache__"))
+    sections = max(route_count - 1, 0)
+    patterns = "".join(
+        f'    path("section-{i}/", views.section, name="section_{i}"),\n' for i in range(1, sections + 1)
+    )
+    with open(os.path.join(source_dir, "pages", "urls.py"), "w") as f:
+        f.write(URLS_TEMPLATE.format(sections=sections, patterns=patterns))
+
+    _git("init", "-q", cwd=source_dir)
+    _git("add", "-A", cwd=source_dir)
+    _git("commit", "-q", "-m", f"Benchmark fixture with {route_count} routes", cwd=source_dir)
+    bare_dir = os.path.join(work_dir, "fixture.git")
+    _git("clone", "-q", "--bare", source_dir, bare_dir)
+    # Let the mirror cache make its usual partial clone from the local repo.
+    _git("config", "uploadpack.allowFilter", "true", cwd=bare_dir)
+    return f"file://{bare_dir}"
+
+
+def run_single(route_count, work_dir):
+    """
+    Runs the full graph once against the fixture with `route_count` routes,
+    using the fake LLM provider and the stub sandbox, and returns its measurements.
+    Call in a fresh process (see `run_benchmark`) so peak RSS is per route count.
+    """
+    # Imported here: config is read at import time, after the parent set the environment.
+    from benchmarks.stub_sandbox import run_stub_sandbox, stop_stub_sandbox
+    from core.artifact_store import release_artifact_store
+    from core.http_fetcher import release_page_fetcher
+    from core.llm_metering import write_run_metrics
+    from core.tracing import write_run_trace
+    from langgraph_app import nodes
+    from langgraph_app.langgraph_app import build_qa_automation_graph, build_initial_state
+
+    repo_url = build_fixture_repo(route_count, work_dir)
+    # Local stand-in where the pipeline starts Docker (the model comes from LLM_PROVIDER=fake).
+    nodes.build_and_run_docker_container = run_stub_sandbox
+
+    app = build_qa_automation_graph()
+    workspace_dir = os.path.join(work_dir, "workspace")
+    initial_state = build_initial_state(
+        repo_url=repo_url,
+        target_dir=os.path.join(work_dir, "repo"),
+        workspace_dir=workspace_dir,
+    )
+
+    start = time.perf_counter()
+    final_state = app.invoke(initial_state)
+    end_to_end = time.perf_counter() - start
+
+    if final_state.get("sandbox_container_id"):
+        stop_stub_sandbox(final_state["sandbox_container_id"])
+    run_id = initial_state["run_id"]
+    outputs_dir = os.path.join(workspace_dir, "outputs")
+    release_page_fetcher(run_id)
+    release_artifact_store(run_id)
+    llm_metrics = write_run_metrics(run_id, outputs_dir)
+    trace_summary = write_run_trace(run_id, outputs_dir)
+
+    routes = final_state.get("extracted_routes") or []
+    test_results = final_state.get("test_results") or {}
+    return {
+        "route_count": route_count,
+        "routes_tested": len(routes),
+        "tests_passed": sum(1 for r in test_results.values() if r.get("exit_code") == 0),
+        "route_errors": len(final_state.get("route_errors") or {}),
+        "reports": len(final_state.get("final_report_paths") or []),
+        "success": bool(final_state.get("report_generation_success")),
+        "end_to_end_s": round(end_to_end, 3),
+        "routes_per_minute": round(len(routes) / end_to_end * 60, 1) if end_to_end else None,
+        "node_seconds": {row["node"]: row["wall_s"] for row in trace_summary["stages"] if row["category"] == "-"},
+        "llm_calls": llm_metrics["totals"]["calls"],
+        # ru_maxrss is in KiB on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _benchmark_env(route_count, work_dir, llm_latency_ms):
+    env = dict(os.environ)
+    cache_dir = os.path.join(work_dir, ".cache")
+    env.update(
+        PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")])),
+        # A cold, private cache, checkpoint store and mirror for every measurement.
+        LLM_CACHE_PATH=os.path.join(cache_dir, "llm_cache.sqlite3"),
+        CHECKPOINT_DB_PATH=os.path.join(cache_dir, "checkpoints.sqlite3"),
+        GIT_MIRROR_DIR=os.path.join(cache_dir, "git_mirrors"),
+        # Let the crawler reach every route, and run tests without a browser pool.
+        CRAWL_MAX_PAGES=str(route_count + 10),
+        TEST_EXECUTION_MODE="subprocess",
+        # Every stage uses the deterministic offline model.
+        LLM_PROVIDER="fake",
+        LLM_STAGE_BACKENDS="",
+        FAKE_LLM_LATENCY_MS=str(int(llm_latency_ms)),
+    )
+    return env
+
+
+def run_benchmark(route_counts, llm_latency_ms, keep=False):
+    """
+    Measures the pipeline at each route count, each in its own subprocess and
+    scratch directory. Returns one result dict per route count.
+    """
+    results = []
+    for route_count in route_counts:
+        work_dir = tempfile.mkdtemp(prefix=f"fst_bench_{route_count}_")
+        result_path = os.path.join(work_dir, "result.json")
+        print(f"Benchmarking {route_count} routes in {work_dir} ...", flush=True)
+        try:
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.pipeline_benchmark", "--single", str(route_count),
+                 "--work-dir", work_dir, "--result-file", result_path],
+                cwd=work_dir, env=_benchmark_env(route_count, work_dir, llm_latency_ms),
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            )
+            if completed.returncode != 0 or not os.path.exists(result_path):
+                tail = "\n".join(completed.stdout.splitlines()[-20:])
+                results.append({"route_count": route_count, "error": f"exit code {completed.returncode}\n{tail}"})
+                continue
+            with open(result_path, "r") as f:
+                results.append(json.load(f))
+        finally:
+            if not keep:
+                shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def format_results(results):
+    nodes = []
+    for result in results:
+        for node in result.get("node_seconds", {}):
+            if node not in nodes:
+                nodes.append(node)
+    header = ["Routes", "Passed", "End-to-end (s)", "Routes/min", "Peak RSS (MB)"] + [f"{n} (s)" for n in nodes]
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    for result in results:
+        if "error" in result:
+            lines.append(f"| {result['route_count']} | failed: {result['error'].splitlines()[0]} |")
+            continue
+        row = [
+            result["route_count"], f"{result['tests_passed']}/{result['routes_tested']}", result["end_to_end_s"],
+            result["routes_per_minute"], result["peak_rss_mb"],
+        ] + [result["node_seconds"].get(n, "-") for n in nodes]
+        lines.append("| " + " | ".join(str(v) for v in row) + " |")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark the QA automation workflow offline against a bundled Django fixture.")
+    arg_parser.add_argument("--routes", type=int, nargs="+", default=DEFAULT_ROUTE_COUNTS, help="Route counts to measure (default: 5 50 500)")
+    arg_parser.add_argument("--llm-latency-ms", type=int, default=200, help="Latency of each fake LLM call (default: 200)")
+    arg_parser.add_argument("--output", help="Also write the results as JSON to this file")
+    arg_parser.add_argument("--keep", action="store_true", help="Keep each measurement's scratch directory")
+    arg_parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    arg_parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    arg_parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.single is not None:
+        measurement = run_single(args.single, args.work_dir)
+        with open(args.result_file, "w") as f:
+            json.dump(measurement, f, indent=4)
+        sys.exit(0)
+
+    benchmark_results = run_benchmark(args.routes, args.llm_latency_ms, keep=args.keep)
+    print(format_results(benchmark_results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"llm_latency_ms": args.llm_latency_ms, "results": benchmark_results}, f, indent=4)
+        print(f"Results saved to: {args.output}")
@@ -0,0 +1,86 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.urlconf_analyzer import extract_static_routes
+from logger import logging
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def render_page(path, routes):
+    """
+    HTML the fixture project's views would return for `path`: the home page
+    links every route, the other pages hold a form.
+    """
+    if path == "/":
+        links = "".join(f'<li><a href="{route}">{name}</a></li>' for name, route in routes if route != "/")
+        return f"<html><head><title>Home</title></head><body><h1>Benchmark fixture</h1><ul>{links}</ul></body></html>"
+    return (
+        "<html><head><title>Section</title></head><body>"
+        f"<h1>{path}</h1>"
+        '<form method="post"><input type="text" name="title" required>'
+        '<button type="submit">Save</button></form>'
+        '<a href="/">Home</a></body></html>'
+    )
+
+
+class _SandboxHandler(BaseHTTPRequestHandler):
+    def _respond(self):
+        path = self.path.split("?", 1)[0]
+        if path not in self.server.pages:
+            self.send_error(404)
+            return
+        body = self.server.pages[path].encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._respond()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_stub_sandbox(target_dir="repo", image_name="fst_sandbox_app", **kwargs):
+    """
+    Stand-in for `build_and_run_docker_container`: serves the pages of the
+    checked-out project's statically extracted routes from an in-process HTTP
+    server on a free port, and returns the same fields as the Docker runner.
+    """
+    start = time.monotonic()
+    routes = extract_static_routes(target_dir)["routes"]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SandboxHandler)
+    server.daemon_threads = True
+    server.pages = {path: render_page(path, routes) for _, path in routes}
+    threading.Thread(target=server.serve_forever, name="stub-sandbox", daemon=True).start()
+
+    container_id = f"stub-{server.server_port}"
+    with _servers_lock:
+        _servers[container_id] = server
+    logging.info(f"Stub sandbox serving {len(routes)} routes at http://localhost:{server.server_port}")
+    return {
+        "image_tag": f"{image_name}:stub",
+        "image_reused": True,
+        "container_id": container_id,
+        "host_port": server.server_port,
+        "base_url": f"http://localhost:{server.server_port}",
+        "time_to_ready": round(time.monotonic() - start, 3),
+        "bootstrap_timings": {},
+    }
+
+
+def stop_stub_sandbox(container_id):
+    with _servers_lock:
+        server = _servers.pop(container_id, None)
+    if server is not None:
+        server.shutdown()
+        server.server_close()
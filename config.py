@@ -0,0 +1,152 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _env_int(name, default):
+    """
+    Read an integer setting from the environment, falling back to `default`
+    when the variable is unset or empty.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def _env_bool(name, default):
+    """
+    Read a boolean setting from the environment ("1", "true", "yes", "on" are truthy).
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# --- Route processing concurrency ---
+# Number of routes whose HTML fetch + LLM test generation may run at the same time.
+LLM_MAX_WORKERS = _env_int("LLM_MAX_WORKERS", 4)
+# Number of generated test scripts that may execute at the same time.
+TEST_MAX_WORKERS = _env_int("TEST_MAX_WORKERS", os.cpu_count() or 2)
+
+# --- Test execution limits ---
+# Wall-clock limit per generated test; the test and its browser are killed past it.
+TEST_TIMEOUT_SECONDS = _env_int("TEST_TIMEOUT_SECONDS", 120)
+# Resident memory limit per test, counting the browser processes it starts. 0 disables it.
+TEST_MEMORY_LIMIT_MB = _env_int("TEST_MEMORY_LIMIT_MB", 2048)
+
+# --- LLM response cache ---
+# SQLite file holding cached chain responses.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "llm_cache.sqlite3"))
+# Upper bound on the total size of cached responses; least recently used entries are evicted past it.
+LLM_CACHE_MAX_BYTES = _env_int("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+# When true, cached responses are ignored and every call goes to the model (fresh results are still stored).
+LLM_CACHE_BYPASS = _env_bool("LLM_CACHE_BYPASS", False)
+
+# --- Sandbox page fetching ---
+# Concurrent page fetches (and pooled keep-alive connections) per run.
+HTTP_FETCH_CONCURRENCY = _env_int("HTTP_FETCH_CONCURRENCY", 8)
+# Per-request timeout when fetching sandbox pages.
+HTTP_FETCH_TIMEOUT_SECONDS = _env_int("HTTP_FETCH_TIMEOUT_SECONDS", 15)
+# Retries (with exponential backoff) on connection errors and 502/503/504.
+HTTP_FETCH_RETRIES = _env_int("HTTP_FETCH_RETRIES", 2)
+
+# --- Route discovery ---
+# "crawl": routes come from a same-origin BFS crawl of the sandbox (seeded with the URLconf routes);
+# "urlconf": the statically analyzed URLconf only, and the spec is written from it instead of the home page;
+# "spec": parsed from the LLM-written spec.
+ROUTE_DISCOVERY = os.getenv("ROUTE_DISCOVERY", "crawl")
+# Link hops followed from the home page, and the cap on pages visited.
+CRAWL_MAX_DEPTH = _env_int("CRAWL_MAX_DEPTH", 3)
+CRAWL_MAX_PAGES = _env_int("CRAWL_MAX_PAGES", 50)
+# Paths the crawler never fetches (regex, searched case-insensitively; empty to follow everything):
+# a GET on them can end the sandbox session or change its data before the tests run.
+CRAWL_DENY_PATTERN = os.getenv("CRAWL_DENY_PATTERN", r"(^|/)admin(/|$)|log-?out|sign-?out|delete|remove|destroy")
+
+# --- Repository checkout ---
+# Bare mirrors of cloned repositories; checkouts are worktrees of these and refresh with `git fetch`.
+GIT_MIRROR_DIR = os.getenv("GIT_MIRROR_DIR", os.path.join(BASE_DIR, ".cache", "git_mirrors"))
+# Partial clone filter used when a mirror is first created; empty for a full clone.
+GIT_CLONE_FILTER = os.getenv("GIT_CLONE_FILTER", "blob:none")
+
+# --- Incremental regeneration ---
+# When true, routes whose page fingerprint, test prompt and script are unchanged since the
+# previous run reuse their test (it is only re-executed) and keep their report.
+INCREMENTAL_REGENERATION = _env_bool("INCREMENTAL_REGENERATION", True)
+
+# --- Generated test validation ---
+# Third-party modules a generated test may import, besides the standard library (comma-separated).
+TEST_ALLOWED_IMPORTS = frozenset(m.strip() for m in os.getenv("TEST_ALLOWED_IMPORTS", "selenium").split(",") if m.strip())
+# Times a script that fails static validation is sent back to the LLM with its errors.
+TEST_MAX_REGENERATIONS = _env_int("TEST_MAX_REGENERATIONS", 2)
+
+# --- Streaming generation ---
+# When true, generated tests are streamed to disk as the model writes them.
+LLM_STREAMING = _env_bool("LLM_STREAMING", True)
+# A streamed generation is cancelled once its output passes this many characters.
+LLM_MAX_OUTPUT_CHARS = _env_int("LLM_MAX_OUTPUT_CHARS", 24000)
+# A streamed test generation is cancelled if this much prose arrives before any code.
+LLM_MAX_PROSE_CHARS = _env_int("LLM_MAX_PROSE_CHARS", 1500)
+
+# --- Report generation ---
+# Reports generated concurrently within the batched report call.
+REPORT_MAX_CONCURRENCY = _env_int("REPORT_MAX_CONCURRENCY", 4)
+# Test output passed to the report prompt is cut to its last this-many characters.
+REPORT_MAX_TEST_OUTPUT_CHARS = _env_int("REPORT_MAX_TEST_OUTPUT_CHARS", 8000)
+# "template": reports are rendered locally from the structured test results; "llm": the model writes each whole report.
+REPORT_MODE = os.getenv("REPORT_MODE", "template")
+# In template mode, have the model write each report's observations paragraph (one batched call).
+REPORT_LLM_OBSERVATIONS = _env_bool("REPORT_LLM_OBSERVATIONS", True)
+# In template mode, also render every report as a standalone HTML page next to its Markdown.
+REPORT_HTML = _env_bool("REPORT_HTML", True)
+
+# --- Run artifacts ---
+# Artifacts larger than this are not kept in memory once on disk; they are read back on demand.
+ARTIFACT_MAX_INLINE_BYTES = _env_int("ARTIFACT_MAX_INLINE_BYTES", 256 * 1024)
+
+# --- Run checkpoints ---
+# SQLite file holding node outputs and per-route results of every run, used by --resume.
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", os.path.join(BASE_DIR, ".cache", "checkpoints.sqlite3"))
+
+# --- LLM backends ---
+# Provider ("openai", or "fake" for the offline stand-in) and model every stage uses by default.
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+# Per-stage overrides as comma-separated "stage=provider:model" pairs for the stages spec,
+# tests and reports, e.g. "reports=openai:gpt-4.1-nano"; either part may be left out.
+LLM_STAGE_BACKENDS = os.getenv("LLM_STAGE_BACKENDS", "")
+# Latency of each call to the "fake" provider.
+FAKE_LLM_LATENCY_MS = _env_int("FAKE_LLM_LATENCY_MS", 200)
+
+# --- Tracing ---
+# Record timed spans for nodes, git, docker, page fetches, LLM calls, test runs and
+# report writes; each run exports them as outputs/trace.json and trace_summary.md.
+TRACING_ENABLED = _env_bool("TRACING_ENABLED", True)
+
+# --- HTML reduction ---
+# How much markup is stripped from pages before they go into LLM prompts: "none", "light" or "structural".
+HTML_REDUCTION_LEVEL = os.getenv("HTML_REDUCTION_LEVEL", "structural")
+
+# --- Test execution mode ---
+# "subprocess": each generated script starts its own Chrome and runs as a separate process.
+# "harness": scripts expose run_test(driver, base_url, screenshots_dir) and run in-process against a pool of warm Chrome sessions.
+TEST_EXECUTION_MODE = os.getenv("TEST_EXECUTION_MODE", "subprocess")
+# Number of warm Chrome sessions kept by the harness-mode driver pool.
+DRIVER_POOL_SIZE = _env_int("DRIVER_POOL_SIZE", TEST_MAX_WORKERS)
+
+# --- Sandbox readiness ---
+# Overall deadline for the sandbox app to start answering HTTP requests.
+SANDBOX_READY_TIMEOUT_SECONDS = _env_int("SANDBOX_READY_TIMEOUT_SECONDS", 90)
+# Path polled to decide the sandbox app is up; any non-5xx response counts.
+SANDBOX_HEALTH_PATH = os.getenv("SANDBOX_HEALTH_PATH", "/")
+# "single": migrations and the server run in one container via an entrypoint script.
+# "separate": makemigrations, migrate and the server each get their own container.
+SANDBOX_BOOTSTRAP_MODE = os.getenv("SANDBOX_BOOTSTRAP_MODE", "single")
+
+# --- Process-wide concurrency caps (shared by all pipelines in a batch) ---
+MAX_CONCURRENT_DOCKER_BUILDS = _env_int("MAX_CONCURRENT_DOCKER_BUILDS", 2)
+MAX_CONCURRENT_LLM_CALLS = _env_int("MAX_CONCURRENT_LLM_CALLS", 8)
+MAX_CONCURRENT_BROWSERS = _env_int("MAX_CONCURRENT_BROWSERS", os.cpu_count() or 2)
+# Number of repositories a batch run works on at the same time.
+BATCH_MAX_PARALLEL_REPOS = _env_int("BATCH_MAX_PARALLEL_REPOS", 3)
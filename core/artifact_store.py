@@ -0,0 +1,207 @@
+import contextvars
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ARTIFACT_MAX_INLINE_BYTES
+from core.tracing import span
+from logger import logging
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    Run-scoped store for what the workflow nodes hand each other: the
+    functional spec, page HTML, test code, test output, screenshots and
+    reports, keyed by (kind, name) and tagged with a sha256 content hash.
+
+    Text put into the store is served from memory; when it has a path it is
+    written to disk in the background (atomically, via a temp file), so nodes
+    never wait on or re-read their own output. Artifacts produced on disk by
+    someone else (test runner output, screenshots) are registered by path and
+    only loaded when asked for. Blobs over `max_inline_bytes` are not kept in
+    memory once persisted; they are read from disk on demand instead.
+    """
+
+    def __init__(self, max_inline_bytes=ARTIFACT_MAX_INLINE_BYTES):
+        self.max_inline_bytes = max_inline_bytes
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-writer")
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = []
+        self._stats = {"writes": 0, "disk_loads": 0, "memory_hits": 0, "write_errors": 0}
+
+    def put(self, kind, name, content, path=None, persist=True, wait=False):
+        """
+        Stores `content` (str). With `path` and `persist`, it is also written
+        there asynchronously; with `persist=False`, `path` only records where
+        the content already lives on disk. With `wait`, returns only once the
+        file is written (raising OSError if it could not be) — for artifacts
+        a later, separately checkpointed node reads back from disk.
+
+        Returns:
+            dict: The artifact's metadata (kind, name, path, sha256, size).
+        """
+        entry = {
+            "kind": kind,
+            "name": name,
+            "path": str(path) if path else None,
+            "sha256": content_hash(content),
+            "size": len(content.encode("utf-8")),
+            "content": content,
+        }
+        with self._lock:
+            self._entries[(kind, name)] = entry
+        if path and persist:
+            # The copied context keeps the write's span under the caller's.
+            future = self._executor.submit(contextvars.copy_context().run, self._write, entry, content)
+            if wait:
+                future.result()
+            else:
+                with self._lock:
+                    self._pending.append(((kind, name), future))
+        elif entry["size"] > self.max_inline_bytes and entry["path"]:
+            entry["content"] = None
+        return self.meta(kind, name)
+
+    def put_file(self, kind, name, path):
+        """
+        Registers a file another process wrote, without reading it now. Its
+        hash is computed in the background.
+        """
+        entry = {"kind": kind, "name": name, "path": str(path), "sha256": None, "size": None, "content": None}
+        with self._lock:
+            self._entries[(kind, name)] = entry
+            self._pending.append(((kind, name), self._executor.submit(self._hash_file, entry)))
+
+    def get(self, kind, name, path=None):
+        """
+        Returns the artifact's text: from memory, or loaded from its file on
+        demand. `path` is where to look when the run has not stored it yet
+        (e.g. outputs of an earlier run being resumed).
+
+        Raises:
+            FileNotFoundError: The artifact is neither in the store nor on disk.
+        """
+        with self._lock:
+            entry = self._entries.get((kind, name))
+            if entry is not None and entry["content"] is not None:
+                self._stats["memory_hits"] += 1
+                return entry["content"]
+        file_path = entry["path"] if entry is not None else path
+        if not file_path:
+            raise FileNotFoundError(f"No {kind} artifact for '{name}'.")
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._stats["disk_loads"] += 1
+            if entry is None:
+                entry = {"kind": kind, "name": name, "path": str(file_path), "sha256": content_hash(content), "size": size, "content": None}
+                self._entries[(kind, name)] = entry
+            if size <= self.max_inline_bytes:
+                entry["content"] = content
+        return content
+
+    def meta(self, kind, name):
+        with self._lock:
+            entry = self._entries.get((kind, name))
+            return {k: v for k, v in entry.items() if k != "content"} if entry else None
+
+    def _write(self, entry, content):
+        path = entry["path"]
+        try:
+            with span(f"persist {entry['kind']}", "io", route=entry["name"]):
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                temp_path = f"{path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+        except OSError as e:
+            with self._lock:
+                self._stats["write_errors"] += 1
+            logging.error(f"Could not persist {entry['kind']} '{entry['name']}' to {path}: {e}")
+            raise
+        with self._lock:
+            self._stats["writes"] += 1
+            if entry["size"] > self.max_inline_bytes and self._entries.get((entry["kind"], entry["name"])) is entry:
+                entry["content"] = None
+
+    def _hash_file(self, entry):
+        try:
+            entry["size"] = os.path.getsize(entry["path"])
+            entry["sha256"] = file_hash(entry["path"])
+        except OSError:
+            pass
+
+    def flush(self):
+        """
+        Waits until every queued write has reached disk.
+
+        Returns:
+            dict: (kind, name) -> OSError for each queued write that failed
+            (already logged), so callers can fail just the affected artifacts.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        errors = {}
+        for key, future in pending:
+            error = future.exception()
+            if error is not None:
+                errors[key] = error
+        return errors
+
+    def stats(self):
+        """
+        Returns artifact counts and bytes per kind, plus write/load counters.
+        """
+        with self._lock:
+            by_kind = {}
+            for entry in self._entries.values():
+                kind = by_kind.setdefault(entry["kind"], {"count": 0, "bytes": 0, "in_memory": 0})
+                kind["count"] += 1
+                kind["bytes"] += entry["size"] or 0
+                kind["in_memory"] += entry["content"] is not None
+            return {**self._stats, "artifacts": by_kind}
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_artifact_store(run_id=None):
+    """
+    Returns the artifact store for a run (one shared store when run_id is None).
+    """
+    with _stores_lock:
+        if run_id not in _stores:
+            _stores[run_id] = ArtifactStore()
+        return _stores[run_id]
+
+
+def release_artifact_store(run_id=None):
+    """
+    Flushes and drops a finished run's store. Returns its final stats, or None.
+    """
+    with _stores_lock:
+        store = _stores.pop(run_id, None)
+    if store is None:
+        return None
+    store.close()
+    return store.stats()
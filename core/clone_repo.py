@@ -1,30 +1,149 @@
+import hashlib
 import os
+import re
 import subprocess
-import shutil
+import threading
+import time
+
+from config import GIT_MIRROR_DIR, GIT_CLONE_FILTER
+from core.tracing import span
 from logger import logging
 
-def clone_repo_from_url(repo_url, target_dir="repo"):
+# One lock per mirror, so concurrent runs of the same repo (e.g. in a batch)
+# never fetch into or add worktrees to the same mirror at once.
+_mirror_locks = {}
+_mirror_locks_guard = threading.Lock()
+
+
+def _git(*args, cwd=None):
+    with span(f"git {args[0]}", "git"):
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True
+        )
+    return result.stdout.strip()
+
+
+def _mirror_lock(mirror_path):
+    with _mirror_locks_guard:
+        return _mirror_locks.setdefault(mirror_path, threading.Lock())
+
+
+def mirror_path_for(repo_url, mirror_dir=GIT_MIRROR_DIR):
     """
-    Clone the GitHub repository from the given URL to the target directory.
-    If the target directory already exists, do nothing.
+    Returns the bare mirror location for a repo URL, e.g.
+    .cache/git_mirrors/Django-Poll-App-1a2b3c4d5e6f.git
     """
-    logging.info("Started cloning the repository from the provided URL...")
+    name = repo_url.rstrip("/").split("/")[-1]
+    if name.endswith(".git"):
+        name = name[:-4]
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", name) or "repo"
+    url_hash = hashlib.sha256(repo_url.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(os.path.abspath(mirror_dir), f"{name}-{url_hash}.git")
+
+
+def ensure_mirror(repo_url, mirror_dir=GIT_MIRROR_DIR, clone_filter=GIT_CLONE_FILTER):
+    """
+    Creates the bare mirror of `repo_url` on first use, or brings an existing
+    one up to date with an incremental `git fetch`. Returns the mirror path.
+
+    With `clone_filter` (e.g. "blob:none") the mirror is a partial clone: all
+    commits and trees are fetched, file contents only when a checkout needs them.
+    """
+    mirror_path = mirror_path_for(repo_url, mirror_dir)
+    if os.path.exists(os.path.join(mirror_path, "HEAD")):
+        logging.info(f"Refreshing mirror cache {mirror_path}...")
+        _git("fetch", "--prune", "--force", "origin", cwd=mirror_path)
+    else:
+        logging.info(f"Creating mirror cache {mirror_path}...")
+        os.makedirs(os.path.dirname(mirror_path), exist_ok=True)
+        filter_args = [f"--filter={clone_filter}"] if clone_filter else []
+        _git("clone", "--mirror", *filter_args, repo_url, mirror_path)
+    return mirror_path
+
+
+def resolve_commit(mirror_path, ref=None):
+    """
+    Resolves `ref` (branch, tag or SHA; the default branch when None) to a commit SHA.
+    """
+    return _git("rev-parse", "--verify", f"{ref or 'HEAD'}^{{commit}}", cwd=mirror_path)
 
-    if os.path.exists(target_dir):
-        logging.info(f"Target directory '{target_dir}' already exists. Skipping clone.")
-        return  
+
+def _is_worktree_of(target_dir, mirror_path):
+    try:
+        common_dir = _git("rev-parse", "--path-format=absolute", "--git-common-dir", cwd=target_dir)
+    except (subprocess.CalledProcessError, OSError):
+        return False
+    return os.path.realpath(common_dir) == os.path.realpath(mirror_path)
+
+
+def _is_git_checkout(target_dir):
+    try:
+        return _git("rev-parse", "--is-inside-work-tree", cwd=target_dir) == "true"
+    except (subprocess.CalledProcessError, OSError):
+        return False
+
+
+def checkout_commit(mirror_path, target_dir, commit_sha):
+    """
+    Puts `target_dir` at `commit_sha`. A new target becomes a detached worktree
+    of the mirror; an existing worktree (or a plain clone from before the
+    mirror cache) is moved to the commit in place instead of being recloned.
+    """
+    if not os.path.exists(target_dir):
+        _git("worktree", "prune", cwd=mirror_path)
+        _git("worktree", "add", "--detach", "--force", os.path.abspath(target_dir), commit_sha, cwd=mirror_path)
+        return
+
+    if _is_worktree_of(target_dir, mirror_path):
+        _git("checkout", "--force", "--detach", commit_sha, cwd=target_dir)
+    elif _is_git_checkout(target_dir):
+        logging.info(f"'{target_dir}' is a standalone clone; updating it in place.")
+        _git("fetch", "origin", cwd=target_dir)
+        _git("checkout", "--force", "--detach", commit_sha, cwd=target_dir)
+    else:
+        raise RuntimeError(f"Target directory '{target_dir}' exists and is not a git checkout.")
+
+
+def clone_repo_from_url(repo_url, target_dir="repo", ref=None, mirror_dir=GIT_MIRROR_DIR, clone_filter=GIT_CLONE_FILTER):
+    """
+    Checks out `repo_url` at `ref` into the target directory via a local bare
+    mirror cache: the mirror is cloned once and refreshed with `git fetch` on
+    later runs, and the target is a worktree of it, so repeat checkouts only
+    transfer new objects.
+
+    Args:
+        repo_url (str): Repository to check out.
+        target_dir (str): Working tree to create or update.
+        ref (str): Branch, tag or commit to pin; defaults to the remote's default branch.
+        mirror_dir (str): Directory holding the bare mirrors.
+        clone_filter (str): Partial clone filter for new mirrors ("" for a full clone).
+
+    Returns:
+        str: The commit SHA the target directory is checked out at.
+    """
+    logging.info("Started cloning the repository from the provided URL...")
+    start = time.monotonic()
 
     try:
-        subprocess.run(["git", "clone", repo_url, target_dir], check=True)
-        logging.info(f"Repository cloned successfully into '{target_dir}'.")
+        mirror_path = mirror_path_for(repo_url, mirror_dir)
+        with _mirror_lock(mirror_path):
+            ensure_mirror(repo_url, mirror_dir, clone_filter)
+            commit_sha = resolve_commit(mirror_path, ref)
+            checkout_commit(mirror_path, target_dir, commit_sha)
     except subprocess.CalledProcessError as e:
-        logging.error(f"Error occurred while cloning the repository: {e}")
+        logging.error(f"Error occurred while cloning the repository: {e}\n{e.stderr}")
         raise
     except Exception as e:
         logging.error(f"An unexpected error occurred: {e}")
         raise
 
-    logging.info("Finished cloning the repository.")
+    logging.info(f"Repository checked out at {commit_sha[:12]} into '{target_dir}' in {time.monotonic() - start:.2f}s.")
+    return commit_sha
 
 
 # if __name__ == "__main__":
@@ -32,4 +151,4 @@ def clone_repo_from_url(repo_url, target_dir="repo"):
 #     try:
 #         clone_repo_from_url(repo_url)
 #     except Exception as e:
-#         print(f"Failed to clone repository: {e}")
\ No newline at end of file
+#         print(f"Failed to clone repository: {e}")
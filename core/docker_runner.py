@@ -1,87 +1,276 @@
 import os
+import re
+import hashlib
 import subprocess
 import socket
 import time
+from contextlib import contextmanager
 from logger import logging
 from utils import clean_requirements_txt
+from core.readiness import wait_for_http_ready, container_logs, SandboxNotReadyError
+from core.limits import docker_build_slot
+from core.tracing import span
+from config import SANDBOX_BOOTSTRAP_MODE
 
-def is_port_in_use(port):
+PYTHON_VERSION = "3.11"
+# Port the app listens on inside the container; the host side is allocated per sandbox.
+CONTAINER_PORT = 8000
+
+# Dependencies are installed in their own layer before the source is copied,
+# so the image only has to be rebuilt when requirements.txt changes. The
+# source is bind-mounted over /app at run time anyway.
+DOCKERFILE_TEMPLATE = """
+FROM python:{python_version}-slim
+
+WORKDIR /app
+
+COPY requirements.txt .
+
+RUN pip install --no-cache-dir -r requirements.txt
+
+COPY . .
+
+EXPOSE {container_port}
+
+CMD ["python", "manage.py", "runserver", "0.0.0.0:{container_port}"]
+"""
+
+# Entrypoint for the "single" bootstrap mode: migrations and the server run in
+# one container (formatted with the container port). Each phase prints a timestamped marker so the host can report
+# per-phase timings, and a failed phase stops the container immediately.
+ENTRYPOINT_SCRIPT = """#!/bin/sh
+phase() {{ echo "[bootstrap] phase=$1 event=$2 ts=$(date +%s.%N)"; }}
+
+phase makemigrations start
+python manage.py makemigrations --noinput || {{ phase makemigrations failed; exit 1; }}
+phase makemigrations end
+
+phase migrate start
+python manage.py migrate --noinput || {{ phase migrate failed; exit 1; }}
+phase migrate end
+
+phase runserver start
+exec python manage.py runserver 0.0.0.0:{container_port}
+"""
+ENTRYPOINT_FILENAME = ".sandbox_entrypoint.sh"
+
+PHASE_MARKER_PATTERN = re.compile(r"\[bootstrap\] phase=(\w+) event=(\w+) ts=([\d.]+)")
+
+
+# Attempts at starting a container when the allocated host port is taken in between.
+PORT_ALLOCATION_ATTEMPTS = 3
+
+
+def allocate_free_port():
     """
-    Check if a given port is in use on localhost.
-    Returns True if in use, False otherwise.
+    Asks the OS for a currently unused TCP port on the host.
     """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
+        s.bind(("", 0))
+        return s.getsockname()[1]
+
 
-def free_port_8000():
+def _start_sandbox_container(abs_target_dir, abs_db_path, image_tag, host_port=None, command=()):
     """
-    Finds and removes any Docker containers using port 8000.
-    This directly resolves port conflicts during docker run.
+    Starts the app container detached, publishing the app port on `host_port`
+    (a free port is allocated when None). If an allocated port gets taken
+    before Docker binds it, another one is tried.
+
+    Returns:
+        tuple: (container_id, host_port)
     """
-    try:
-        result = subprocess.run(
-            ["sudo", "docker", "ps", "--format", "{{.ID}} {{.Ports}}"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True
-        )
-
-        containers = result.stdout.strip().splitlines()
-        removed = False
-
-        for line in containers:
-            if "0.0.0.0:8000" in line or "[::]:8000" in line:
-                container_id = line.split()[0]
-                logging.info(f"Port 8000 in use by container {container_id}. Removing...")
-                subprocess.run(["sudo", "docker", "rm", "-f", container_id], check=True)
-                removed = True
-
-        if removed:
-            logging.info("Freed port 8000 by killing conflicting Docker containers.")
-            time.sleep(2)
-        else:
-            logging.info("No Docker container found using port 8000.")
+    attempts = 1 if host_port else PORT_ALLOCATION_ATTEMPTS
+    for attempt in range(attempts):
+        port = host_port or allocate_free_port()
+        result = subprocess.run([
+            "sudo", "docker", "run", "-d",
+            "-p", f"{port}:{CONTAINER_PORT}",
+            "-v", f"{abs_target_dir}:/app",
+            "-v", f"{abs_db_path}:/app/db.sqlite3",
+            image_tag,
+            *command
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode == 0:
+            logging.info(f"Sandbox container listening on host port {port}.")
+            return result.stdout.strip(), port
+        # A failed port binding can leave the created container behind.
+        if result.stdout.strip():
+            stop_container(result.stdout.strip())
+        if "port is already allocated" in result.stderr and attempt + 1 < attempts:
+            logging.warning(f"Host port {port} was taken before the container started. Retrying with another port...")
+            continue
+        raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+
+
+def stop_container(container_id):
+    """
+    Removes a sandbox container. Failures are logged, not raised, since this
+    runs during cleanup.
+    """
+    result = subprocess.run(
+        ["sudo", "docker", "rm", "-f", container_id],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    if result.returncode == 0:
+        logging.info(f"Removed sandbox container {container_id[:12]}.")
+    else:
+        logging.warning(f"Could not remove container {container_id[:12]}: {result.stderr.strip()}")
 
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error freeing port 8000: {e.stderr}")
+
+@contextmanager
+def _remove_on_failure(container_id):
+    """
+    Removes the container if the block raises, so a sandbox that never became
+    ready (or whose bootstrap failed) does not keep running.
+    """
+    try:
+        yield
+    except BaseException:
+        logging.warning(f"Sandbox container {container_id[:12]} did not come up; removing it.")
+        stop_container(container_id)
         raise
 
 
-def build_and_run_docker_container(target_dir="repo", image_name="fst_sandbox_app"):
+def requirements_image_tag(requirements_path, image_name, python_version=PYTHON_VERSION):
     """
-    Builds a Docker image from the specified directory, performs migrations, and runs the container.
-    Automatically frees port 8000 if it's already in use by another Docker container.
+    Derives an image tag from the (already cleaned) requirements.txt, the Python
+    version and the Dockerfile template, so identical dependency sets map to the
+    same image.
     """
-    logging.info("Preparing to build and run Docker container...")
+    digest = hashlib.sha256()
+    digest.update(python_version.encode("utf-8"))
+    digest.update(DOCKERFILE_TEMPLATE.encode("utf-8"))
+    if os.path.exists(requirements_path):
+        with open(requirements_path, "rb") as f:
+            digest.update(f.read())
+    return f"{image_name}:deps-{digest.hexdigest()[:16]}"
 
-    # Ensure port 8000 is free
-    if is_port_in_use(8000):
-        logging.info("Port 8000 is in use. Attempting to free it...")
-        free_port_8000()
-        time.sleep(3)
-    else:
-        logging.info("Port 8000 is free. Proceeding.")
 
-    # Prepare absolute paths
-    abs_target_dir = os.path.abspath(target_dir)
-    db_path = os.path.join(target_dir, "db.sqlite3")
-    abs_db_path = os.path.abspath(db_path)
+def docker_image_exists(image_tag):
+    """
+    Returns True if an image with the given tag is present locally.
+    """
+    result = subprocess.run(
+        ["sudo", "docker", "image", "inspect", image_tag],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    return result.returncode == 0
 
-    # Dockerfile content for building the image
-    dockerfile_content = """
-    FROM python:3.11-slim
 
-    WORKDIR /app
+def parse_bootstrap_phases(logs):
+    """
+    Extracts per-phase durations and the failed phase (if any) from the
+    entrypoint's `[bootstrap]` markers.
+
+    Returns:
+        tuple: ({phase: seconds}, failed_phase_or_None, {phase: start_ts})
+    """
+    starts, timings, failed = {}, {}, None
+    for phase, event, ts in PHASE_MARKER_PATTERN.findall(logs):
+        ts = float(ts)
+        if event == "start":
+            starts[phase] = ts
+        elif event == "end" and phase in starts:
+            timings[phase] = round(ts - starts[phase], 3)
+        elif event == "failed":
+            failed = phase
+    return timings, failed, starts
+
+
+def _run_single_container_bootstrap(abs_target_dir, abs_db_path, image_tag, host_port=None):
+    """
+    Runs migrations and the server in one container via the bootstrap entrypoint.
+    Returns (container_id, host_port, phase timings).
+    """
+    entrypoint_path = os.path.join(abs_target_dir, ENTRYPOINT_FILENAME)
+    with open(entrypoint_path, "w", newline="\n") as f:
+        f.write(ENTRYPOINT_SCRIPT.format(container_port=CONTAINER_PORT))
+
+    logging.info("Starting sandbox container (migrations + server in one lifecycle)...")
+    started_at = time.time()
+    container_id, host_port = _start_sandbox_container(
+        abs_target_dir, abs_db_path, image_tag, host_port, command=("sh", f"/app/{ENTRYPOINT_FILENAME}")
+    )
+
+    with _remove_on_failure(container_id):
+        try:
+            wait_for_http_ready(f"http://localhost:{host_port}", container_id)
+        except SandboxNotReadyError:
+            logs = container_logs(container_id, tail=500)
+            _, failed_phase, _ = parse_bootstrap_phases(logs)
+            if failed_phase:
+                raise RuntimeError(f"Sandbox bootstrap failed during '{failed_phase}':\n{logs}")
+            raise
+
+        ready_at = time.time()
+        timings, _, starts = parse_bootstrap_phases(container_logs(container_id, tail=500))
+    if "makemigrations" in starts:
+        timings["container_start"] = round(starts["makemigrations"] - started_at, 3)
+    if "runserver" in starts:
+        timings["server_start"] = round(ready_at - starts["runserver"], 3)
+    return container_id, host_port, timings
+
+
+def _run_separate_container_bootstrap(abs_target_dir, abs_db_path, image_tag, host_port=None):
+    """
+    Legacy flow: makemigrations and migrate each in a throwaway container, then
+    the server in a third. Returns (container_id, host_port, phase timings).
+    """
+    timings = {}
+    for command in ("makemigrations", "migrate"):
+        logging.info(f"Running Django {command} inside Docker...")
+        phase_start = time.monotonic()
+        subprocess.run([
+            "sudo", "docker", "run", "--rm",
+            "-v", f"{abs_target_dir}:/app",
+            "-v", f"{abs_db_path}:/app/db.sqlite3",
+            image_tag,
+            "python", "manage.py", command
+        ], check=True)
+        timings[command] = round(time.monotonic() - phase_start, 3)
+
+    logging.info("Running Docker container...")
+    phase_start = time.monotonic()
+    container_id, host_port = _start_sandbox_container(abs_target_dir, abs_db_path, image_tag, host_port)
+
+    with _remove_on_failure(container_id):
+        wait_for_http_ready(f"http://localhost:{host_port}", container_id)
+    timings["server_start"] = round(time.monotonic() - phase_start, 3)
+    return container_id, host_port, timings
 
-    COPY . .
 
-    RUN pip install --no-cache-dir -r requirements.txt
+def build_and_run_docker_container(target_dir="repo", image_name="fst_sandbox_app", bootstrap_mode=SANDBOX_BOOTSTRAP_MODE, host_port=None):
+    """
+    Builds a Docker image from the specified directory, performs migrations, and runs the container.
+    The app is published on `host_port`, or on a freshly allocated free port when None,
+    so several sandboxes can run side by side without touching each other's containers.
+
+    The image is tagged with a hash of the cleaned requirements.txt and Python
+    version; when a matching image already exists the build is skipped.
 
-    EXPOSE 8000
+    Instead of sleeping a fixed time after start, the app's port is polled until
+    it answers (or the container exits, in which case its logs are raised).
 
-    CMD ["python", "manage.py", "runserver", "0.0.0.0:8000"]
+    bootstrap_mode "single" runs makemigrations, migrate and the server inside
+    one container lifecycle; "separate" uses one container per step.
+
+    Returns:
+        dict: {"image_tag": str, "image_reused": bool, "container_id": str,
+               "host_port": int, "base_url": str, "time_to_ready": float,
+               "bootstrap_timings": {phase: seconds}}
     """
+    logging.info("Preparing to build and run Docker container...")
+
+    # Prepare absolute paths
+    abs_target_dir = os.path.abspath(target_dir)
+    db_path = os.path.join(target_dir, "db.sqlite3")
+    abs_db_path = os.path.abspath(db_path)
+
+    # Dockerfile content for building the image
+    dockerfile_content = DOCKERFILE_TEMPLATE.format(python_version=PYTHON_VERSION, container_port=CONTAINER_PORT)
 
     dockerfile_path = os.path.join(target_dir, "Dockerfile")
 
@@ -101,43 +290,38 @@ def build_and_run_docker_container(target_dir="repo", image_name="fst_sandbox_ap
         requirements_path = os.path.join(target_dir, "requirements.txt")
         clean_requirements_txt(requirements_path)
 
-        # Build the Docker image
-        logging.info("Building Docker image...")
-        subprocess.run(["sudo", "docker", "build", "--no-cache", "-t", image_name, target_dir], check=True)
-
-        # Run Django migrations
-        logging.info("Running Django migrations inside Docker...")
-        subprocess.run([
-            "sudo", "docker", "run", "--rm",
-            "-v", f"{abs_target_dir}:/app",
-            "-v", f"{abs_db_path}:/app/db.sqlite3",
-            image_name,
-            "python", "manage.py", "makemigrations"
-        ], check=True)
-
-        subprocess.run([
-            "sudo", "docker", "run", "--rm",
-            "-v", f"{abs_target_dir}:/app",
-            "-v", f"{abs_db_path}:/app/db.sqlite3",
-            image_name,
-            "python", "manage.py", "migrate"
-        ], check=True)
-
-        # Run the actual container
-        logging.info("Running Docker container...")
-        subprocess.run([
-            "sudo", "docker", "run", "-d",
-            "-p", "8000:8000",
-            "-v", f"{abs_target_dir}:/app",
-            "-v", f"{abs_db_path}:/app/db.sqlite3",
-            image_name
-        ], check=True)
-
-        # Optional: give it a moment to start up
-        logging.info("Waiting briefly to let app start...")
-        time.sleep(10)
+        # Build the Docker image, unless one with the same dependencies exists
+        image_tag = requirements_image_tag(requirements_path, image_name)
+        image_reused = docker_image_exists(image_tag)
+        if image_reused:
+            logging.info(f"Reusing existing Docker image {image_tag}; skipping build.")
+        else:
+            with docker_build_slot():
+                logging.info(f"Building Docker image {image_tag}...")
+                with span("docker build", "docker", image=image_tag):
+                    subprocess.run(["sudo", "docker", "build", "-t", image_tag, target_dir], check=True)
+
+        # Run migrations and start the server, then wait until the app actually
+        # answers instead of sleeping a fixed time
+        bootstrap_start = time.monotonic()
+        with span("docker run", "docker", image=image_tag, mode=bootstrap_mode):
+            if bootstrap_mode == "single":
+                container_id, host_port, bootstrap_timings = _run_single_container_bootstrap(abs_target_dir, abs_db_path, image_tag, host_port)
+            else:
+                container_id, host_port, bootstrap_timings = _run_separate_container_bootstrap(abs_target_dir, abs_db_path, image_tag, host_port)
+        time_to_ready = time.monotonic() - bootstrap_start
+        logging.info(f"Sandbox bootstrap timings ({bootstrap_mode}): {bootstrap_timings}")
 
         logging.info("Docker container started successfully.")
+        return {
+            "image_tag": image_tag,
+            "image_reused": image_reused,
+            "container_id": container_id,
+            "host_port": host_port,
+            "base_url": f"http://localhost:{host_port}",
+            "time_to_ready": round(time_to_ready, 3),
+            "bootstrap_timings": bootstrap_timings
+        }
 
     except subprocess.CalledProcessError as e:
         logging.error(f"Docker command failed: {e}")
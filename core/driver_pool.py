@@ -0,0 +1,343 @@
+import contextvars
+import ctypes
+import importlib.util
+import io
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import DRIVER_POOL_SIZE, TEST_TIMEOUT_SECONDS
+from core.limits import browser_slot
+from core.tracing import span
+from logger import logging
+
+# After a timeout, how long a test gets to unwind before its thread is abandoned.
+TIMEOUT_GRACE_SECONDS = 5
+
+
+def create_headless_chrome():
+    """
+    Starts a headless Chrome session configured for running inside containers/CI.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1280,1024")
+    return webdriver.Chrome(options=options)
+
+
+class DriverPool:
+    """
+    A pool of warm headless Chrome sessions shared by harness-mode tests.
+
+    Sessions are started lazily up to `size`, handed out with `acquire()`, and
+    have their cookies and web storage wiped before they go back to the pool.
+    A session that breaks (or is killed by a timeout) is replaced by a new one;
+    a caller waiting for a session is woken whenever one is returned or
+    discarded, so it can take it or start the replacement.
+
+    While a pool is open, sys.stdout and sys.stderr are routed per thread so
+    each in-process test writes to its own output file; closing the last open
+    pool restores them.
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, driver_factory=create_headless_chrome):
+        self.size = size
+        self.driver_factory = driver_factory
+        self._idle = []
+        self._created = 0
+        self._lock = threading.Lock()
+        # Signalled whenever a session is returned or discarded, or the pool closes.
+        self._available = threading.Condition(self._lock)
+        self._all = set()
+        self._closed = False
+        _install_output_routers()
+
+    def _checkout(self):
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The driver pool is closed.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                self._available.wait()
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+        with self._lock:
+            self._all.add(driver)
+        logging.info(f"Started pooled Chrome session ({self._created}/{self.size}).")
+        return driver
+
+    def _release(self, driver):
+        with self._available:
+            if self._closed:
+                return
+            self._idle.append(driver)
+            self._available.notify()
+
+    def _discard(self, driver):
+        with self._available:
+            if driver in self._all:
+                self._all.discard(driver)
+                self._created -= 1
+            # A waiting caller may now start the replacement session.
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def reset(driver):
+        """
+        Clears cookies and local/session storage so the next test starts clean.
+        """
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            pass  # about:blank and similar pages have no storage
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except Exception:
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    @contextmanager
+    def acquire(self):
+        """
+        Yields a driver and returns it to the pool, reset, afterwards. Drivers
+        that fail to reset, or that the caller marks as `driver.pool_discard`,
+        are quit and replaced on the next acquire.
+        """
+        driver = self._checkout()
+        try:
+            yield driver
+        finally:
+            if getattr(driver, "pool_discard", False):
+                self._discard(driver)
+            else:
+                try:
+                    self.reset(driver)
+                except Exception:
+                    self._discard(driver)
+                else:
+                    self._release(driver)
+
+    def close(self):
+        """
+        Quits every session the pool started and, if this was the last open
+        pool, restores sys.stdout and sys.stderr.
+        """
+        with self._available:
+            if self._closed:
+                return
+            self._closed = True
+            drivers = list(self._all)
+            self._all.clear()
+            self._idle.clear()
+            self._created = 0
+            self._available.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        _remove_output_routers()
+        logging.info(f"Closed {len(drivers)} pooled Chrome session(s).")
+
+
+class _ThreadRoutedStream(io.TextIOBase):
+    """
+    A sys.stdout/sys.stderr replacement that sends each thread's writes to the
+    file registered for that thread, so concurrent in-process tests keep
+    separate output files.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def write(self, text):
+        target = getattr(self.local, "target", None)
+        return (target or self.fallback).write(text)
+
+    def flush(self):
+        target = getattr(self.local, "target", None)
+        (target or self.fallback).flush()
+
+
+_stream_lock = threading.Lock()
+_stdout_router = None
+_stderr_router = None
+_router_users = 0
+
+
+def _install_output_routers():
+    global _stdout_router, _stderr_router, _router_users
+    with _stream_lock:
+        _router_users += 1
+        if _stdout_router is None:
+            _stdout_router = _ThreadRoutedStream(sys.stdout)
+            _stderr_router = _ThreadRoutedStream(sys.stderr)
+            sys.stdout = _stdout_router
+            sys.stderr = _stderr_router
+
+
+def _remove_output_routers():
+    global _stdout_router, _stderr_router, _router_users
+    with _stream_lock:
+        _router_users = max(_router_users - 1, 0)
+        if _router_users or _stdout_router is None:
+            return
+        # Leave the streams alone if something replaced them after us.
+        if sys.stdout is _stdout_router:
+            sys.stdout = _stdout_router.fallback
+        if sys.stderr is _stderr_router:
+            sys.stderr = _stderr_router.fallback
+        _stdout_router = _stderr_router = None
+
+
+def _load_test_module(file):
+    module_name = f"harness_{Path(file).stem}_{threading.get_ident()}"
+    spec = importlib.util.spec_from_file_location(module_name, file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestTimeoutError(Exception):
+    pass
+
+
+def _raise_in_thread(thread, exc_type):
+    """
+    Asks the interpreter to raise `exc_type` in `thread` at its next bytecode.
+    This interrupts Python code (loops, sleeps between calls), not a blocking C call.
+    """
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread.ident), ctypes.py_object(exc_type))
+
+
+def _run_with_timeout(fn, timeout, on_timeout):
+    """
+    Runs `fn()` on its own daemon thread and waits at most `timeout` seconds.
+    On expiry it calls `on_timeout()` (which quits the browser, aborting any
+    pending Selenium command), raises TestTimeoutError inside the test, and
+    waits TIMEOUT_GRACE_SECONDS for it to unwind.
+
+    Returns:
+        tuple: (error raised by `fn` or None, True if the thread is still
+        running and had to be abandoned).
+    """
+    outcome = {}
+
+    def _target():
+        try:
+            fn()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(_target,), daemon=True, name="harness-test")
+    thread.start()
+    thread.join(timeout or None)
+    if thread.is_alive():
+        on_timeout()
+        _raise_in_thread(thread, TestTimeoutError)
+        thread.join(TIMEOUT_GRACE_SECONDS)
+    return outcome.get("error"), thread.is_alive()
+
+
+def run_harness_test(file, pool, base_url, timeout=TEST_TIMEOUT_SECONDS, output_dir="testcase_output", screenshots_dir="screenshots"):
+    """
+    Runs a harness-mode test in-process: imports the generated module and calls
+    its `run_test(driver, base_url, screenshots_dir)` with a pooled driver. Output
+    goes to the same testcase_output/output_<filename>.txt file as subprocess runs.
+    The test saves its screenshots under the absolute `screenshots_dir`: it shares
+    the process working directory with every other run, so relative paths would
+    collide between runs.
+
+    The test runs on its own thread. When it exceeds `timeout`, its driver is
+    quit (aborting the pending Selenium command) and TestTimeoutError is raised
+    inside the test, which also stops tests hanging in plain Python. A test
+    stuck in a blocking call even so is abandoned: it is reported as timed out,
+    its driver is never reused, and its thread is left to die with the process.
+
+    Returns:
+        dict: Same fields as `run_test_case` (exit_code is 0 on success, 1 on failure).
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"output_{Path(file).stem}.txt"
+    screenshots_dir = Path(screenshots_dir).resolve()
+    screenshots_dir.mkdir(parents=True, exist_ok=True)
+
+    result = {
+        "file": str(file),
+        "output_path": str(output_path),
+        "exit_code": None,
+        "duration": 0.0,
+        "timed_out": False,
+        "memory_exceeded": False,
+    }
+    timeout_message = f"Test exceeded the {timeout}s time limit and its browser was killed."
+
+    start = time.monotonic()
+    with open(output_path, "w", encoding="utf-8") as f:
+        try:
+            module = _load_test_module(file)
+            if not hasattr(module, "run_test"):
+                raise AttributeError(f"{file} does not define run_test(driver, base_url, screenshots_dir)")
+
+            with browser_slot(), pool.acquire() as driver:
+                def _test():
+                    # The routers are per thread, so the target is set on the test's own thread.
+                    _stdout_router.local.target = f
+                    _stderr_router.local.target = f
+                    try:
+                        with span("run test", "test", file=Path(file).name):
+                            module.run_test(driver, base_url, str(screenshots_dir))
+                    finally:
+                        _stdout_router.local.target = None
+                        _stderr_router.local.target = None
+
+                def _on_timeout():
+                    result["timed_out"] = True
+                    driver.pool_discard = True
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+
+                error, abandoned = _run_with_timeout(_test, timeout, _on_timeout)
+                if abandoned:
+                    logging.warning(f"Harness test {file} did not stop after its timeout; abandoning its thread.")
+            if result["timed_out"]:
+                raise TestTimeoutError(timeout_message) from error
+            if isinstance(error, Exception):
+                raise error
+            if error is not None:
+                # e.g. sys.exit() in the test; it must not end the worker.
+                raise RuntimeError(f"Test raised {error!r}") from error
+            result["exit_code"] = 0
+        except Exception as e:
+            traceback.print_exception(type(e), e, e.__traceback__, file=f)
+            f.write(f"\n[ERROR] {e}\n")
+            result["exit_code"] = 1
+
+    result["duration"] = round(time.monotonic() - start, 3)
+    logging.info(f"Harness test {file} finished with exit code {result['exit_code']} in {result['duration']}s.")
+    return result
@@ -0,0 +1,139 @@
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+PAGE_NAME = re.compile(r"test the `([^`]+)` page")
+PAGE_PATH = re.compile(r"base URL \+ `([^`]+)`|base_url \+ \"([^\"]+)\"")
+REPORT_PAGE = re.compile(r"report in Markdown format for the `([^`]+)` page")
+OBSERVATIONS_PAGE = re.compile(r"observations paragraph for the `([^`]+)` page")
+
+# Stdlib-only stand-in for a generated Selenium test: it passes the same static
+# validation, loads the page over HTTP and writes the two screenshot files.
+TEST_SCRIPT = '''import os
+import urllib.request
+
+
+class PageDriver:
+    def __init__(self):
+        self.page = b""
+
+    def get(self, url):
+        with urllib.request.urlopen(url, timeout=30) as response:
+            self.page = response.read()
+
+    def save_screenshot(self, filename):
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        with open(filename, "wb") as f:
+            f.write(self.page)
+        return True
+
+    def quit(self):
+        self.page = b""
+
+
+def main():
+    base_url = os.environ.get("SANDBOX_BASE_URL", "http://localhost:8000")
+    driver = PageDriver()
+    try:
+        driver.get(base_url + "{path}")
+        driver.save_screenshot("screenshots/before_{page_name}.png")
+        assert b"<form" in driver.page or b"<a " in driver.page, "page has no form or links"
+        driver.get(base_url + "{path}")
+        driver.save_screenshot("screenshots/after_{page_name}.png")
+        print("Test passed: {page_name}")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+SPEC = '''# Functional Specification
+
+## Pages
+- Home (`/`): lists every section of the benchmark fixture.
+- Section pages: a form with a required title field and a Save button.
+'''
+
+REPORT = '''# Final QA Report for {page_name} Page
+
+## Summary
+The generated test loaded the page, captured the before/after screenshots and passed.
+
+## Screenshots
+- Before: screenshots/before_{page_name}.png
+- After: screenshots/after_{page_name}.png
+'''
+
+OBSERVATIONS = "The {page_name} page loaded and rendered as the generated test expected. No further issues were observed."
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model for offline runs and benchmarks (the "fake" LLM
+    provider). It answers each pipeline
+    prompt with a canned response: a functional spec, a runnable stdlib-only
+    test script for the requested page, a report or a report's observations. Each call takes
+    `latency_s`, spread over `chunks` pieces when streamed, and reports token
+    usage, so caching, streaming, metering and tracing behave as with a real model.
+    """
+
+    model_name: str = "fake-benchmark"
+    latency_s: float = 0.2
+    chunks: int = 20
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name, "latency_s": self.latency_s}
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(m.content) for m in messages)
+        page = PAGE_NAME.search(prompt)
+        if page:
+            path = PAGE_PATH.search(prompt)
+            path = (path.group(1) or path.group(2)) if path else "/"
+            return "```python\n" + TEST_SCRIPT.replace("{path}", path).replace("{page_name}", page.group(1)) + "```\n"
+        report = REPORT_PAGE.search(prompt)
+        if report:
+            return REPORT.replace("{page_name}", report.group(1))
+        observations = OBSERVATIONS_PAGE.search(prompt)
+        if observations:
+            return OBSERVATIONS.replace("{page_name}", observations.group(1))
+        return SPEC
+
+    @staticmethod
+    def _usage(messages, text):
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        completion_tokens = len(text) // 4
+        return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency_s)
+        text = self._respond(messages)
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        text = self._respond(messages)
+        count = max(1, self.chunks)
+        size = -(-len(text) // count)
+        for index in range(count):
+            time.sleep(self.latency_s / count)
+            piece = text[index * size:(index + 1) * size]
+            last = index == count - 1
+            chunk = ChatGenerationChunk(message=AIMessageChunk(
+                content=piece,
+                usage_metadata=self._usage(messages, text) if last else None,
+            ))
+            if run_manager and piece:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
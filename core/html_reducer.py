@@ -0,0 +1,239 @@
+import re
+from html.parser import HTMLParser
+
+from config import HTML_REDUCTION_LEVEL
+from logger import logging
+
+REDUCTION_LEVELS = ("none", "light", "structural")
+
+# Elements dropped together with everything inside them.
+DROPPED_SUBTREES = {"script", "style", "svg", "noscript", "template", "iframe", "canvas", "object", "math"}
+# Foreign-content subtrees, which pages often leave unclosed.
+FOREIGN_SUBTREES = {"svg", "math"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+# "structural" level: the only elements a generated test interacts with or navigates by.
+STRUCTURAL_TAGS = {
+    "title", "form", "fieldset", "legend", "label", "input", "button", "select", "option", "textarea",
+    "a", "h1", "h2", "h3", "h4", "h5", "h6",
+}
+# Structural elements whose text content is kept.
+STRUCTURAL_TEXT_TAGS = {"title", "legend", "label", "button", "option", "textarea", "a", "h1", "h2", "h3", "h4", "h5", "h6"}
+STRUCTURAL_ATTRS = {
+    "id", "name", "type", "value", "placeholder", "href", "action", "method", "for",
+    "required", "aria-label", "title", "alt", "multiple", "checked", "selected",
+}
+
+# Head metadata that never helps a test: stylesheets, preloads, meta tags.
+METADATA_TAGS = {"link", "meta", "base"}
+
+# HTML start tags that end an unclosed <svg>/<math>: the breakout tags of the HTML
+# parsing spec plus the structural elements that have no SVG/MathML namesake.
+FOREIGN_BREAKOUT_TAGS = {
+    "b", "big", "blockquote", "body", "br", "center", "code", "dd", "div", "dl", "dt", "em", "embed",
+    "head", "hr", "i", "img", "li", "listing", "menu", "meta", "nobr", "ol", "p", "pre", "ruby", "s",
+    "small", "span", "strike", "strong", "sub", "sup", "table", "tt", "u", "ul", "var",
+} | (STRUCTURAL_TAGS - {"a", "title"})
+
+CSRF_FIELD_NAMES = {"csrfmiddlewaretoken", "csrf_token", "csrf-token", "_csrf", "authenticity_token"}
+
+
+class HtmlReducer(HTMLParser):
+    """
+    Incremental HTML reducer. Feed the page in chunks with `feed()` and call
+    `close()` to get the reduced markup.
+
+    Levels:
+        none:       markup passes through unchanged.
+        light:      drops scripts, styles, SVGs, comments, head metadata, CSRF
+                    tokens, inline styles/handlers and data-* attributes; keeps
+                    everything else.
+        structural: keeps only forms, inputs, buttons, links, headings and labels
+                    with their id/name/label attributes, and drops repeated links.
+    """
+
+    def __init__(self, level=HTML_REDUCTION_LEVEL):
+        super().__init__(convert_charrefs=True)
+        if level not in REDUCTION_LEVELS:
+            raise ValueError(f"Unknown HTML reduction level '{level}'. Expected one of {REDUCTION_LEVELS}.")
+        self.level = level
+        self._out = []
+        # Tags open inside the subtree being dropped, outermost first.
+        self._skipped = []
+        self._open = []
+        self._link_buffer = None
+        self._link_href = None
+        self._seen_links = set()
+        self._space_after_text = False
+
+    # --- public API ---
+    def feed(self, data):
+        if self.level == "none":
+            self._out.append(data)
+            return
+        super().feed(data)
+
+    def close(self):
+        if self.level != "none":
+            super().close()
+            self._flush_link()
+        reduced = "".join(self._out)
+        if self.level != "none":
+            reduced = re.sub(r"\n\s*\n+", "\n", reduced).strip()
+        return reduced
+
+    # --- parser callbacks ---
+    def handle_starttag(self, tag, attrs):
+        if self._skipped:
+            if not self._breaks_out(tag):
+                if tag not in VOID_TAGS:
+                    self._skipped.append(tag)
+                return
+            self._skipped = []
+        if tag in DROPPED_SUBTREES:
+            self._skipped = [tag]
+            return
+        if tag in METADATA_TAGS or self._is_csrf_input(tag, attrs):
+            return
+        if self.level == "structural" and tag not in STRUCTURAL_TAGS:
+            return
+
+        markup = self._render_starttag(tag, attrs)
+        if tag == "a" and self.level == "structural":
+            self._flush_link()
+            self._link_buffer = [markup]
+            self._link_href = dict(attrs).get("href")
+            return
+        self._emit(markup)
+        if tag not in VOID_TAGS:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if self._skipped and not self._breaks_out(tag):
+            return
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self._open and self._open[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._skipped:
+            if tag in self._skipped:
+                while self._skipped.pop() != tag:
+                    pass
+                return
+            # Closes an element the dropped subtree sits in (e.g. </body>
+            # after an unclosed <svg>): the subtree has ended.
+            self._skipped = []
+        if tag == "a" and self._link_buffer is not None:
+            self._link_buffer.append("</a>")
+            self._flush_link()
+            return
+        if self.level == "structural" and tag not in STRUCTURAL_TAGS:
+            return
+        if tag in self._open:
+            # Close any elements the page left open inside this one.
+            while self._open:
+                open_tag = self._open.pop()
+                self._emit(f"</{open_tag}>")
+                if open_tag == tag:
+                    break
+            if tag in ("form", "fieldset", "h1", "h2", "h3", "h4", "h5", "h6", "title"):
+                self._emit("\n")
+
+    def handle_data(self, data):
+        if self._skipped:
+            return
+        text = re.sub(r"\s+", " ", data)
+        if not text.strip():
+            if self.level == "light" and "\n" in data:
+                self._emit("\n")
+            return
+        if self.level == "structural":
+            in_text_tag = self._link_buffer is not None or any(t in STRUCTURAL_TEXT_TAGS for t in self._open)
+            if not in_text_tag:
+                return
+            # Pieces of text split by dropped inline tags (<small>, <span>, ...)
+            # keep one space between them, so words don't run together.
+            separated = text.startswith(" ") or self._space_after_text
+            self._space_after_text = text.endswith(" ")
+            text = text.strip()
+            if separated and self._last_piece_is_text():
+                text = " " + text
+        self._emit(text)
+
+    def handle_comment(self, data):
+        return
+
+    def handle_decl(self, decl):
+        if self.level == "light":
+            self._emit(f"<!{decl}>\n")
+
+    # --- helpers ---
+    def _emit(self, markup):
+        if self._link_buffer is not None:
+            self._link_buffer.append(markup)
+        else:
+            self._out.append(markup)
+
+    def _breaks_out(self, tag):
+        return self._skipped[0] in FOREIGN_SUBTREES and tag in FOREIGN_BREAKOUT_TAGS
+
+    def _last_piece_is_text(self):
+        pieces = self._link_buffer if self._link_buffer is not None else self._out
+        return bool(pieces) and not pieces[-1].endswith((">", "\n"))
+
+    def _flush_link(self):
+        if self._link_buffer is None:
+            return
+        markup = "".join(self._link_buffer)
+        key = (self._link_href, re.sub(r"<[^>]+>", "", markup).strip())
+        self._link_buffer = None
+        if key in self._seen_links:
+            return
+        self._seen_links.add(key)
+        self._out.append(markup + "\n")
+
+    def _is_csrf_input(self, tag, attrs):
+        if tag != "input":
+            return False
+        values = dict(attrs)
+        return (values.get("name") or "").lower() in CSRF_FIELD_NAMES
+
+    def _render_starttag(self, tag, attrs):
+        kept = []
+        for name, value in attrs:
+            if self.level == "light":
+                if name == "style" or name.startswith("on") or name.startswith("data-"):
+                    continue
+            elif name not in STRUCTURAL_ATTRS:
+                continue
+            if value is None:
+                kept.append(name)
+            else:
+                escaped = value.replace("&", "&amp;").replace('"', "&quot;")
+                kept.append(f'{name}="{escaped}"')
+        return f"<{tag}{' ' if kept else ''}{' '.join(kept)}>"
+
+
+def reduce_html(html, level=HTML_REDUCTION_LEVEL, page=None, chunk_size=64 * 1024):
+    """
+    Reduces a page to the markup the LLM prompts need and logs the size change.
+
+    Args:
+        html (str): Raw page source.
+        level (str): One of REDUCTION_LEVELS.
+        page (str): Page label used in the log line.
+        chunk_size (int): Size of the chunks streamed through the parser.
+
+    Returns:
+        tuple: (reduced_html, stats) where stats is {"before": int, "after": int}.
+    """
+    reducer = HtmlReducer(level)
+    for start in range(0, len(html), chunk_size):
+        reducer.feed(html[start:start + chunk_size])
+    reduced = reducer.close()
+
+    stats = {"before": len(html), "after": len(reduced)}
+    ratio = stats["before"] / stats["after"] if stats["after"] else float("inf")
+    logging.info(f"Reduced HTML for {page or 'page'} ({level}): {stats['before']} -> {stats['after']} chars ({ratio:.1f}x).")
+    return reduced, stats
@@ -0,0 +1,176 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import HTTP_FETCH_CONCURRENCY, HTTP_FETCH_TIMEOUT_SECONDS, HTTP_FETCH_RETRIES
+from core.tracing import span
+from logger import logging
+
+RETRY_STATUSES = {502, 503, 504}
+INITIAL_RETRY_DELAY = 0.25
+
+
+class PageFetcher:
+    """
+    Shared HTTP layer for fetching sandbox pages during a run.
+
+    One keep-alive session with a connection pool sized to the fetch
+    concurrency, per-request timeouts, retries with exponential backoff on
+    connection errors and 502/503/504, and an in-memory cache of successful
+    pages. `prefetch` starts fetches in the background; a later `fetch` of the
+    same URL waits for the in-flight request instead of issuing another.
+    """
+
+    def __init__(self, concurrency=HTTP_FETCH_CONCURRENCY, timeout=HTTP_FETCH_TIMEOUT_SECONDS, retries=HTTP_FETCH_RETRIES):
+        self.timeout = timeout
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch")
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._inflight = {}
+        self._records = []
+        self._cache_hits = 0
+
+    def _get(self, url):
+        """
+        Performs the request with retries and records its latency and size.
+        Returns the page text, or None if it could not be fetched.
+        """
+        try:
+            with span("fetch", "http", url=url):
+                return self._get_with_retries(url)
+        finally:
+            # Also on unexpected errors, so a later fetch of the URL starts a new request.
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    def _get_with_retries(self, url):
+        start = time.monotonic()
+        delay = INITIAL_RETRY_DELAY
+        status, error, body = None, None, None
+        for attempt in range(1, self.retries + 2):
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                status = response.status_code
+                if status in RETRY_STATUSES and attempt <= self.retries:
+                    error = f"HTTP {status}"
+                else:
+                    response.raise_for_status()
+                    body = response.text
+                    error = None
+                    break
+            except requests.HTTPError as e:
+                error = str(e)
+                break
+            except requests.RequestException as e:
+                error = str(e)
+                if attempt > self.retries:
+                    break
+            time.sleep(delay)
+            delay *= 2
+
+        record = {
+            "url": url,
+            "status": status,
+            "latency_ms": round((time.monotonic() - start) * 1000, 1),
+            "bytes": len(body.encode("utf-8")) if body is not None else 0,
+            "attempts": attempt,
+            "error": error,
+        }
+        with self._lock:
+            self._records.append(record)
+            if body is not None:
+                self._pages[url] = body
+
+        if body is None:
+            logging.error(f"Failed to fetch {url} after {attempt} attempt(s): {error}")
+        else:
+            logging.info(f"Fetched {url} ({record['bytes']} bytes, {record['latency_ms']} ms).")
+        return body
+
+    def _submit(self, url):
+        # Caller holds self._lock.
+        future = self._inflight.get(url)
+        if future is None:
+            # The copied context keeps the fetch's span under the caller's.
+            future = self._executor.submit(contextvars.copy_context().run, self._get, url)
+            self._inflight[url] = future
+        return future
+
+    def prefetch(self, urls):
+        """
+        Starts fetching every URL not already cached or in flight.
+        """
+        with self._lock:
+            for url in urls:
+                if url not in self._pages:
+                    self._submit(url)
+
+    def fetch(self, url):
+        """
+        Returns the page text for `url` from the run cache, an in-flight
+        prefetch, or a new request. Returns None if the page could not be fetched.
+        """
+        with self._lock:
+            if url in self._pages:
+                self._cache_hits += 1
+                return self._pages[url]
+            future = self._submit(url)
+        return future.result()
+
+    def stats(self):
+        """
+        Returns totals plus one record (status, latency_ms, bytes, attempts) per request.
+        """
+        with self._lock:
+            records = list(self._records)
+            cache_hits = self._cache_hits
+        latencies = sorted(r["latency_ms"] for r in records)
+        return {
+            "requests": len(records),
+            "failed": sum(1 for r in records if r["error"]),
+            "cache_hits": cache_hits,
+            "bytes": sum(r["bytes"] for r in records),
+            "total_latency_ms": round(sum(latencies), 1),
+            "max_latency_ms": latencies[-1] if latencies else 0,
+            "requests_detail": records,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+
+_fetchers = {}
+_fetchers_lock = threading.Lock()
+
+
+def get_page_fetcher(run_id=None):
+    """
+    Returns the fetcher for a run, creating it on first use. Each run gets its
+    own page cache, since sandboxes of different runs may reuse a host port.
+    """
+    with _fetchers_lock:
+        if run_id not in _fetchers:
+            _fetchers[run_id] = PageFetcher()
+        return _fetchers[run_id]
+
+
+def release_page_fetcher(run_id=None):
+    """
+    Closes a run's fetcher and returns its final stats (None if it was never used).
+    """
+    with _fetchers_lock:
+        fetcher = _fetchers.pop(run_id, None)
+    if fetcher is None:
+        return None
+    fetcher.close()
+    return fetcher.stats()
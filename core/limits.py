@@ -0,0 +1,54 @@
+import threading
+from contextlib import contextmanager
+
+from config import MAX_CONCURRENT_DOCKER_BUILDS, MAX_CONCURRENT_LLM_CALLS, MAX_CONCURRENT_BROWSERS
+
+# Process-wide caps shared by every workflow running in this process, so a
+# batch of repositories cannot oversubscribe Docker, the LLM API or the host's
+# browsers no matter how many pipelines run at once.
+_semaphores = {
+    "docker_build": threading.BoundedSemaphore(MAX_CONCURRENT_DOCKER_BUILDS),
+    "llm_call": threading.BoundedSemaphore(MAX_CONCURRENT_LLM_CALLS),
+    "browser": threading.BoundedSemaphore(MAX_CONCURRENT_BROWSERS),
+}
+
+
+def configure_limits(docker_builds=None, llm_calls=None, browsers=None):
+    """
+    Replaces the global concurrency caps. Call before starting any workflow;
+    slots already held under the old caps are released to the old semaphores.
+    """
+    if docker_builds:
+        _semaphores["docker_build"] = threading.BoundedSemaphore(docker_builds)
+    if llm_calls:
+        _semaphores["llm_call"] = threading.BoundedSemaphore(llm_calls)
+    if browsers:
+        _semaphores["browser"] = threading.BoundedSemaphore(browsers)
+
+
+@contextmanager
+def _slot(name):
+    semaphore = _semaphores[name]
+    with semaphore:
+        yield
+
+
+def docker_build_slot():
+    """
+    Holds one of the global Docker build slots for the duration of the block.
+    """
+    return _slot("docker_build")
+
+
+def llm_call_slot():
+    """
+    Holds one of the global LLM call slots for the duration of the block.
+    """
+    return _slot("llm_call")
+
+
+def browser_slot():
+    """
+    Holds one of the global browser slots for the duration of the block.
+    """
+    return _slot("browser")
@@ -0,0 +1,93 @@
+import os
+import threading
+
+from config import LLM_PROVIDER, LLM_MODEL, LLM_STAGE_BACKENDS, FAKE_LLM_LATENCY_MS
+from core.llm_metering import get_llm_meter
+from core.tracing import LLMSpanHandler
+
+# Pipeline stages that can be given their own backend.
+STAGES = ("spec", "tests", "reports")
+
+_factories = {}
+_models = {}
+_models_lock = threading.Lock()
+_dotenv_loaded = False
+
+
+def register_backend(provider, factory):
+    """
+    Makes `provider` available to LLM_PROVIDER / LLM_STAGE_BACKENDS.
+    `factory(model, callbacks)` returns a LangChain chat model.
+    """
+    _factories[provider] = factory
+
+
+def _openai_backend(model, callbacks):
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY environment variable not set.")
+    from langchain_openai import ChatOpenAI
+    # stream_usage makes streamed completions report their token counts too.
+    return ChatOpenAI(model=model, api_key=api_key, stream_usage=True, callbacks=callbacks)
+
+
+def _fake_backend(model, callbacks):
+    from core.fake_llm import FakeChatModel
+    return FakeChatModel(latency_s=FAKE_LLM_LATENCY_MS / 1000, callbacks=callbacks)
+
+
+register_backend("openai", _openai_backend)
+register_backend("fake", _fake_backend)
+
+
+def parse_stage_backends(value):
+    """
+    Parses LLM_STAGE_BACKENDS ("reports=openai:gpt-4.1-nano,tests=fake") into
+    {stage: (provider or None, model or None)}.
+    """
+    overrides = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        stage, _, backend = item.partition("=")
+        stage = stage.strip()
+        if stage not in STAGES:
+            raise ValueError(f"Unknown LLM stage '{stage}' in LLM_STAGE_BACKENDS (expected one of {', '.join(STAGES)}).")
+        provider, _, model = backend.strip().partition(":")
+        overrides[stage] = (provider.strip() or None, model.strip() or None)
+    return overrides
+
+
+_stage_backends = parse_stage_backends(LLM_STAGE_BACKENDS)
+
+
+def backend_for(stage=None):
+    """
+    Returns the (provider, model) a stage uses: its LLM_STAGE_BACKENDS entry,
+    falling back to LLM_PROVIDER and LLM_MODEL.
+    """
+    provider, model = _stage_backends.get(stage, (None, None))
+    return provider or LLM_PROVIDER, model or LLM_MODEL
+
+
+def get_llm(stage=None):
+    """
+    Returns the chat model for a pipeline stage, building it on first use.
+    Stages that resolve to the same provider and model share one instance.
+    Every model is metered and traced.
+
+    Raises:
+        ValueError: The configured provider is not registered.
+        RuntimeError: The provider cannot be built (e.g. OPENAI_API_KEY is missing).
+    """
+    provider, model = backend_for(stage)
+    key = (provider, model)
+    with _models_lock:
+        if key not in _models:
+            if provider not in _factories:
+                raise ValueError(f"Unknown LLM provider '{provider}' (registered: {', '.join(sorted(_factories))}).")
+            _models[key] = _factories[provider](model, [get_llm_meter(), LLMSpanHandler()])
+        return _models[key]
@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from config import LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES, LLM_CACHE_BYPASS
+from core.limits import llm_call_slot
+from logger import logging
+
+
+class LLMCache:
+    """
+    SQLite-backed, size-bounded LRU cache for LLM chain responses.
+
+    Entries are keyed by a content hash (see `make_cache_key`), so identical
+    prompts against the same model and temperature are answered from disk.
+    Safe to share between the worker threads of a single run.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+
+    def get(self, key):
+        """
+        Returns the cached value for `key` (refreshing its LRU position) or None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        """
+        Stores `value` under `key` and evicts least recently used entries
+        until the cache fits within `max_bytes`.
+        """
+        size = len(value.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = 0
+            for old_key, old_size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                total -= old_size
+                evicted += 1
+            logging.info(f"LLM cache evicted {evicted} entries to stay under {self.max_bytes} bytes.")
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the current on-disk footprint.
+        """
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Returns the process-wide cache, creating it on first use.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
+
+
+def _model_identity(llm):
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    temperature = getattr(llm, "temperature", None)
+    return model, temperature
+
+
+def make_cache_key(prompt, variables, llm, namespace=None):
+    """
+    Hashes (prompt template, rendered variables, model name, temperature) into a cache key.
+    A `namespace` keeps entries that are not plain chain responses (e.g.
+    streams cut short by their consumer) apart from `invoke_chain`'s.
+    """
+    model, temperature = _model_identity(llm)
+    fields = {"prompt": prompt, "variables": variables, "model": model, "temperature": temperature}
+    if namespace:
+        fields["namespace"] = namespace
+    payload = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_chain(prompt, llm, parser):
+    """
+    Builds the `system prompt + human input` chain shared by every LLM call site.
+    """
+    final_prompt = ChatPromptTemplate.from_messages([
+        ('system', prompt),
+        ('human', '{input}')
+    ])
+    return final_prompt | llm | parser
+
+
+def _slotted(llm):
+    """
+    Wraps the model so each call inside a batch holds a global LLM call slot.
+    """
+    def call(messages, config):
+        with llm_call_slot():
+            return llm.invoke(messages, config)
+    return RunnableLambda(call)
+
+
+def batch_chain(prompt, variables_list, llm, parser, max_concurrency, bypass=None, metadata_list=None):
+    """
+    Runs the prompt chain over many inputs with one `batch_as_completed` call,
+    answering cached inputs from disk first. `metadata_list` optionally gives
+    each input's run metadata (e.g. {"route": page_name} for metering).
+
+    Yields (index, result) as each input finishes, where result is the
+    response text or the exception that input raised; one failing input
+    does not stop the others.
+    """
+    if bypass is None:
+        bypass = LLM_CACHE_BYPASS
+
+    cache = get_llm_cache()
+    keys = [make_cache_key(prompt, variables, llm) for variables in variables_list]
+    pending = []
+    for index, key in enumerate(keys):
+        cached = None if bypass else cache.get(key)
+        if cached is not None:
+            logging.info(f"LLM cache hit ({key[:12]}).")
+            yield index, cached
+        else:
+            pending.append(index)
+    if not pending:
+        return
+
+    final_prompt = ChatPromptTemplate.from_messages([
+        ('system', prompt),
+        ('human', '{input}')
+    ])
+    chain = final_prompt | _slotted(llm) | parser
+    inputs = [variables_list[index] for index in pending]
+    configs = [
+        {"max_concurrency": max_concurrency, "metadata": metadata_list[index] if metadata_list else {}}
+        for index in pending
+    ]
+    for position, result in chain.batch_as_completed(inputs, config=configs, return_exceptions=True):
+        index = pending[position]
+        if isinstance(result, str):
+            cache.set(keys[index], result)
+        yield index, result
+
+
+def invoke_chain(prompt, variables, llm, parser, bypass=None):
+    """
+    Invokes the prompt chain with `variables`, answering from the on-disk cache
+    when an identical call was made before.
+
+    Args:
+        prompt (str): System prompt template.
+        variables (dict): Values for the template placeholders, including `input`.
+        llm: Chat model the chain runs against.
+        parser: Output parser applied to the model response.
+        bypass (bool): Skip the cache lookup (the fresh result is still stored).
+            Defaults to the LLM_CACHE_BYPASS setting.
+    """
+    if bypass is None:
+        bypass = LLM_CACHE_BYPASS
+
+    cache = get_llm_cache()
+    key = make_cache_key(prompt, variables, llm)
+    if not bypass:
+        cached = cache.get(key)
+        if cached is not None:
+            logging.info(f"LLM cache hit ({key[:12]}).")
+            return cached
+
+    with llm_call_slot():
+        response = build_chain(prompt, llm, parser).invoke(variables)
+    if isinstance(response, str):
+        cache.set(key, response)
+    return response
+
+
+def stream_chain(prompt, variables, llm, parser, on_text, bypass=None):
+    """
+    Like `invoke_chain`, but streams the completion: `on_text(chunk)` is called
+    for every chunk as it arrives (once with the whole text on a cache hit).
+    `on_text` may return True to stop reading once it has what it needs, or
+    raise (e.g. StreamAborted) to cancel the generation.
+
+    Only generations that were not cancelled are cached. A stream stopped
+    early is shorter than the full response, so streamed calls are cached in
+    their own namespace and never answer `invoke_chain` or `batch_chain`.
+
+    Returns:
+        tuple: (text, stats) where stats has cached, ttfb_ms, duration_ms,
+            chunks, chars and chunks_per_sec (OpenAI streams about one token per chunk).
+    """
+    if bypass is None:
+        bypass = LLM_CACHE_BYPASS
+
+    cache = get_llm_cache()
+    key = make_cache_key(prompt, variables, llm, namespace="stream")
+    if not bypass:
+        cached = cache.get(key)
+        if cached is not None:
+            logging.info(f"LLM cache hit ({key[:12]}).")
+            on_text(cached)
+            return cached, {"cached": True, "ttfb_ms": 0.0, "duration_ms": 0.0, "chunks": 0, "chars": len(cached), "chunks_per_sec": None}
+
+    parts = []
+    ttfb = None
+    with llm_call_slot():
+        start = time.monotonic()
+        for chunk in build_chain(prompt, llm, parser).stream(variables):
+            if not chunk:
+                continue
+            if ttfb is None:
+                ttfb = time.monotonic() - start
+            parts.append(chunk)
+            if on_text(chunk):
+                break
+        duration = time.monotonic() - start
+
+    text = "".join(parts)
+    cache.set(key, text)
+    generation_time = duration - (ttfb or 0)
+    stats = {
+        "cached": False,
+        "ttfb_ms": round((ttfb or duration) * 1000, 1),
+        "duration_ms": round(duration * 1000, 1),
+        "chunks": len(parts),
+        "chars": len(text),
+        "chunks_per_sec": round(len(parts) / generation_time, 1) if generation_time > 0 else None,
+    }
+    return text, stats
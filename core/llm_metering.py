@@ -0,0 +1,240 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from logger import logging
+
+# USD per million (input, output) tokens; models not listed get no cost estimate.
+MODEL_PRICES_PER_MTOK = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# Labels (run_id, node, route) attached to every LLM call made in this context.
+_labels = contextvars.ContextVar("llm_metering_labels", default={})
+
+
+@contextmanager
+def metering_labels(**labels):
+    """
+    Attributes the LLM calls made inside the block to the given labels,
+    e.g. `with metering_labels(node="generate_reports", route="login"):`.
+    Labels nest: inner blocks add to or override the outer ones.
+    """
+    token = _labels.set({**_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+def metered_node(node_name, node_fn):
+    """
+    Wraps a LangGraph node so the LLM calls it makes are attributed to it and its run.
+    """
+    def wrapper(state):
+        with metering_labels(run_id=state.get("run_id"), node=node_name):
+            return node_fn(state)
+    wrapper.__name__ = getattr(node_fn, "__name__", node_name)
+    return wrapper
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prices = None
+    for name, candidate in sorted(MODEL_PRICES_PER_MTOK.items(), key=lambda item: -len(item[0])):
+        if model and model.startswith(name):
+            prices = candidate
+            break
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def _aggregate(calls):
+    latencies = sorted(c["latency_ms"] for c in calls)
+    costs = [c["cost_usd"] for c in calls if c["cost_usd"] is not None]
+    return {
+        "calls": len(calls),
+        "errors": sum(1 for c in calls if c["error"]),
+        "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+        "completion_tokens": sum(c["completion_tokens"] for c in calls),
+        "total_tokens": sum(c["prompt_tokens"] + c["completion_tokens"] for c in calls),
+        "cost_usd": round(sum(costs), 6) if costs else None,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.5),
+            "p90": _percentile(latencies, 0.9),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+
+class LLMMeter(BaseCallbackHandler):
+    """
+    Callback handler attached to the shared chat model. Records one entry per
+    model call (tokens, latency, time to first token, estimated cost, error)
+    labelled with the run, node and route from `metering_labels` or the
+    call's `metadata`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._calls = []
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        labels = {**_labels.get(), **{k: v for k, v in (metadata or {}).items() if k in ("run_id", "node", "route")}}
+        with self._lock:
+            self._pending[run_id] = {
+                "start": time.monotonic(),
+                "first_token": None,
+                "model": params.get("model_name") or params.get("model"),
+                "labels": labels,
+            }
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            pending = self._pending.get(run_id)
+            if pending and pending["first_token"] is None:
+                pending["first_token"] = time.monotonic()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt_tokens, completion_tokens = self._usage(response)
+        model = (response.llm_output or {}).get("model_name")
+        self._finish(run_id, prompt_tokens, completion_tokens, model, error=None)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, 0, 0, None, error=str(error))
+
+    @staticmethod
+    def _usage(response):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+    def _finish(self, run_id, prompt_tokens, completion_tokens, model, error):
+        end = time.monotonic()
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+            if pending is None:
+                return
+            model = model or pending["model"]
+            self._calls.append({
+                **{"run_id": None, "node": None, "route": None},
+                **pending["labels"],
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "latency_ms": round((end - pending["start"]) * 1000, 1),
+                "ttft_ms": round((pending["first_token"] - pending["start"]) * 1000, 1) if pending["first_token"] else None,
+                "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+                "error": error,
+            })
+
+    def calls(self, run_id=None):
+        with self._lock:
+            return [c for c in self._calls if run_id is None or c["run_id"] == run_id]
+
+    def summary(self, run_id=None):
+        """
+        Returns totals plus per-node and per-route breakdowns for a run's calls.
+        """
+        calls = self.calls(run_id)
+        by_node, by_route = {}, {}
+        for call in calls:
+            by_node.setdefault(call["node"] or "unlabelled", []).append(call)
+            if call["route"]:
+                by_route.setdefault(call["route"], []).append(call)
+        return {
+            "run_id": run_id,
+            "totals": _aggregate(calls),
+            "by_node": {node: _aggregate(node_calls) for node, node_calls in by_node.items()},
+            "by_route": {route: _aggregate(route_calls) for route, route_calls in by_route.items()},
+        }
+
+    def release(self, run_id):
+        """
+        Drops a finished run's calls so a long batch does not accumulate them.
+        """
+        with self._lock:
+            self._calls = [c for c in self._calls if c["run_id"] != run_id]
+
+
+_default_meter = LLMMeter()
+
+
+def get_llm_meter():
+    return _default_meter
+
+
+def _prometheus_labels(**labels):
+    escaped = {k: str(v).replace("\\", "\\\\").replace('"', '\\"') for k, v in labels.items() if v is not None}
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped.items()) + "}"
+
+
+def to_prometheus(summary):
+    """
+    Renders a run summary in the Prometheus text exposition format.
+    """
+    run_id = summary["run_id"]
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{name}{_prometheus_labels(run_id=run_id, **labels)} {value}")
+
+    nodes = summary["by_node"].items()
+    metric("fst_llm_calls_total", "counter", "LLM calls made.",
+           [({"node": node}, agg["calls"]) for node, agg in nodes])
+    metric("fst_llm_errors_total", "counter", "LLM calls that failed.",
+           [({"node": node}, agg["errors"]) for node, agg in nodes])
+    metric("fst_llm_tokens_total", "counter", "Tokens sent to and received from the model.",
+           [({"node": node, "type": kind}, agg[f"{kind}_tokens"]) for node, agg in nodes for kind in ("prompt", "completion")])
+    metric("fst_llm_cost_usd_total", "counter", "Estimated LLM cost in US dollars.",
+           [({"node": node}, agg["cost_usd"]) for node, agg in nodes])
+    latency = summary["totals"]["latency_ms"]
+    metric("fst_llm_latency_seconds", "summary", "LLM call latency.",
+           [({"quantile": q}, latency[key] / 1000 if latency[key] is not None else None)
+            for q, key in (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99"))])
+    return "\n".join(lines) + "\n"
+
+
+def write_run_metrics(run_id, output_dir, meter=None):
+    """
+    Writes llm_metrics.json (summary plus every call) and llm_metrics.prom for
+    a run into `output_dir`, releases the run's calls, and returns the summary.
+    """
+    meter = meter or get_llm_meter()
+    summary = meter.summary(run_id)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "llm_metrics.json"), "w") as f:
+        json.dump({**summary, "calls": meter.calls(run_id)}, f, indent=4)
+    with open(os.path.join(output_dir, "llm_metrics.prom"), "w") as f:
+        f.write(to_prometheus(summary))
+    meter.release(run_id)
+
+    totals = summary["totals"]
+    logging.info(f"LLM usage for run {run_id}: {totals['calls']} calls, {totals['total_tokens']} tokens, est. ${totals['cost_usd'] or 0:.4f}.")
+    return summary
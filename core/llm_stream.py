@@ -0,0 +1,127 @@
+import os
+import re
+
+from config import LLM_MAX_OUTPUT_CHARS, LLM_MAX_PROSE_CHARS
+
+OPENING_FENCE = re.compile(r"^\s*```\s*(?:python3?|py)?\s*$", re.IGNORECASE)
+CLOSING_FENCE = re.compile(r"^\s*```\s*$")
+# First lines that mean the model skipped the fence and went straight to code.
+CODE_START = re.compile(r"^(?:import |from \S+ import |def |class |@|#!)")
+
+
+class StreamAborted(RuntimeError):
+    """
+    Raised from a streaming callback to stop a generation that has gone off
+    the rails (prose instead of code, or output past the length ceiling).
+    """
+
+
+class CodeFenceTracker:
+    """
+    Incrementally extracts the code from a streamed completion, mirroring
+    `clean_gpt_generated_code`: the first ```python fenced block if there is
+    one, otherwise the text from the first line that looks like code.
+
+    `feed(chunk)` returns the code lines completed by that chunk; `done` turns
+    true once the closing fence has been seen, so the rest can be skipped.
+
+    Raises StreamAborted when no code has started after `max_prose_chars` of
+    output, or the output passes `max_chars`.
+    """
+
+    def __init__(self, max_chars=LLM_MAX_OUTPUT_CHARS, max_prose_chars=LLM_MAX_PROSE_CHARS):
+        self.max_chars = max_chars
+        self.max_prose_chars = max_prose_chars
+        self.state = "preamble"  # preamble -> code (fenced or raw) -> done
+        self.fenced = False
+        self.chars = 0
+        self._partial = ""
+        self._preamble_chars = 0
+
+    @property
+    def done(self):
+        return self.state == "done"
+
+    def feed(self, chunk):
+        self.chars += len(chunk)
+        if self.max_chars and self.chars > self.max_chars:
+            raise StreamAborted(f"Output exceeded {self.max_chars} characters.")
+
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        code = []
+        for line in lines:
+            code.extend(self._line(line))
+            if self.done:
+                break
+
+        if self.state == "preamble":
+            if self.max_prose_chars and self._preamble_chars + len(self._partial) > self.max_prose_chars:
+                raise StreamAborted(f"No code after {self.max_prose_chars} characters of prose.")
+        return "".join(code)
+
+    def close(self):
+        """
+        Flushes the last unterminated line and returns it if it is code.
+        """
+        line, self._partial = self._partial, ""
+        if self.state == "code" and line and not CLOSING_FENCE.match(line):
+            return line + "\n"
+        if self.state == "preamble" and CODE_START.match(line):
+            self.state = "code"
+            return line + "\n"
+        return ""
+
+    def _line(self, line):
+        if self.state == "preamble":
+            if OPENING_FENCE.match(line):
+                self.state, self.fenced = "code", True
+                return []
+            if CODE_START.match(line):
+                self.state = "code"
+                return [line + "\n"]
+            self._preamble_chars += len(line) + 1
+            return []
+        if self.state == "code":
+            if self.fenced and CLOSING_FENCE.match(line):
+                self.state = "done"
+                return []
+            return [line + "\n"]
+        return []
+
+
+class StreamingFileWriter:
+    """
+    Writes streamed text to `<path>.partial` as it arrives and moves it into
+    place on `commit()`; `discard()` removes the partial file instead, so an
+    aborted generation never leaves a truncated script behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.partial_path = f"{path}.partial"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(self.partial_path, "w", encoding="utf-8")
+        self._parts = []
+        self.chars = 0
+
+    def write(self, text):
+        if text:
+            self._file.write(text)
+            self._file.flush()
+            self._parts.append(text)
+            self.chars += len(text)
+
+    @property
+    def text(self):
+        """Everything written so far."""
+        return "".join(self._parts)
+
+    def commit(self):
+        self._file.close()
+        os.replace(self.partial_path, self.path)
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
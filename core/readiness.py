@@ -0,0 +1,97 @@
+import subprocess
+import time
+
+import requests
+
+from config import SANDBOX_READY_TIMEOUT_SECONDS, SANDBOX_HEALTH_PATH
+from logger import logging
+
+INITIAL_POLL_DELAY = 0.1
+MAX_POLL_DELAY = 2.0
+
+
+class SandboxNotReadyError(RuntimeError):
+    """
+    Raised when the sandbox app does not become reachable before the deadline,
+    or its container exits while we are waiting for it.
+    """
+
+
+def _backoff_delays(initial=INITIAL_POLL_DELAY, maximum=MAX_POLL_DELAY):
+    delay = initial
+    while True:
+        yield delay
+        delay = min(delay * 2, maximum)
+
+
+def container_state(container_id):
+    """
+    Returns (status, exit_code) of a container, e.g. ("running", 0) or ("exited", 1).
+    """
+    result = subprocess.run(
+        ["sudo", "docker", "inspect", "-f", "{{.State.Status}} {{.State.ExitCode}}", container_id],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+    status, exit_code = result.stdout.split()
+    return status, int(exit_code)
+
+
+def container_logs(container_id, tail=200):
+    """
+    Returns the last `tail` lines of a container's combined stdout/stderr.
+    """
+    result = subprocess.run(
+        ["sudo", "docker", "logs", "--tail", str(tail), container_id],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+    return result.stdout
+
+
+def wait_for_http_ready(base_url, container_id=None, health_path=SANDBOX_HEALTH_PATH, timeout=SANDBOX_READY_TIMEOUT_SECONDS):
+    """
+    Polls `base_url + health_path` with exponential backoff until the app
+    answers with a non-5xx status, and returns the time it took in seconds.
+
+    If `container_id` is given, the container is checked on every attempt so a
+    crash during startup fails immediately with the container logs instead of
+    waiting for the deadline.
+
+    Raises:
+        SandboxNotReadyError: the deadline passed or the container exited.
+    """
+    url = f"{base_url.rstrip('/')}{health_path}"
+    start = time.monotonic()
+    deadline = start + timeout
+    last_error = None
+
+    logging.info(f"Waiting for sandbox to answer on {url} (deadline {timeout}s)...")
+    for delay in _backoff_delays():
+        if container_id:
+            status, exit_code = container_state(container_id)
+            if status in ("exited", "dead"):
+                logs = container_logs(container_id)
+                raise SandboxNotReadyError(
+                    f"Container {container_id[:12]} exited with code {exit_code} before becoming ready.\n{logs}"
+                )
+
+        try:
+            response = requests.get(url, timeout=max(delay, 1.0))
+            if response.status_code < 500:
+                elapsed = time.monotonic() - start
+                logging.info(f"Sandbox ready after {elapsed:.2f}s (HTTP {response.status_code}).")
+                return elapsed
+            last_error = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            last_error = str(e)
+
+        if time.monotonic() + delay > deadline:
+            break
+        time.sleep(delay)
+
+    logs = container_logs(container_id) if container_id else ""
+    raise SandboxNotReadyError(f"Sandbox not ready after {timeout}s ({last_error}).\n{logs}".rstrip())
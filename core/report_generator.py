@@ -1,68 +1,204 @@
-import os
 from pathlib import Path
-import openai
 
-from langchain_core.prompts import ChatPromptTemplate
+from config import REPORT_MAX_CONCURRENCY, REPORT_MAX_TEST_OUTPUT_CHARS, REPORT_HTML
+from core.llm_cache import batch_chain
+from core.report_renderer import spec_section_for, default_observations, render_markdown_report, render_html_report
+from core.tracing import span
+from logger import logging
 
-def generate_llm_report(page_name, prompt, llm, parser):
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        print(" OPENAI_API_KEY environment variable not set.")
-        return
+REPORT_INSTRUCTION = "Generate concise report based on the information provided information."
+OBSERVATIONS_INSTRUCTION = "Write the observations paragraph for this test result."
 
-    base_dir = Path(__file__).resolve().parent.parent
+# Test output given to the observations prompt of a route that did not pass.
+OBSERVATION_OUTPUT_CHARS = 1500
 
-    spec_path = base_dir / "outputs" / "functional_specifications.md"
-    screenshot_before = base_dir / "screenshots" / f"before_{page_name}.png"
-    screenshot_after = base_dir / "screenshots" / f"after_{page_name}.png"
-    test_file = base_dir / "tests" / "selenium" / f"test_{page_name}.py"
-    output = base_dir/"testcase_output"/f"output_{test_file}.txt"
-
-    report_output = base_dir / "reports" / f"final_report_{page_name}.md"
-    report_output.parent.mkdir(parents=True, exist_ok=True)
 
-    try:
-        with open(spec_path, "r") as f:
-            spec_content = f.read()
+def _base_dir(workspace_dir):
+    return Path(workspace_dir) if workspace_dir else Path(__file__).resolve().parent.parent
 
-        with open(test_file, "r") as f:
-            test_code = f.read()
 
-    except FileNotFoundError as e:
-        print(f"Missing file: {e}")
-        return
-
-    try:
-    
-        final_prompt = ChatPromptTemplate.from_messages([
-            ('system', prompt),
-            ('human','{input}')
-        ])
+def _read_artifact(store, kind, name, path):
+    """
+    Reads an artifact through the run's store when there is one (memory
+    first, the file on demand), otherwise straight from `path`.
+    """
+    if store is not None:
+        return store.get(kind, name, path=path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
 
-        chain = final_prompt | llm | parser
 
-        response = chain.invoke({
-            "spec_content":spec_content,
-            "test_code":test_code,
-            "ouptut_test_code": output,
-            "page_name":page_name,
+def load_spec(workspace_dir=None, store=None):
+    return _read_artifact(store, "spec", "functional_specifications", _base_dir(workspace_dir) / "outputs" / "functional_specifications.md")
 
-            "input":"Generate concise report based on the information provided information."
-        }
-        )
 
-        report_md = response
+def report_path_for(page_name, workspace_dir=None):
+    return _base_dir(workspace_dir) / "reports" / f"final_report_{page_name}.md"
 
-        with open(report_output, "w") as f:
-            f.write(report_md)
-
-        print(f" Final LLM-generated report saved to: {report_output}")
-
-    except Exception as e:
-        print(f" OpenAI Error: {e}")
 
+def build_report_variables(page_name, spec_content, workspace_dir=None, store=None):
+    """
+    Builds the GENERATE_REPORTS prompt inputs for one page: the spec, the
+    test code and the tail of the test's output. Raises FileNotFoundError if
+    the page has no generated test.
+    """
+    base_dir = _base_dir(workspace_dir)
+    test_file = base_dir / "tests" / "selenium" / f"test_{page_name}.py"
+    output_file = base_dir / "testcase_output" / f"output_test_{page_name}.txt"
 
-# if __name__ == "__main__":
-#     generate_llm_report("register")
-#     generate_llm_report("login")
-#     generate_llm_report("polls_list")
+    test_code = _read_artifact(store, "test_code", page_name, test_file)
+    try:
+        test_output = _read_artifact(store, "test_output", page_name, output_file)
+    except FileNotFoundError:
+        test_output = "The test has not been run; no output was recorded."
+    if len(test_output) > REPORT_MAX_TEST_OUTPUT_CHARS:
+        test_output = "[... earlier output truncated ...]\n" + test_output[-REPORT_MAX_TEST_OUTPUT_CHARS:]
+
+    return {
+        "spec_content":spec_content,
+        "test_code":test_code,
+        "test_output": test_output,
+        "page_name":page_name,
+
+        "input":REPORT_INSTRUCTION
+    }
+
+
+def _fail_unwritten_reports(store, results):
+    """
+    Waits for the store's background report writes and turns each one that
+    failed into that page's error, leaving the other pages' reports alone.
+    """
+    for (kind, page_name), error in store.flush().items():
+        if kind in ("report", "report_html") and results.get(page_name, {}).get("path"):
+            results[page_name] = {"path": None, "error": f"Could not write report: {error}"}
+
+
+def generate_llm_reports(page_names, prompt, llm, parser, workspace_dir=None, max_concurrency=REPORT_MAX_CONCURRENCY, store=None):
+    """
+    Generates the reports for many pages in one batched chain call: the spec
+    is read once, every page's inputs are built up front, and each report is
+    written as soon as its response returns. With the run's artifact `store`,
+    inputs the run already holds are not re-read and reports are written in
+    the background; they are all on disk (or their page has an error) by the
+    time this returns.
+
+    Returns:
+        dict: page_name -> {"path": report path or None, "error": message or None}.
+            A page that fails (missing test, model error) does not stop the others.
+    """
+    spec_content = load_spec(workspace_dir, store)
+    results, batch_pages, batch_variables = {}, [], []
+    for page_name in page_names:
+        try:
+            batch_variables.append(build_report_variables(page_name, spec_content, workspace_dir, store))
+            batch_pages.append(page_name)
+        except FileNotFoundError as e:
+            results[page_name] = {"path": None, "error": f"Missing file: {e}"}
+
+    if batch_pages:
+        logging.info(f"Generating {len(batch_pages)} report(s) with max_concurrency={max_concurrency}.")
+    metadata = [{"route": page_name} for page_name in batch_pages]
+    for index, response in batch_chain(prompt, batch_variables, llm, parser, max_concurrency, metadata_list=metadata):
+        page_name = batch_pages[index]
+        if isinstance(response, Exception):
+            results[page_name] = {"path": None, "error": f"OpenAI Error: {response}"}
+            continue
+        report_output = report_path_for(page_name, workspace_dir)
+        try:
+            with span("write report", "report", route=page_name):
+                if store is not None:
+                    store.put("report", page_name, response, path=report_output)
+                else:
+                    report_output.parent.mkdir(parents=True, exist_ok=True)
+                    with open(report_output, "w") as f:
+                        f.write(response)
+        except OSError as e:
+            results[page_name] = {"path": None, "error": f"Could not write report: {e}"}
+            continue
+        logging.info(f"Final LLM-generated report saved to: {report_output}")
+        results[page_name] = {"path": str(report_output), "error": None}
+
+    if store is not None:
+        _fail_unwritten_reports(store, results)
+    return {page_name: results[page_name] for page_name in page_names}
+
+
+def observation_variables(result):
+    """
+    Builds the REPORT_OBSERVATIONS prompt inputs for one route: a compact
+    summary of its structured result, without the spec or the test code.
+    """
+    lines = [
+        f"- Route: {result['path']}",
+        f"- Status: {result['status']} (exit code {result['exit_code']}, {result['duration']}s)",
+        f"- Assertions: {len(result['assertions'])}"
+        + "".join(f"; `{a['expression']}` {a['outcome']}" for a in result["assertions"] if a["outcome"] == "failed"),
+        f"- Test inputs: {', '.join(repr(i['value']) for i in result['inputs']) or 'none'}",
+        f"- Screenshots captured: {', '.join(p for p, s in result['screenshots'].items() if s['exists']) or 'none'}",
+    ]
+    lines += [f"- {e['type']}: {e['message']}" for e in result["errors"][:3]]
+    if result["status"] != "passed" and result["output_tail"]:
+        lines.append("- Output tail:\n" + result["output_tail"][-OBSERVATION_OUTPUT_CHARS:])
+    return {"page_name": result["page"], "result_summary": "\n".join(lines), "input": OBSERVATIONS_INSTRUCTION}
+
+
+def generate_template_reports(route_results, spec_content, workspace_dir=None, prompt=None, llm=None, parser=None,
+                              max_concurrency=REPORT_MAX_CONCURRENCY, store=None, html=REPORT_HTML):
+    """
+    Renders each route's report locally from its structured result (see
+    core.test_results) into reports/final_report_<page>.md, plus a .html
+    twin with `html`. With a `prompt` and `llm`, only the observations
+    paragraph comes from the model, for all routes in one batched call; a
+    route whose call fails gets the locally written paragraph instead.
+
+    Returns:
+        dict: page_name -> {"path": report path or None, "error": message or None},
+            in the same shape as `generate_llm_reports`.
+    """
+    results, to_render = {}, []
+    for result in route_results:
+        if result["test_file"] is None:
+            results[result["page"]] = {"path": None, "error": f"Missing file: no generated test for {result['page']}"}
+        else:
+            to_render.append(result)
+
+    observations = {result["page"]: default_observations(result) for result in to_render}
+    if prompt is not None and llm is not None and to_render:
+        logging.info(f"Requesting observations for {len(to_render)} report(s) with max_concurrency={max_concurrency}.")
+        metadata = [{"route": result["page"]} for result in to_render]
+        variables = [observation_variables(result) for result in to_render]
+        for index, response in batch_chain(prompt, variables, llm, parser, max_concurrency, metadata_list=metadata):
+            page_name = to_render[index]["page"]
+            if isinstance(response, Exception):
+                logging.warning(f"Observations for {page_name} fell back to the template: {response}")
+            elif response.strip():
+                observations[page_name] = response.strip()
+
+    for result in to_render:
+        page_name = result["page"]
+        report_output = report_path_for(page_name, workspace_dir)
+        report_dir = str(report_output.parent)
+        spec_section = spec_section_for(spec_content, page_name, result["path"])
+        rendered = [(report_output, "report", render_markdown_report(result, spec_section, observations[page_name], report_dir))]
+        if html:
+            rendered.append((report_output.with_suffix(".html"), "report_html",
+                             render_html_report(result, spec_section, observations[page_name], report_dir)))
+        try:
+            with span("write report", "report", route=page_name):
+                for path, kind, content in rendered:
+                    if store is not None:
+                        store.put(kind, page_name, content, path=path)
+                    else:
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        with open(path, "w", encoding="utf-8") as f:
+                            f.write(content)
+        except OSError as e:
+            results[page_name] = {"path": None, "error": f"Could not write report: {e}"}
+            continue
+        logging.info(f"Final report rendered to: {report_output}")
+        results[page_name] = {"path": str(report_output), "error": None}
+
+    if store is not None:
+        _fail_unwritten_reports(store, results)
+    return {result["page"]: results[result["page"]] for result in route_results}
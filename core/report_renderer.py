@@ -0,0 +1,213 @@
+import html
+import os
+import re
+from string import Template
+
+# Longest spec excerpt quoted in a report.
+SPEC_SECTION_MAX_CHARS = 2000
+
+STATUS_LABELS = {
+    "passed": "✅ Passed",
+    "failed": "❌ Failed",
+    "error": "⚠️ Error",
+    "timeout": "⏱️ Timed out",
+    "not_run": "⏭️ Not run",
+}
+
+MARKDOWN_TEMPLATE = Template("""# Final QA Report for $page Page
+
+**Route:** `$path`
+**Result:** $status_label
+**Exit code:** $exit_code
+**Duration:** $duration
+
+## Functional Specification
+
+$spec_section
+
+## Test Strategy
+
+The generated Selenium script `$test_file` loads `$path`, takes a screenshot, fills in and submits the page's form, then takes a second screenshot.
+
+$assertions
+
+## Test Inputs
+
+$inputs
+
+## Errors
+
+$errors
+
+## Screenshots
+
+$screenshots
+
+## Observations
+
+$observations
+""")
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Final QA Report for $page Page</title>
+<style>
+body { font-family: sans-serif; max-width: 60rem; margin: 2rem auto; line-height: 1.5; }
+.status { font-weight: bold; }
+.status-passed { color: #1a7f37; } .status-failed, .status-error, .status-timeout { color: #cf222e; } .status-not_run { color: #6e7781; }
+pre { background: #f6f8fa; padding: 1rem; overflow-x: auto; }
+img { max-width: 100%; border: 1px solid #d0d7de; }
+table { border-collapse: collapse; } td, th { border: 1px solid #d0d7de; padding: 0.25rem 0.5rem; text-align: left; }
+</style>
+</head>
+<body>
+<h1>Final QA Report for $page Page</h1>
+<table>
+<tr><th>Route</th><td><code>$path</code></td></tr>
+<tr><th>Result</th><td class="status status-$status">$status_label</td></tr>
+<tr><th>Exit code</th><td>$exit_code</td></tr>
+<tr><th>Duration</th><td>$duration</td></tr>
+</table>
+<h2>Functional Specification</h2>
+<pre>$spec_section</pre>
+<h2>Test Strategy</h2>
+<p>The generated Selenium script <code>$test_file</code> loads <code>$path</code>, takes a screenshot, fills in and submits the page's form, then takes a second screenshot.</p>
+$assertions
+<h2>Test Inputs</h2>
+$inputs
+<h2>Errors</h2>
+$errors
+<h2>Screenshots</h2>
+$screenshots
+<h2>Observations</h2>
+<p>$observations</p>
+</body>
+</html>
+""")
+
+
+def spec_section_for(spec_content, page_name, path):
+    """
+    Picks the parts of the functional spec about one page: the sections whose
+    heading names the page, else the lines that mention its path in backticks.
+
+    Returns:
+        str: The excerpt (cut to SPEC_SECTION_MAX_CHARS), or "" if nothing matches.
+    """
+    names = {page_name.lower(), page_name.replace("_", " ").lower()}
+    sections, current = [], None
+    for line in spec_content.splitlines():
+        if line.lstrip().startswith("#"):
+            heading = line.strip("# ").lower()
+            current = [line] if any(name in heading for name in names) else None
+            if current is not None:
+                sections.append(current)
+        elif current is not None:
+            current.append(line)
+    excerpt = "\n\n".join("\n".join(section).strip() for section in sections)
+    if not excerpt:
+        quoted_path = re.compile(r"`" + re.escape(path or "/") + r"`")
+        excerpt = "\n".join(line for line in spec_content.splitlines() if quoted_path.search(line))
+    if len(excerpt) > SPEC_SECTION_MAX_CHARS:
+        excerpt = excerpt[:SPEC_SECTION_MAX_CHARS].rstrip() + "\n[...]"
+    return excerpt.strip()
+
+
+def default_observations(result):
+    """
+    The observations paragraph written without a model, from the result alone.
+    """
+    page, status = result["page"], result["status"]
+    if status == "not_run":
+        return f"The test for the {page} page did not run, so its behaviour is unverified."
+    duration = f" in {result['duration']}s" if result["duration"] is not None else ""
+    checks = len(result["assertions"])
+    if status == "passed":
+        screenshots = sum(1 for s in result["screenshots"].values() if s["exists"])
+        return (f"The {page} page passed{duration}: {checks} assertion(s) held and "
+                f"{screenshots} of 2 screenshots were captured.")
+    first_error = result["errors"][0] if result["errors"] else None
+    cause = f" with {first_error['type']}: {first_error['message']}" if first_error else ""
+    if status == "timeout":
+        return f"The test for the {page} page timed out{duration}{cause}."
+    return f"The test for the {page} page {'failed' if status == 'failed' else 'errored'}{duration}{cause}."
+
+
+def _relative(path, report_dir):
+    try:
+        return os.path.relpath(path, report_dir).replace(os.sep, "/")
+    except ValueError:
+        # Different drives on Windows.
+        return path
+
+
+def _fields(result, spec_section, observations):
+    return {
+        "page": result["page"],
+        "path": result["path"] or "/",
+        "status": result["status"],
+        "status_label": STATUS_LABELS.get(result["status"], result["status"]),
+        "exit_code": "-" if result["exit_code"] is None else result["exit_code"],
+        "duration": "-" if result["duration"] is None else f"{result['duration']}s",
+        "test_file": os.path.basename(result["test_file"]) if result["test_file"] else f"test_{result['page']}.py",
+        "spec_section": spec_section or "No section of the functional specification covers this page.",
+        "observations": observations,
+    }
+
+
+def render_markdown_report(result, spec_section, observations, report_dir):
+    """
+    Renders one route's report as Markdown from its structured result.
+    Screenshot links are relative to `report_dir`, where the report is saved.
+    """
+    fields = _fields(result, spec_section, observations)
+    if result["assertions"]:
+        fields["assertions"] = "Assertions checked:\n\n" + "\n".join(
+            f"- `{a['expression']}` (line {a['line']}): {a['outcome']}" for a in result["assertions"]
+        )
+    else:
+        fields["assertions"] = "The script makes no explicit assertions; it passes if it runs to completion."
+    fields["inputs"] = "\n".join(
+        f"- `{i['method']}`: `{i['value']}`" for i in result["inputs"]
+    ) or "No literal test data is entered."
+    errors = "\n".join(f"- **{e['type']}**: {e['message']}" for e in result["errors"])
+    if result["status"] != "passed" and result["output_tail"]:
+        errors += ("\n\n" if errors else "") + "Test output (tail):\n\n```\n" + result["output_tail"].strip() + "\n```"
+    fields["errors"] = errors or "None."
+    fields["screenshots"] = "\n".join(
+        f"- {phase.capitalize()}: ![{phase} {result['page']}]({_relative(shot['path'], report_dir)})"
+        + ("" if shot["exists"] else " _(not captured)_")
+        for phase, shot in result["screenshots"].items()
+    )
+    return MARKDOWN_TEMPLATE.substitute(fields)
+
+
+def render_html_report(result, spec_section, observations, report_dir):
+    """
+    Renders one route's report as a standalone HTML page from its structured result.
+    """
+    fields = {key: html.escape(str(value)) for key, value in _fields(result, spec_section, observations).items()}
+    if result["assertions"]:
+        fields["assertions"] = "<ul>\n" + "\n".join(
+            f"<li><code>{html.escape(a['expression'])}</code> (line {a['line']}): {a['outcome']}</li>" for a in result["assertions"]
+        ) + "\n</ul>"
+    else:
+        fields["assertions"] = "<p>The script makes no explicit assertions; it passes if it runs to completion.</p>"
+    fields["inputs"] = ("<ul>\n" + "\n".join(
+        f"<li><code>{html.escape(i['method'])}</code>: <code>{html.escape(i['value'])}</code></li>" for i in result["inputs"]
+    ) + "\n</ul>") if result["inputs"] else "<p>No literal test data is entered.</p>"
+    errors = "".join(f"<li><strong>{html.escape(e['type'])}</strong>: {html.escape(e['message'])}</li>" for e in result["errors"])
+    errors = f"<ul>{errors}</ul>" if errors else ""
+    if result["status"] != "passed" and result["output_tail"]:
+        errors += f"<pre>{html.escape(result['output_tail'].strip())}</pre>"
+    fields["errors"] = errors or "<p>None.</p>"
+    fields["screenshots"] = "\n".join(
+        f"<figure><figcaption>{phase.capitalize()}</figcaption>"
+        + (f'<img src="{html.escape(_relative(shot["path"], report_dir))}" alt="{phase} {html.escape(result["page"])}">'
+           if shot["exists"] else "<p><em>Not captured.</em></p>")
+        + "</figure>"
+        for phase, shot in result["screenshots"].items()
+    )
+    return HTML_TEMPLATE.substitute(fields)
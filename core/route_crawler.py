@@ -0,0 +1,145 @@
+import posixpath
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from config import CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES, CRAWL_DENY_PATTERN
+from core.http_fetcher import get_page_fetcher
+from logger import logging
+
+# Links to these are assets, not pages worth testing.
+SKIPPED_EXTENSIONS = {
+    ".css", ".js", ".map", ".json", ".xml", ".txt", ".pdf", ".zip",
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".woff", ".woff2", ".ttf", ".eot",
+}
+SKIPPED_SCHEMES = ("mailto:", "tel:", "javascript:", "data:")
+
+
+class LinkExtractor(HTMLParser):
+    """
+    Collects the link targets (`a`/`area` hrefs) and form endpoints of a page.
+    A form without an action posts to the page itself, so it adds nothing.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.form_actions = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("a", "area") and attrs.get("href"):
+            self.links.append(attrs["href"])
+        elif tag == "form" and attrs.get("action"):
+            self.form_actions.append(attrs["action"])
+
+
+def normalize_url(url, base_url):
+    """
+    Resolves `url` against `base_url` and returns its same-origin path in a
+    canonical form (no fragment, query, duplicate slashes or dot segments,
+    trailing slash kept as written), or None for other origins and assets.
+    """
+    url = url.strip()
+    if not url or url.startswith("#") or url.lower().startswith(SKIPPED_SCHEMES):
+        return None
+
+    absolute = urlsplit(urljoin(base_url, url))
+    origin = urlsplit(base_url)
+    if absolute.scheme.lower() not in ("http", "https") or absolute.netloc.lower() != origin.netloc.lower():
+        return None
+
+    path = re.sub(r"/{2,}", "/", absolute.path or "/")
+    trailing_slash = path.endswith("/")
+    path = posixpath.normpath(path)
+    if path in (".", "//"):
+        path = "/"
+    if trailing_slash and not path.endswith("/"):
+        path += "/"
+
+    if posixpath.splitext(path)[1].lower() in SKIPPED_EXTENSIONS:
+        return None
+    return path
+
+
+def is_denied(path, deny_pattern=CRAWL_DENY_PATTERN):
+    """
+    Whether the crawler must not fetch `path` (see CRAWL_DENY_PATTERN).
+    """
+    return bool(deny_pattern) and path != "/" and re.search(deny_pattern, path, re.IGNORECASE) is not None
+
+
+def route_name_for(path, taken):
+    """
+    Derives a page name such as `polls_add` from `/polls/add/`, unique within `taken`.
+    """
+    name = re.sub(r"[^a-z0-9]+", "_", path.lower()).strip("_") or "home"
+    unique, suffix = name, 2
+    while unique in taken:
+        unique, suffix = f"{name}_{suffix}", suffix + 1
+    taken.add(unique)
+    return unique
+
+
+def crawl_routes(base_url, fetcher=None, max_depth=CRAWL_MAX_DEPTH, max_pages=CRAWL_MAX_PAGES, seed_paths=(),
+                 deny_pattern=CRAWL_DENY_PATTERN):
+    """
+    Breadth-first crawl of the sandbox app from its home page, following
+    same-origin links and form actions up to `max_depth` hops and `max_pages`
+    pages. Each BFS level is fetched concurrently through the page fetcher.
+    `seed_paths` (e.g. routes from the URLconf) start at depth 0 alongside
+    the home page, so pages nothing links to are still found. Paths matching
+    `deny_pattern` (logout, delete, admin, ...) are never fetched.
+
+    Returns:
+        dict: {"routes": [(page_name, path), ...] in discovery order,
+               "pages_visited": int, "denied": [path, ...]}
+    """
+    fetcher = fetcher or get_page_fetcher()
+    origin = base_url.rstrip("/")
+    visited = {"/"}
+    frontier, denied = ["/"], []
+    for path in seed_paths:
+        if path in visited or path in denied or len(visited) >= max_pages:
+            continue
+        if is_denied(path, deny_pattern):
+            denied.append(path)
+        else:
+            visited.add(path)
+            frontier.append(path)
+    routes, taken = [], set()
+    pages_visited = 0
+
+    for depth in range(max_depth + 1):
+        if not frontier:
+            break
+        fetcher.prefetch(f"{origin}{path}" for path in frontier)
+        next_frontier = []
+        for path in frontier:
+            html = fetcher.fetch(f"{origin}{path}")
+            if html is None:
+                continue
+            pages_visited += 1
+            routes.append((route_name_for(path, taken), path))
+
+            if depth == max_depth:
+                continue
+            extractor = LinkExtractor()
+            extractor.feed(html)
+            page_url = f"{origin}{path}"
+            # A form's endpoint is a route to test even when no link points to it.
+            for href in extractor.links + extractor.form_actions:
+                target = normalize_url(href, page_url)
+                if not target or target in visited or target in denied or len(visited) >= max_pages:
+                    continue
+                if is_denied(target, deny_pattern):
+                    denied.append(target)
+                else:
+                    visited.add(target)
+                    next_frontier.append(target)
+        frontier = next_frontier
+
+    if denied:
+        logging.info(f"Crawler skipped {len(denied)} denied path(s): {', '.join(denied)}")
+    logging.info(f"Crawled {pages_visited} page(s) from {base_url}: {len(routes)} routes.")
+    return {"routes": routes, "pages_visited": pages_visited, "denied": denied}
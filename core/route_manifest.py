@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from config import HTML_REDUCTION_LEVEL
+from core.html_reducer import HtmlReducer
+
+# 2: prompt_hash also covers the model and the HTML reduction level.
+MANIFEST_VERSION = 2
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def page_fingerprint(html):
+    """
+    Hashes the normalized DOM of a page: the structural reduction (no scripts,
+    styles, CSRF tokens or presentational attributes) with whitespace collapsed,
+    so only changes to what a test interacts with alter the fingerprint.
+    """
+    reducer = HtmlReducer("structural")
+    reducer.feed(html)
+    normalized = re.sub(r"\s+", " ", reducer.close()).strip()
+    return _sha256(normalized)
+
+
+def generation_key(prompt, model=None, reduction_level=HTML_REDUCTION_LEVEL):
+    """
+    Hashes everything that shapes a generated script besides the page: the
+    test prompt, the model that answers it and how much of the page it sees.
+    """
+    return _sha256(json.dumps([prompt, model, reduction_level]))
+
+
+def file_fingerprint(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return _sha256(f.read())
+
+
+class RouteManifest:
+    """
+    Per-workspace JSON index of every route's page fingerprint, generated test
+    and last test outcome. It lets a run regenerate tests and reports only for
+    routes whose page changed since the previous run.
+
+    Each entry looks like:
+        {"path": "/login/", "page_hash": ..., "prompt_hash": ..., "script": ...,
+         "test_hash": ..., "html_reduction_stats": {...}, "last_outcome": {...},
+         "updated_at": ...}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.routes = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.routes = data.get("routes", {})
+
+    def reusable_script(self, page_name, path, page_hash, prompt, model=None, reduction_level=HTML_REDUCTION_LEVEL):
+        """
+        Returns the manifest entry if the route's page, test prompt, model and
+        HTML reduction level are unchanged and its script is still on disk as
+        generated, else None.
+        """
+        with self._lock:
+            entry = self.routes.get(page_name)
+        if not entry:
+            return None
+        if (entry.get("path"), entry.get("page_hash"), entry.get("prompt_hash")) != (path, page_hash, generation_key(prompt, model, reduction_level)):
+            return None
+        script = entry.get("script")
+        if not script or not os.path.exists(script) or file_fingerprint(script) != entry.get("test_hash"):
+            return None
+        return entry
+
+    def record_generation(self, page_name, path, page_hash, prompt, script, html_reduction_stats, model=None, reduction_level=HTML_REDUCTION_LEVEL):
+        with self._lock:
+            entry = self.routes.setdefault(page_name, {})
+            entry.update(
+                path=path,
+                page_hash=page_hash,
+                prompt_hash=generation_key(prompt, model, reduction_level),
+                script=script,
+                test_hash=file_fingerprint(script),
+                html_reduction_stats=html_reduction_stats,
+                updated_at=time.time()
+            )
+            self._save()
+
+    def record_outcome(self, page_name, test_result):
+        """
+        Stores the route's latest test outcome and returns True if it differs
+        from the previous one (pass/fail, timeout or memory limit).
+        """
+        outcome = {
+            "passed": test_result.get("exit_code") == 0,
+            "exit_code": test_result.get("exit_code"),
+            "timed_out": bool(test_result.get("timed_out")),
+            "memory_exceeded": bool(test_result.get("memory_exceeded")),
+        }
+        with self._lock:
+            entry = self.routes.setdefault(page_name, {})
+            previous = entry.get("last_outcome")
+            entry["last_outcome"] = outcome
+            self._save()
+        return previous != outcome
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "routes": self.routes}, f, indent=2)
+        os.replace(tmp_path, self.path)
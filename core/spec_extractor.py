@@ -1,30 +1,23 @@
 import os
 import re
-import requests
-import openai
-from dotenv import load_dotenv
-from pathlib import Path 
-from langchain_core.prompts import ChatPromptTemplate
-
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+from pathlib import Path
+from core.llm_cache import invoke_chain, stream_chain
+from core.llm_stream import CodeFenceTracker, StreamingFileWriter, StreamAborted
+from core.http_fetcher import get_page_fetcher
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-INPUT_SPEC = BASE_DIR / "outputs" / "functional_specifications.md"
-TESTS_OUTPUT_DIR = BASE_DIR / "tests" / "selenium"
 SCREENSHOTS_DIR = BASE_DIR / "screenshots"
+# Fallback for standalone use; the workflow passes the sandbox base URL from RepoState.
 BASE_URL = "http://localhost:8000"
 
-os.makedirs(TESTS_OUTPUT_DIR, exist_ok=True)
-os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
-
 
-def extract_routes_from_markdown(md_path):
+def extract_routes_from_spec(content):
+    """
+    Parses the `**Page Name (`/path`)**` entries of a functional spec into
+    [(page_name, path), ...].
+    """
     routes = []
-    with open(md_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
     pattern = r"\*\*(.*?) \(`/([^`]+)`\)"
     matches = re.findall(pattern, content)
     for name, path in matches:
@@ -32,43 +25,75 @@ def extract_routes_from_markdown(md_path):
     return routes
 
 
-def fetch_html_from_url(path):
-    url = f"{BASE_URL}{path}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        print(f"[✓] Fetched {url}")
-        return response.text
-    except requests.RequestException as e:
-        print(f"[✗] Failed to fetch {url}: {e}")
-        return None
+def fetch_html_from_url(path, base_url=BASE_URL, fetcher=None):
+    """
+    Fetches `base_url + path` through the shared page fetcher (pooled, retried,
+    cached for the run). Returns the HTML, or None if it could not be fetched.
+    """
+    url = f"{base_url}{path}"
+    html = (fetcher or get_page_fetcher()).fetch(url)
+    if html is None:
+        print(f"[✗] Failed to fetch {url}")
+    return html
 
 
-def get_selenium_test_from_html(html_content, page_name, path, prompt, llm, parser):
+def get_selenium_test_from_html(html_content, page_name, path, prompt, llm, parser, extra_variables=None):
     screenshot_before_path = str(SCREENSHOTS_DIR / f"before_{page_name}.png").replace('\\', '/')
     screenshot_after_path = str(SCREENSHOTS_DIR / f"after_{page_name}.png").replace('\\', '/')
 
     try:
-        final_prompt = ChatPromptTemplate.from_messages([
-            ('system', prompt),
-            ('human','{input}')
-        ])
-
-        chain = final_prompt | llm | parser
-
-        response = chain.invoke({
+        response = invoke_chain(prompt, {
             "page_name":page_name,
             "html_content":html_content,
             "path":path,
-            "input":"Generate syntactically and semantically accurate selenium testcases for the given page."
-        }
-        )
+            "input":"Generate syntactically and semantically accurate selenium testcases for the given page.",
+            **(extra_variables or {})
+        }, llm, parser)
 
         return response
     except Exception as e:
         print(f"[✗] OpenAI error for {path}: {e}")
         return None
 
+def stream_selenium_test_to_file(html_content, page_name, path, prompt, llm, parser, filename, extra_variables=None):
+    """
+    Streaming variant of `get_selenium_test_from_html` + `save_test_script`:
+    code lines are written to `filename` as they arrive, reading stops at the
+    closing code fence, and the generation is cancelled early if the model
+    answers with prose or runs past the length ceiling.
+
+    Returns:
+        tuple: (the script code, stream stats: ttfb_ms, duration_ms, chunks, chunks_per_sec, ...).
+
+    Raises:
+        StreamAborted: the generation was cancelled; no file is left behind.
+    """
+    tracker = CodeFenceTracker()
+    writer = StreamingFileWriter(filename)
+
+    def on_text(chunk):
+        writer.write(tracker.feed(chunk))
+        return tracker.done
+
+    try:
+        _, stats = stream_chain(prompt, {
+            "page_name":page_name,
+            "html_content":html_content,
+            "path":path,
+            "input":"Generate syntactically and semantically accurate selenium testcases for the given page.",
+            **(extra_variables or {})
+        }, llm, parser, on_text)
+        writer.write(tracker.close())
+        if not writer.chars:
+            raise StreamAborted("The response contained no code.")
+    except Exception:
+        writer.discard()
+        raise
+    writer.commit()
+    print(f"[✓] Streamed script to {filename} (TTFB {stats['ttfb_ms']} ms)")
+    return writer.text, stats
+
+
 def clean_gpt_generated_code(raw_code: str) -> str:
     raw_code = raw_code.strip()
 
@@ -86,22 +111,8 @@ def clean_gpt_generated_code(raw_code: str) -> str:
 
 def save_test_script(code, filename):
     cleaned_code = clean_gpt_generated_code(code)
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
     with open(filename, "w", encoding="utf-8") as f:
         f.write(cleaned_code)
     print(f"[✓] Cleaned & saved script to {filename}")
-
-
-
-# if __name__ == "__main__":
-#     routes = extract_routes_from_markdown(INPUT_SPEC)
-
-#     for name, path in routes:
-#         html = fetch_html_from_url(path)
-#         if not html:
-#             continue
-
-#         test_code = get_selenium_test_from_html(html, name, path)
-#         if not test_code:
-#             continue
-
-#         save_test_script(test_code, os.path.join(TESTS_OUTPUT_DIR, f"test_{name}.py"))
+    return cleaned_code
@@ -0,0 +1,239 @@
+import ast
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from config import REPORT_MAX_TEST_OUTPUT_CHARS
+
+# Status of a route's test, most to least severe. JUnit has no "timeout", so
+# timeouts are reported there as errors.
+STATUSES = ("error", "timeout", "failed", "not_run", "passed")
+
+# `File ".../test_home.py", line 27, in main`
+TRACEBACK_FRAME = re.compile(r'File "([^"]+)", line (\d+)')
+# The exception line ending a traceback, e.g. "AssertionError: page has no form".
+EXCEPTION_LINE = re.compile(r"^([A-Za-z_][\w.]*(?:Error|Exception|Timeout\w*|Exit|Interrupt))(?::\s*(.*))?$")
+
+# Selenium calls whose literal arguments are the data a test types or picks.
+INPUT_METHODS = ("send_keys", "select_by_visible_text", "select_by_value")
+
+
+def _tail(text, limit=REPORT_MAX_TEST_OUTPUT_CHARS):
+    if len(text) <= limit:
+        return text
+    return "[... earlier output truncated ...]\n" + text[-limit:]
+
+
+def _read(store, kind, name, path):
+    try:
+        if store is not None:
+            return store.get(kind, name, path=path)
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def parse_test_code(test_code):
+    """
+    Pulls the checks and test data out of a generated script without running it.
+
+    Returns:
+        dict: "assertions" ([{"line", "expression"}] for every assert
+        statement) and "inputs" ([{"line", "method", "value"}] for every
+        literal passed to send_keys / select_by_*). Both are empty if the
+        code does not parse.
+    """
+    try:
+        tree = ast.parse(test_code)
+    except SyntaxError:
+        return {"assertions": [], "inputs": []}
+
+    assertions, inputs = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assert):
+            assertions.append({"line": node.lineno, "expression": ast.get_source_segment(test_code, node.test) or ""})
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in INPUT_METHODS:
+            for arg in node.args:
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                    inputs.append({"line": node.lineno, "method": node.func.attr, "value": arg.value})
+    return {
+        "assertions": sorted(assertions, key=lambda a: a["line"]),
+        "inputs": sorted(inputs, key=lambda i: i["line"]),
+    }
+
+
+def parse_test_output(output, test_file=None):
+    """
+    Finds what went wrong in a test's captured output: the exception ending
+    each traceback and every "[ERROR] ..." line the runners write.
+
+    Returns:
+        dict: "errors" ([{"type", "message"}]) and "failed_line" (the last
+        line of `test_file` a traceback passed through, or None).
+    """
+    errors, failed_line = [], None
+    test_name = os.path.basename(test_file) if test_file else None
+    in_traceback = False
+    for line in output.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("Traceback (most recent call last)"):
+            in_traceback = True
+            continue
+        if in_traceback:
+            frame = TRACEBACK_FRAME.search(stripped)
+            if frame:
+                if test_name and os.path.basename(frame.group(1)) == test_name:
+                    failed_line = int(frame.group(2))
+                continue
+            match = EXCEPTION_LINE.match(stripped)
+            if match:
+                errors.append({"type": match.group(1).rsplit(".", 1)[-1], "message": (match.group(2) or "").strip()})
+                in_traceback = False
+        elif stripped.startswith("[ERROR]"):
+            message = stripped[len("[ERROR]"):].strip()
+            # The harness repeats the exception it just printed the traceback for.
+            if not errors or errors[-1]["message"] != message:
+                errors.append({"type": "RunnerError", "message": message})
+    return {"errors": errors, "failed_line": failed_line}
+
+
+def _status(test_result, errors, route_error=None):
+    if not test_result:
+        # A test that could not be generated is a broken route, not a skipped one.
+        return "error" if route_error else "not_run"
+    if test_result.get("timed_out"):
+        return "timeout"
+    if test_result.get("exit_code") == 0:
+        return "passed"
+    if test_result.get("memory_exceeded") or test_result.get("exit_code") is None:
+        return "error"
+    # An assertion (ours or Selenium's) is a failed check; anything else broke the test.
+    if errors and errors[0]["type"] in ("AssertionError", "NoSuchElementException", "TimeoutException"):
+        return "failed"
+    return "error"
+
+
+def _screenshot(paths, name):
+    path = os.path.abspath(os.path.join(paths["screenshots_dir"], name))
+    return {"path": path, "exists": os.path.exists(path)}
+
+
+def build_route_result(page_name, path, test_result, paths, store=None, route_error=None):
+    """
+    Builds the structured result of one route's test from its run record, its
+    generated script and its captured output (read through the run's artifact
+    `store` when given).
+
+    Args:
+        page_name (str): Route name, e.g. "home".
+        path (str): URL path of the route.
+        test_result (dict): The route's `test_results` entry, or None if the test never ran.
+        paths (dict): The run's `workspace_paths`.
+        store (ArtifactStore): The run's artifact store, or None to read files directly.
+        route_error (str): Why the route's test could not be generated or run, if it could not.
+
+    Returns:
+        dict: page, path, status, exit_code, duration, timed_out,
+        memory_exceeded, test_file, output_path, assertions, inputs,
+        screenshots, errors and output_tail.
+    """
+    test_file = os.path.join(paths["tests_dir"], f"test_{page_name}.py")
+    output_path = (test_result or {}).get("output_path") or os.path.join(paths["testcase_output_dir"], f"output_test_{page_name}.txt")
+
+    test_code = _read(store, "test_code", page_name, test_file)
+    output = _read(store, "test_output", page_name, output_path) if test_result else ""
+    code = parse_test_code(test_code or "")
+    parsed_output = parse_test_output(output or "", test_file)
+    errors = parsed_output["errors"]
+    if route_error:
+        errors = [{"type": "GenerationError", "message": route_error}] + errors
+    status = _status(test_result, errors, route_error)
+
+    for assertion in code["assertions"]:
+        if status == "passed":
+            assertion["outcome"] = "passed"
+        elif parsed_output["failed_line"] == assertion["line"]:
+            assertion["outcome"] = "failed"
+        else:
+            assertion["outcome"] = "unknown"
+
+    return {
+        "page": page_name,
+        "path": path,
+        "status": status,
+        "exit_code": (test_result or {}).get("exit_code"),
+        "duration": (test_result or {}).get("duration"),
+        "timed_out": bool((test_result or {}).get("timed_out")),
+        "memory_exceeded": bool((test_result or {}).get("memory_exceeded")),
+        "test_file": test_file if test_code is not None else None,
+        "output_path": output_path if test_result else None,
+        "assertions": code["assertions"],
+        "inputs": code["inputs"],
+        "screenshots": {phase: _screenshot(paths, f"{phase}_{page_name}.png") for phase in ("before", "after")},
+        "errors": errors,
+        "output_tail": _tail(output or ""),
+    }
+
+
+def summarize_results(results):
+    """
+    Returns route counts per status and the total test time.
+    """
+    summary = {status: 0 for status in STATUSES}
+    for result in results:
+        summary[result["status"]] += 1
+    summary["total"] = len(results)
+    summary["duration"] = round(sum(r["duration"] or 0 for r in results), 3)
+    return summary
+
+
+def write_results_json(results, output_path, run_id=None):
+    """
+    Writes every route's structured result, plus a status summary, as JSON.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"run_id": run_id, "summary": summarize_results(results), "routes": results}, f, indent=4)
+    return output_path
+
+
+def to_junit_xml(results, suite_name="selenium"):
+    """
+    Renders the results as a JUnit XML document (one testsuite, one testcase
+    per route), the format CI servers import test results from.
+    """
+    summary = summarize_results(results)
+    suites = ET.Element("testsuites", tests=str(summary["total"]), time=str(summary["duration"]))
+    suite = ET.SubElement(
+        suites, "testsuite", name=suite_name, tests=str(summary["total"]),
+        failures=str(summary["failed"]), errors=str(summary["error"] + summary["timeout"]),
+        skipped=str(summary["not_run"]), time=str(summary["duration"]),
+    )
+    for result in results:
+        case = ET.SubElement(
+            suite, "testcase", classname=f"{suite_name}.{result['page']}", name=result["path"] or result["page"],
+            time=str(result["duration"] or 0),
+        )
+        if result["test_file"]:
+            case.set("file", result["test_file"])
+        first_error = result["errors"][0] if result["errors"] else {"type": result["status"], "message": ""}
+        message = first_error["message"] or f"Test {result['status']} (exit code {result['exit_code']})"
+        if result["status"] == "failed":
+            ET.SubElement(case, "failure", message=message, type=first_error["type"]).text = result["output_tail"]
+        elif result["status"] in ("error", "timeout"):
+            ET.SubElement(case, "error", message=message, type=first_error["type"]).text = result["output_tail"]
+        elif result["status"] == "not_run":
+            ET.SubElement(case, "skipped", message=message)
+        if result["output_tail"]:
+            ET.SubElement(case, "system-out").text = result["output_tail"]
+    return ET.tostring(suites, encoding="unicode")
+
+
+def write_junit_xml(results, output_path, suite_name="selenium"):
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(to_junit_xml(results, suite_name))
+    return output_path
@@ -0,0 +1,97 @@
+import ast
+import importlib.util
+import sys
+
+from config import TEST_ALLOWED_IMPORTS
+
+SCREENSHOT_METHODS = {"save_screenshot", "get_screenshot_as_file"}
+DRIVER_CONSTRUCTORS = {"Chrome", "Firefox", "Edge", "Safari", "Remote"}
+
+
+def _is_stdlib(module):
+    names = getattr(sys, "stdlib_module_names", None)
+    if names is not None:
+        return module in names or module in sys.builtin_module_names
+    # Python < 3.10: anything importable outside site-packages counts as stdlib.
+    spec = importlib.util.find_spec(module)
+    return spec is not None and "site-packages" not in (spec.origin or "")
+
+
+def _imported_modules(tree):
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name.split(".")[0], node.lineno
+        elif isinstance(node, ast.ImportFrom):
+            yield ("." * node.level) + (node.module or "").split(".")[0], node.lineno
+
+
+def _method_calls(nodes, names):
+    """
+    Returns the calls to `<anything>.<name>(...)` (for name in `names`) inside `nodes`.
+    """
+    calls = []
+    for root in nodes:
+        for node in ast.walk(root):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in names:
+                calls.append(node)
+    return calls
+
+
+def _string_fragments(tree):
+    """
+    Every string literal in the module, including the literal parts of f-strings.
+    """
+    return [node.value for node in ast.walk(tree) if isinstance(node, ast.Constant) and isinstance(node.value, str)]
+
+
+def validate_test_script(code, page_name, harness=False, allowed_imports=TEST_ALLOWED_IMPORTS):
+    """
+    Cheap static checks a generated test must pass before a browser is started
+    for it. Nothing in the script is executed.
+
+    Checks that the script compiles, only imports the standard library and
+    `allowed_imports`, saves the before/after screenshots the report expects,
+    and manages the browser as its execution mode requires: standalone scripts
+    call `driver.quit()` in a `finally` block; harness modules define
+    `run_test(driver, base_url, screenshots_dir)` and neither create nor quit a driver.
+
+    Returns:
+        list: Human-readable problems; empty if the script passed.
+    """
+    try:
+        tree = ast.parse(code)
+        compile(tree, f"test_{page_name}.py", "exec")
+    except SyntaxError as e:
+        return [f"SyntaxError on line {e.lineno}: {e.msg}"]
+
+    problems = []
+    for module, lineno in _imported_modules(tree):
+        if module.startswith("."):
+            problems.append(f"Line {lineno}: relative import '{module}' is not allowed")
+        elif module not in allowed_imports and not _is_stdlib(module):
+            problems.append(f"Line {lineno}: import of '{module}' is not allowed (allowed: standard library, {', '.join(sorted(allowed_imports))})")
+
+    if not _method_calls([tree], SCREENSHOT_METHODS):
+        problems.append("No screenshot is taken (expected driver.save_screenshot(...))")
+    # Paths are often f-strings (f"screenshots/before_{page_name}.png"), so
+    # only the literal `before_`/`after_` part can be checked reliably.
+    strings = _string_fragments(tree)
+    for phase in ("before", "after"):
+        if not any(f"{phase}_" in s for s in strings):
+            problems.append(f"Screenshot path screenshots/{phase}_{page_name}.png is missing")
+
+    if harness:
+        entry = next((n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "run_test"), None)
+        if entry is None or len(entry.args.args) < 3:
+            problems.append("Missing module-level entry point `def run_test(driver, base_url, screenshots_dir):`")
+        if _method_calls([tree], {"quit"}):
+            problems.append("Harness tests must not call driver.quit(); the harness owns the browser")
+        if _method_calls([tree], DRIVER_CONSTRUCTORS):
+            problems.append("Harness tests must not create a WebDriver; use the `driver` argument")
+    else:
+        finally_blocks = [stmt for node in ast.walk(tree) if isinstance(node, ast.Try) for stmt in node.finalbody]
+        if not _method_calls(finally_blocks, {"quit"}):
+            problems.append("driver.quit() is not called in a finally block")
+
+    return problems
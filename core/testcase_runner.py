@@ -1,34 +1,143 @@
+import os
+import signal
 import subprocess
+import sys
+import time
 from pathlib import Path
 
-def run_test_case(file: str):
+from config import TEST_TIMEOUT_SECONDS, TEST_MEMORY_LIMIT_MB
+from core.limits import browser_slot
+from core.tracing import span
+from logger import logging
+
+# How often a running test is checked against its time and memory limits.
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def _process_group_rss_mb(pgid):
+    """
+    Sums the resident memory of every process in a process group (the test
+    script plus the Chrome/chromedriver processes it spawned). Linux only;
+    returns None where /proc is unavailable.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total_pages = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # The command name may contain spaces, so split after its closing paren.
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[2]) != pgid:
+                continue
+            with open(f"/proc/{entry}/statm", "r") as f:
+                total_pages += int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return total_pages * page_size / (1024 * 1024)
+
+
+def _kill_process_tree(process):
+    """
+    Kills the test process and everything it started, so a hung Chrome does
+    not outlive its test.
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+    process.wait()
+
+
+def run_test_case(file: str, timeout=TEST_TIMEOUT_SECONDS, memory_limit_mb=TEST_MEMORY_LIMIT_MB, output_dir="testcase_output", base_url=None, cwd=None):
     """
-    Runs a Python test file and saves its full output to:
-    output_testcase/output_<filename>.txt
+    Runs a Python test file and streams its full output to:
+    testcase_output/output_<filename>.txt
 
     Args:
         file (str): Path to the Python file to run.
+        timeout (float): Wall-clock limit in seconds; the test and its child
+            processes are killed when it is exceeded. None disables the limit.
+        memory_limit_mb (int): Resident memory limit for the test and its child
+            processes combined. 0 or None disables the limit.
+        output_dir (str): Directory the output file is written to.
+        base_url (str): Sandbox base URL, passed to the script as SANDBOX_BASE_URL.
+        cwd (str): Working directory of the test, which relative screenshot paths resolve against.
 
-    Creates:
-        output_testcase/output_<filename>.txt containing stdout and stderr.
+    Returns:
+        dict: file, output_path, exit_code, duration, timed_out and
+        memory_exceeded for the run.
     """
-    output_dir = Path("testcase_output")
-    output_dir.mkdir(exist_ok=True)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     output_filename = f"output_{Path(file).stem}.txt"
     output_path = output_dir / output_filename
 
-    try:
-        result = subprocess.run(
-            ["python", file],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,  # combine stdout and stderr
-            text=True
-        )
+    result = {
+        "file": str(file),
+        "output_path": str(output_path),
+        "exit_code": None,
+        "duration": 0.0,
+        "timed_out": False,
+        "memory_exceeded": False,
+    }
+
+    env = dict(os.environ)
+    if base_url:
+        env["SANDBOX_BASE_URL"] = base_url
+
+    with browser_slot(), span("run test", "test", file=Path(file).name):
+        _run_with_limits(file, output_path, env, cwd, timeout, memory_limit_mb, result)
+
+    logging.info(f"Test {file} finished with exit code {result['exit_code']} in {result['duration']}s.")
+    return result
+
 
+def _run_with_limits(file, output_path, env, cwd, timeout, memory_limit_mb, result):
+    """
+    Runs the test process under the watchdog and fills exit_code, duration and
+    the limit flags into `result`.
+    """
+    start = time.monotonic()
+    try:
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(result.stdout)
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(file)],
+                env=env,
+                cwd=cwd,
+                stdout=f,
+                stderr=subprocess.STDOUT,  # combine stdout and stderr
+                start_new_session=True  # own process group, so Chrome can be killed with it
+            )
+            deadline = start + timeout if timeout else None
+            while process.poll() is None:
+                if deadline is not None and time.monotonic() >= deadline:
+                    _kill_process_tree(process)
+                    result["timed_out"] = True
+                    f.write(f"\n[ERROR] Test exceeded the {timeout}s time limit and was killed.\n")
+                    break
+                if memory_limit_mb:
+                    rss_mb = _process_group_rss_mb(process.pid)
+                    if rss_mb is not None and rss_mb > memory_limit_mb:
+                        _kill_process_tree(process)
+                        result["memory_exceeded"] = True
+                        f.write(f"\n[ERROR] Test used {rss_mb:.0f} MB, above the {memory_limit_mb} MB limit, and was killed.\n")
+                        break
+                try:
+                    process.wait(timeout=POLL_INTERVAL_SECONDS)
+                except subprocess.TimeoutExpired:
+                    pass
+            result["exit_code"] = process.returncode
 
     except Exception as e:
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(f"[ERROR] Failed to run test case: {e}\n")
\ No newline at end of file
+        with open(output_path, "a", encoding="utf-8") as f:
+            f.write(f"[ERROR] Failed to run test case: {e}\n")
+
+    result["duration"] = round(time.monotonic() - start, 3)
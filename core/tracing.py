@@ -0,0 +1,270 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from config import TRACING_ENABLED
+from logger import logging
+
+# The innermost open span in this context; spans opened inside it (also on
+# worker threads started with contextvars.copy_context()) become its children.
+_current_span = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+def _now_us():
+    return time.perf_counter_ns() // 1000
+
+
+class Tracer:
+    """
+    Collects timed spans for every run in the process. A span records its
+    name, category (node, git, docker, http, llm, generate, test, report),
+    start and duration, thread, parent span and free-form args, and belongs
+    to the run of the node span it was opened under.
+    """
+
+    def __init__(self, enabled=TRACING_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._spans = []
+
+    def start(self, name, category, run_id=None, **args):
+        if not self.enabled:
+            return None
+        parent = _current_span.get()
+        args = {k: v for k, v in args.items() if v is not None}
+        if parent and "route" in parent["args"]:
+            args.setdefault("route", parent["args"]["route"])
+        span = {
+            "id": next(_span_ids),
+            "parent_id": parent["id"] if parent else None,
+            "run_id": run_id or (parent["run_id"] if parent else None),
+            "node": name if category == "node" else (parent["node"] if parent else None),
+            "name": name,
+            "category": category,
+            "thread": threading.current_thread().name,
+            "start_us": _now_us(),
+            "args": args,
+        }
+        return span
+
+    def finish(self, span, error=None):
+        if span is None:
+            return
+        span["duration_us"] = _now_us() - span["start_us"]
+        if error is not None:
+            span["args"]["error"] = str(error)
+        with self._lock:
+            self._spans.append(span)
+
+    @contextmanager
+    def span(self, name, category, run_id=None, **args):
+        span = self.start(name, category, run_id, **args)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            _current_span.reset(token)
+            self.finish(span, error=e)
+            raise
+        _current_span.reset(token)
+        self.finish(span)
+
+    def spans(self, run_id=None):
+        with self._lock:
+            return [s for s in self._spans if run_id is None or s["run_id"] == run_id]
+
+    def release(self, run_id):
+        """
+        Drops a finished run's spans so a long batch does not accumulate them.
+        """
+        with self._lock:
+            self._spans = [s for s in self._spans if s["run_id"] != run_id]
+
+
+_default_tracer = Tracer()
+
+
+def get_tracer():
+    return _default_tracer
+
+
+def span(name, category, **args):
+    """
+    Times the block as a span of the current run, e.g.
+    `with span("docker build", "docker", image=image_tag):`.
+    """
+    return get_tracer().span(name, category, **args)
+
+
+def traced_node(node_name, node_fn):
+    """
+    Wraps a LangGraph node in a root span for its run; everything traced
+    while it runs is nested under it.
+    """
+    def wrapper(state):
+        with get_tracer().span(node_name, "node", run_id=state.get("run_id")):
+            return node_fn(state)
+    wrapper.__name__ = getattr(node_fn, "__name__", node_name)
+    return wrapper
+
+
+class LLMSpanHandler(BaseCallbackHandler):
+    """
+    Callback handler that records each chat model call as an `llm` span
+    under whatever span the call was made in.
+    """
+
+    def __init__(self, tracer=None):
+        self.tracer = tracer
+        self._lock = threading.Lock()
+        self._open = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        tracer = self.tracer or get_tracer()
+        route = (metadata or {}).get("route")
+        span = tracer.start("llm call", "llm", route=route)
+        if span is not None:
+            with self._lock:
+                self._open[run_id] = span
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            span = self._open.pop(run_id, None)
+        (self.tracer or get_tracer()).finish(span)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            span = self._open.pop(run_id, None)
+        (self.tracer or get_tracer()).finish(span, error=error)
+
+
+def to_chrome_trace(spans):
+    """
+    Converts spans to the Chrome trace-event format (chrome://tracing,
+    ui.perfetto.dev): one complete ("X") event per span, one track per thread.
+    """
+    threads = {}
+    events = []
+    for s in sorted(spans, key=lambda s: s["start_us"]):
+        tid = threads.setdefault(s["thread"], len(threads) + 1)
+        events.append({
+            "name": s["name"],
+            "cat": s["category"],
+            "ph": "X",
+            "ts": s["start_us"],
+            "dur": s["duration_us"],
+            "pid": 1,
+            "tid": tid,
+            "args": {**s["args"], "span_id": s["id"], "parent_id": s["parent_id"]},
+        })
+    for thread_name, tid in threads.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread_name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _union_us(intervals):
+    total, end = 0, None
+    for start, stop in sorted(intervals):
+        if end is None or start > end:
+            total += stop - start
+            end = stop
+        elif stop > end:
+            total += stop - end
+            end = stop
+    return total
+
+
+def stage_summary(spans):
+    """
+    Per-stage breakdown of a run: for each node, and each category of work
+    inside it, the span count, busy time (sum of durations), wall time (union
+    of the spans), average parallelism (busy / wall), p50 and the slowest span.
+
+    Returns:
+        dict: {"wall_s": float, "stages": [{"node", "category", "count", "busy_s",
+               "wall_s", "parallelism", "p50_s", "max_s", "slowest"}, ...]}
+    """
+    if not spans:
+        return {"wall_s": 0.0, "stages": []}
+    groups = {}
+    for s in spans:
+        key = (s["node"] or "-", "-" if s["category"] == "node" else s["category"])
+        groups.setdefault(key, []).append(s)
+
+    run_start = min(s["start_us"] for s in spans)
+    run_end = max(s["start_us"] + s["duration_us"] for s in spans)
+    stages = []
+    for (node, category), group in groups.items():
+        durations = sorted(s["duration_us"] for s in group)
+        busy = sum(durations)
+        wall = _union_us((s["start_us"], s["start_us"] + s["duration_us"]) for s in group)
+        slowest = max(group, key=lambda s: s["duration_us"])
+        label = slowest["args"].get("route") or slowest["args"].get("url") or slowest["args"].get("file") or slowest["name"]
+        stages.append({
+            "node": node,
+            "category": category,
+            "count": len(group),
+            "busy_s": round(busy / 1e6, 3),
+            "wall_s": round(wall / 1e6, 3),
+            "parallelism": round(busy / wall, 2) if wall else None,
+            "p50_s": round(durations[len(durations) // 2] / 1e6, 3),
+            "max_s": round(durations[-1] / 1e6, 3),
+            "slowest": label,
+            "_start": min(s["start_us"] for s in group),
+        })
+    # Nodes in the order they ran, each followed by its work, busiest first.
+    node_starts = {row["node"]: row["_start"] for row in stages if row["category"] == "-"}
+    stages.sort(key=lambda row: (node_starts.get(row["node"], row["_start"]), row["category"] != "-", -row["busy_s"]))
+    for row in stages:
+        del row["_start"]
+    return {"wall_s": round((run_end - run_start) / 1e6, 3), "stages": stages}
+
+
+def format_stage_summary(summary):
+    """
+    Renders `stage_summary` as a markdown table.
+    """
+    lines = [
+        f"Run wall time: {summary['wall_s']:.3f}s",
+        "",
+        "| Stage | Work | Spans | Busy (s) | Wall (s) | Parallelism | p50 (s) | Max (s) | Slowest |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for row in summary["stages"]:
+        stage = row["node"] if row["category"] == "-" else ""
+        work = "total" if row["category"] == "-" else row["category"]
+        lines.append(
+            f"| {stage} | {work} | {row['count']} | {row['busy_s']:.3f} | {row['wall_s']:.3f} | "
+            f"{row['parallelism'] if row['parallelism'] is not None else '-'} | {row['p50_s']:.3f} | {row['max_s']:.3f} | {row['slowest']} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write_run_trace(run_id, output_dir, tracer=None):
+    """
+    Writes trace.json (Chrome trace events) and trace_summary.md for a run
+    into `output_dir`, releases the run's spans, and returns the stage summary.
+    """
+    tracer = tracer or get_tracer()
+    spans = tracer.spans(run_id)
+    summary = stage_summary(spans)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "trace.json"), "w") as f:
+        json.dump(to_chrome_trace(spans), f)
+    table = format_stage_summary(summary)
+    with open(os.path.join(output_dir, "trace_summary.md"), "w") as f:
+        f.write(table)
+    tracer.release(run_id)
+
+    logging.info(f"Run {run_id} timeline ({len(spans)} spans):\n{table}")
+    return summary
@@ -0,0 +1,267 @@
+import ast
+import os
+import re
+
+from logger import logging
+
+PATH_FUNCTIONS = {"path", "re_path", "url"}
+SKIPPED_DIRS = {".git", "node_modules", "venv", ".venv", "env", "__pycache__", "static", "media"}
+
+# Regex tokens that make a re_path pattern non-literal (groups, classes, repeats...).
+REGEX_SPECIAL = re.compile(r"[()\[\]{}*+?|\\.]")
+# An included prefix containing any of these carries URL parameters.
+PARAMETER_MARKERS = re.compile(r"[<()\[\]{}*+?|\\]")
+
+
+def _dotted_name(node):
+    """
+    Renders a view expression as dotted text: `views.index`,
+    `views.IndexView.as_view()`, ... or None if it is something else.
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parent = _dotted_name(node.value)
+        return f"{parent}.{node.attr}" if parent else node.attr
+    if isinstance(node, ast.Call):
+        func = _dotted_name(node.func)
+        return f"{func}()" if func else None
+    return None
+
+
+def _string(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _call_name(node):
+    if isinstance(node, ast.Call):
+        name = _dotted_name(node.func)
+        return name.split(".")[-1] if name else None
+    return None
+
+
+def find_project_root(target_dir):
+    """
+    Returns the directory holding manage.py (the import root of the project),
+    or `target_dir` itself if there is none.
+    """
+    for root, dirs, files in os.walk(target_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+        if "manage.py" in files:
+            return root
+    return target_dir
+
+
+def find_root_urlconf(project_root):
+    """
+    Reads ROOT_URLCONF from the project's settings modules, e.g. "mysite.urls".
+    """
+    for root, dirs, files in os.walk(project_root):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+        candidates = [f for f in files if f == "settings.py"]
+        if os.path.basename(root) == "settings":
+            candidates += [f for f in files if f.endswith(".py")]
+        for filename in candidates:
+            tree = _parse(os.path.join(root, filename))
+            for node in ast.walk(tree) if tree else ():
+                if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "ROOT_URLCONF" for t in node.targets):
+                    value = _string(node.value)
+                    if value:
+                        return value
+    return None
+
+
+def _parse(file_path):
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return ast.parse(f.read(), filename=file_path)
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError) as e:
+        logging.warning(f"Could not parse {file_path}: {e}")
+        return None
+
+
+def _module_file(project_root, module):
+    base = os.path.join(project_root, *module.split("."))
+    for candidate in (f"{base}.py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _regex_to_route(pattern):
+    """
+    Turns a literal re_path/url regex such as `^accounts/login/$` into
+    `accounts/login/`. Returns (route, is_literal).
+    """
+    route = pattern
+    if route.startswith("^"):
+        route = route[1:]
+    if route.endswith("$"):
+        route = route[:-1]
+    literal = not REGEX_SPECIAL.search(route.replace(r"\.", ""))
+    return route.replace(r"\.", "."), literal
+
+
+class UrlconfAnalyzer:
+    """
+    Statically extracts a Django project's route table by parsing its URLconf
+    modules with `ast`, starting at ROOT_URLCONF and following `include()`
+    chains. Nothing from the project is imported or executed.
+    """
+
+    def __init__(self, target_dir):
+        self.project_root = find_project_root(target_dir)
+        self.entries = []
+        self.unresolved_includes = []
+        self._visiting = set()
+
+    def analyze(self, root_urlconf=None):
+        """
+        Returns the route table: one dict per endpoint with
+        route, name (namespaced), view, module, is_regex and has_params.
+        """
+        root_urlconf = root_urlconf or find_root_urlconf(self.project_root)
+        if not root_urlconf:
+            logging.warning(f"No ROOT_URLCONF found under {self.project_root}.")
+            return []
+        self._walk_module(root_urlconf, prefix="", namespace=None)
+        return self.entries
+
+    def _walk_module(self, module, prefix, namespace):
+        file_path = _module_file(self.project_root, module)
+        if file_path is None:
+            self.unresolved_includes.append({"prefix": prefix, "module": module})
+            return
+        if module in self._visiting:
+            return
+        tree = _parse(file_path)
+        if tree is None:
+            return
+
+        self._visiting.add(module)
+        app_name, patterns, variables = None, [], {}
+        for node in tree.body:
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if not isinstance(target, ast.Name):
+                        continue
+                    if target.id == "app_name":
+                        app_name = _string(node.value)
+                    elif target.id == "urlpatterns":
+                        patterns = self._list_items(node.value, variables)
+                    else:
+                        variables[target.id] = node.value
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name) and node.target.id == "urlpatterns":
+                patterns += self._list_items(node.value, variables)
+
+        namespace = namespace or app_name
+        self._walk_patterns(patterns, module, prefix, namespace, variables)
+        self._visiting.discard(module)
+
+    def _list_items(self, node, variables):
+        if isinstance(node, ast.Name) and node.id in variables:
+            node = variables[node.id]
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return list(node.elts)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            return self._list_items(node.left, variables) + self._list_items(node.right, variables)
+        # e.g. `+ static(settings.MEDIA_URL, ...)`: not a route we can test
+        return []
+
+    def _walk_patterns(self, patterns, module, prefix, namespace, variables):
+        for item in patterns:
+            function = _call_name(item)
+            if function not in PATH_FUNCTIONS or not item.args:
+                continue
+            raw_route = _string(item.args[0])
+            if raw_route is None:
+                continue
+            is_regex = function != "path"
+            route, literal = _regex_to_route(raw_route) if is_regex else (raw_route, "<" not in raw_route)
+            full_route = prefix + route
+            target = item.args[1] if len(item.args) > 1 else None
+            keywords = {kw.arg: kw.value for kw in item.keywords if kw.arg}
+
+            if _call_name(target) == "include":
+                self._follow_include(target, module, full_route, namespace, variables)
+                continue
+
+            view = _dotted_name(target) if target is not None else None
+            if view and view.endswith("site.urls"):
+                # admin.site.urls: the admin is generated, not part of the project's URLconfs
+                self.unresolved_includes.append({"prefix": full_route, "module": view})
+                continue
+
+            name = _string(keywords.get("name")) if "name" in keywords else None
+            self.entries.append({
+                "route": "/" + full_route,
+                "name": f"{namespace}:{name}" if namespace and name else name,
+                "view": view,
+                "module": module,
+                "is_regex": is_regex,
+                "has_params": not literal or bool(PARAMETER_MARKERS.search(prefix)),
+            })
+
+    def _follow_include(self, call, module, prefix, namespace, variables):
+        if not call.args:
+            return
+        argument = call.args[0]
+        keywords = {kw.arg: kw.value for kw in call.keywords if kw.arg}
+        include_namespace = _string(keywords.get("namespace")) if "namespace" in keywords else None
+
+        # include(("app.urls", "app_name")) sets the app namespace explicitly.
+        if isinstance(argument, ast.Tuple) and argument.elts:
+            include_namespace = include_namespace or (_string(argument.elts[1]) if len(argument.elts) > 1 else None)
+            argument = argument.elts[0]
+
+        target_module = _string(argument)
+        if target_module:
+            self._walk_module(target_module, prefix, include_namespace or None)
+            return
+
+        # include(extra_patterns) / include([...]): patterns defined in this module
+        patterns = self._list_items(argument, variables)
+        if patterns:
+            self._walk_patterns(patterns, module, prefix, include_namespace or namespace, variables)
+        else:
+            self.unresolved_includes.append({"prefix": prefix, "module": _dotted_name(argument)})
+
+
+def route_page_name(entry, taken):
+    """
+    Derives a unique page name for a route: its URL name (without namespace)
+    when it has one, else one built from the path.
+    """
+    base = (entry.get("name") or "").split(":")[-1] or entry["route"]
+    name = re.sub(r"[^a-z0-9]+", "_", base.lower()).strip("_") or "home"
+    unique, suffix = name, 2
+    while unique in taken:
+        unique, suffix = f"{name}_{suffix}", suffix + 1
+    taken.add(unique)
+    return unique
+
+
+def extract_static_routes(target_dir):
+    """
+    Analyzes the URLconf of the Django project in `target_dir`.
+
+    Returns:
+        dict: {"routes": [(page_name, path), ...] for every parameterless route,
+               "url_table": [entry, ...] for every route including parameterized ones,
+               "unresolved_includes": [{"prefix", "module"}, ...] for third-party
+               or generated URLconfs (e.g. the admin) that could not be followed}
+    """
+    analyzer = UrlconfAnalyzer(target_dir)
+    table = analyzer.analyze()
+
+    routes, seen_paths, taken = [], set(), set()
+    for entry in table:
+        if entry["has_params"] or entry["route"] in seen_paths:
+            continue
+        seen_paths.add(entry["route"])
+        routes.append((route_page_name(entry, taken), entry["route"]))
+
+    logging.info(f"URLconf analysis: {len(table)} routes ({len(routes)} without parameters), {len(analyzer.unresolved_includes)} unresolved includes.")
+    return {"routes": routes, "url_table": table, "unresolved_includes": analyzer.unresolved_includes}
@@ -1,29 +1,24 @@
 import os
-import requests
-import openai
-import logging
-from dotenv import load_dotenv
 from logger import logging
 from pathlib import Path
 
-from langchain_core.prompts import ChatPromptTemplate
+from core.llm_cache import invoke_chain
+from core.http_fetcher import get_page_fetcher
 
 
-# Load environment variables
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-def fetch_source_from_localhost(url="http://localhost:8000"):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        logging.info(f"Fetched source from {url}")
-        return response.text
-    except requests.RequestException as e:
-        logging.error(f"Failed to fetch {url}: {e}")
+def fetch_source_from_localhost(url="http://localhost:8000", fetcher=None):
+    """
+    Fetches the page at `url`, normally the sandbox base URL from RepoState,
+    through the shared page fetcher. Returns "" if it could not be fetched.
+    """
+    html = (fetcher or get_page_fetcher()).fetch(url)
+    if html is None:
         return ""
+    logging.info(f"Fetched source from {url}")
+    return html
 
 
 def get_functional_spec_from_html(html_source, prompt, llm, parser):
@@ -32,18 +27,34 @@ def get_functional_spec_from_html(html_source, prompt, llm, parser):
         return "No HTML source to analyze."
 
     try:
-        final_prompt = ChatPromptTemplate.from_messages([
-            ('system', prompt),
-            ('human','{input}')
-        ])
-
-        chain = final_prompt | llm | parser
-
-        response = chain.invoke({
+        response = invoke_chain(prompt, {
             "html_source":html_source,
             "input":"Get the functional specifications from the given html code."
-        }
-        )
+        }, llm, parser)
+
+        return response
+    except Exception as e:
+        return f" Error from OpenAI: {e}"
+
+
+def get_functional_spec_from_routes(url_table, prompt, llm, parser):
+    """
+    Writes the functional spec from a statically extracted route table
+    (see core.urlconf_analyzer) instead of rendered homepage HTML.
+    """
+    if not url_table:
+        logging.warning("No routes to analyze.")
+        return "No routes to analyze."
+
+    lines = [
+        f"- `{entry['route']}` name={entry.get('name') or '-'} view={entry.get('view') or '-'}"
+        for entry in url_table
+    ]
+    try:
+        response = invoke_chain(prompt, {
+            "url_table": "\n".join(lines),
+            "input": "Get the functional specifications from the given route table."
+        }, llm, parser)
 
         return response
     except Exception as e:
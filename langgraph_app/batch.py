@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langgraph_app.langgraph_app import build_qa_automation_graph, build_initial_state, stop_run_sandbox
+from langgraph_app.checkpoint import get_checkpoint_store
+from core.limits import configure_limits
+from core.llm_cache import get_llm_cache
+from core.http_fetcher import release_page_fetcher
+from core.artifact_store import release_artifact_store
+from core.llm_metering import write_run_metrics
+from core.tracing import write_run_trace
+from config import BATCH_MAX_PARALLEL_REPOS
+from logger import logging
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RUNS_DIR = os.path.join(PROJECT_ROOT, "runs")
+
+# (stage label, RepoState success flag) in workflow order
+STAGES = [
+    ("clone", "clone_success"),
+    ("docker", "docker_run_success"),
+    ("spec", "base_spec_extraction_success"),
+    ("tests", "selenium_test_generation_success"),
+    ("reports", "report_generation_success"),
+]
+
+
+def _repo_name(repo_url):
+    name = repo_url.rstrip("/").split("/")[-1]
+    if name.endswith(".git"):
+        name = name[:-4]
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name) or "repo"
+
+
+def load_manifest(manifest_path):
+    """
+    Reads a batch manifest: either a JSON list of repos or {"repos": [...]}.
+    Each entry is a repo URL string or an object with `repo_url` and optional
+    `name`, `ref` and `docker_image_name`. Names are made unique so every repo gets
+    its own workspace.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("repos", []) if isinstance(data, dict) else data
+
+    repos, seen = [], set()
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"repo_url": entry}
+        if not entry.get("repo_url"):
+            raise ValueError(f"Manifest entry without repo_url: {entry}")
+        name = entry.get("name") or _repo_name(entry["repo_url"])
+        unique_name, suffix = name, 2
+        while unique_name in seen:
+            unique_name, suffix = f"{name}-{suffix}", suffix + 1
+        seen.add(unique_name)
+        repos.append({
+            "repo_url": entry["repo_url"],
+            "name": unique_name,
+            "ref": entry.get("ref"),
+            "docker_image_name": entry.get("docker_image_name", "fst_sandbox_app"),
+        })
+    return repos
+
+
+def summarize_repo(repo, final_state, duration, error=None):
+    """
+    Condenses one repo's final state into a summary row.
+    """
+    stages = {label: final_state.get(flag) for label, flag in STAGES}
+    if error:
+        status = "crashed"
+    elif all(stages.values()):
+        status = "success"
+    elif stages["clone"] and stages["docker"]:
+        status = "partial"
+    else:
+        status = "failed"
+
+    test_results = final_state.get("test_results") or {}
+    return {
+        "name": repo["name"],
+        "repo_url": repo["repo_url"],
+        "commit_sha": final_state.get("repo_commit_sha"),
+        "status": status,
+        "duration_seconds": round(duration, 2),
+        "stages": stages,
+        "routes": len(final_state.get("extracted_routes") or []),
+        "tests_passed": sum(1 for r in test_results.values() if r.get("exit_code") == 0),
+        "tests_run": len(test_results),
+        "sandbox_time_to_ready": final_state.get("sandbox_time_to_ready"),
+        "llm_tokens": (final_state.get("llm_metrics") or {}).get("totals", {}).get("total_tokens"),
+        "llm_cost_usd": (final_state.get("llm_metrics") or {}).get("totals", {}).get("cost_usd"),
+        "junit_path": final_state.get("junit_path"),
+        "run_id": final_state.get("run_id"),
+        "error": error or final_state.get("error_message"),
+    }
+
+
+def run_repo(app, repo, runs_dir=RUNS_DIR, keep_sandbox=False, resume=False):
+    """
+    Runs the full workflow for one repository inside its own workspace and
+    returns its summary row. Never raises.
+
+    With `resume`, the repository's latest run in this workspace is continued
+    from its checkpoints instead of starting over.
+    """
+    workspace_dir = os.path.join(runs_dir, repo["name"])
+    outputs_dir = os.path.join(workspace_dir, "outputs")
+    os.makedirs(outputs_dir, exist_ok=True)
+
+    run_id = get_checkpoint_store().latest_run_id(repo["repo_url"], workspace_dir) if resume else None
+    initial_state = build_initial_state(
+        repo_url=repo["repo_url"],
+        target_dir=os.path.join(workspace_dir, "repo"),
+        docker_image_name=repo["docker_image_name"],
+        workspace_dir=workspace_dir,
+        repo_ref=repo.get("ref"),
+        run_id=run_id,
+        resume=run_id is not None
+    )
+
+    logging.info(f"[batch] {'Resuming' if run_id else 'Starting'} {repo['name']} ({repo['repo_url']}), run {initial_state['run_id']}")
+    start = time.monotonic()
+    final_state, error = {}, None
+    try:
+        final_state = app.invoke(initial_state)
+    except Exception as e:
+        error = f"Workflow crashed: {e}"
+        logging.critical(f"[batch] {repo['name']}: {error}")
+    finally:
+        if not keep_sandbox:
+            stop_run_sandbox(initial_state["run_id"], final_state)
+    duration = time.monotonic() - start
+    final_state = {
+        **final_state,
+        "http_fetch_stats": release_page_fetcher(initial_state["run_id"]),
+        "artifact_stats": release_artifact_store(initial_state["run_id"]),
+        "llm_metrics": write_run_metrics(initial_state["run_id"], outputs_dir),
+        "trace_summary": write_run_trace(initial_state["run_id"], outputs_dir),
+    }
+
+    try:
+        with open(os.path.join(outputs_dir, "final_state.json"), "w") as f:
+            json.dump(final_state, f, indent=4)
+    except Exception as e:
+        logging.error(f"[batch] Failed to save final state for {repo['name']}: {e}")
+
+    summary = summarize_repo(repo, final_state, duration, error)
+    logging.info(f"[batch] Finished {repo['name']}: {summary['status']} in {summary['duration_seconds']}s")
+    return summary
+
+
+def run_batch(manifest_path, max_parallel_repos=BATCH_MAX_PARALLEL_REPOS, docker_builds=None, llm_calls=None, browsers=None, runs_dir=RUNS_DIR, keep_sandboxes=False, resume=False):
+    """
+    Runs the workflow for every repository in the manifest.
+
+    Up to `max_parallel_repos` pipelines run at once. Docker builds, LLM calls
+    and browsers are capped process-wide (see core.limits), so while one repo is
+    in its test stage the next can already clone and build.
+
+    Returns:
+        dict: Batch totals plus one summary row per repository, in manifest order.
+    """
+    configure_limits(docker_builds=docker_builds, llm_calls=llm_calls, browsers=browsers)
+    repos = load_manifest(manifest_path)
+    app = build_qa_automation_graph()
+
+    logging.info(f"[batch] Running {len(repos)} repositories, {max_parallel_repos} at a time.")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_parallel_repos) as pool:
+        results = list(pool.map(lambda repo: run_repo(app, repo, runs_dir, keep_sandboxes, resume), repos))
+
+    summary = {
+        "total_duration_seconds": round(time.monotonic() - start, 2),
+        "repositories": len(results),
+        "succeeded": sum(1 for r in results if r["status"] == "success"),
+        "llm_cache_stats": get_llm_cache().stats(),
+        "results": results,
+    }
+
+    os.makedirs(runs_dir, exist_ok=True)
+    summary_path = os.path.join(runs_dir, "batch_summary.json")
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=4)
+    logging.info(f"[batch] Summary saved to: {summary_path}")
+    return summary
+
+
+def print_summary(summary):
+    print(f"\n{'Repository':<30} {'Status':<9} {'Time (s)':>9} {'Routes':>7} {'Passed':>7}  Stages")
+    for row in summary["results"]:
+        stages = " ".join(f"{label}={'ok' if ok else '-'}" for label, ok in row["stages"].items())
+        print(f"{row['name']:<30} {row['status']:<9} {row['duration_seconds']:>9} {row['routes']:>7} {row['tests_passed']:>7}  {stages}")
+    print(f"\n {summary['succeeded']}/{summary['repositories']} repositories succeeded in {summary['total_duration_seconds']}s.")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run the QA automation workflow over many repositories.")
+    arg_parser.add_argument("manifest", help="JSON manifest listing the repositories to process")
+    arg_parser.add_argument("--parallel", type=int, default=BATCH_MAX_PARALLEL_REPOS, help="Repositories processed at once")
+    arg_parser.add_argument("--docker-builds", type=int, help="Max concurrent Docker builds")
+    arg_parser.add_argument("--llm-calls", type=int, help="Max concurrent LLM calls")
+    arg_parser.add_argument("--browsers", type=int, help="Max concurrent browser tests")
+    arg_parser.add_argument("--runs-dir", default=RUNS_DIR, help="Directory holding one workspace per repository")
+    arg_parser.add_argument("--keep-sandboxes", action="store_true", help="Leave each repo's app container running")
+    arg_parser.add_argument("--resume", action="store_true", help="Continue each repository's latest run from its checkpoints")
+    args = arg_parser.parse_args()
+
+    batch_summary = run_batch(
+        args.manifest,
+        max_parallel_repos=args.parallel,
+        docker_builds=args.docker_builds,
+        llm_calls=args.llm_calls,
+        browsers=args.browsers,
+        runs_dir=args.runs_dir,
+        keep_sandboxes=args.keep_sandboxes,
+        resume=args.resume
+    )
+    print_summary(batch_summary)
@@ -0,0 +1,156 @@
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from config import CHECKPOINT_DB_PATH
+from logger import logging
+
+# Success flag each node reports; a node counts as complete when it is True.
+NODE_SUCCESS_FLAGS = {
+    "clone_repo": "clone_success",
+    "docker_runner": "docker_run_success",
+    "extract_base_spec": "base_spec_extraction_success",
+    "generate_selenium_tests": "selenium_test_generation_success",
+    "generate_reports": "report_generation_success",
+}
+
+# Nodes that are re-executed even on resume: the sandbox container does not
+# survive the process that started it (and image reuse makes this cheap).
+ALWAYS_RERUN_NODES = {"docker_runner"}
+
+
+class CheckpointStore:
+    """
+    SQLite store of node outputs and per-route results, keyed by run ID, so an
+    interrupted or failed run can be resumed without redoing finished work.
+    """
+
+    def __init__(self, path=CHECKPOINT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " run_id TEXT PRIMARY KEY, repo_url TEXT, workspace_dir TEXT, created_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS node_outputs ("
+                " run_id TEXT, node TEXT, completed INTEGER, output TEXT, updated_at REAL,"
+                " PRIMARY KEY (run_id, node))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS route_outputs ("
+                " run_id TEXT, page_name TEXT, output TEXT, updated_at REAL,"
+                " PRIMARY KEY (run_id, page_name))"
+            )
+
+    def register_run(self, run_id, repo_url, workspace_dir):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, repo_url, workspace_dir, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, repo_url, workspace_dir or "", time.time())
+            )
+
+    def latest_run_id(self, repo_url, workspace_dir=None):
+        """
+        Returns the most recent run ID recorded for this repo/workspace, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE repo_url = ? AND workspace_dir = ? ORDER BY created_at DESC LIMIT 1",
+                (repo_url, workspace_dir or "")
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_node(self, run_id, node, output, completed):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO node_outputs (run_id, node, completed, output, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, node, int(bool(completed)), json.dumps(output, default=str), time.time())
+            )
+
+    def load_node(self, run_id, node):
+        """
+        Returns (completed, output) for a node, or (False, None) if it never ran.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completed, output FROM node_outputs WHERE run_id = ? AND node = ?", (run_id, node)
+            ).fetchone()
+        if row is None:
+            return False, None
+        return bool(row[0]), json.loads(row[1])
+
+    def save_route(self, run_id, page_name, output):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO route_outputs (run_id, page_name, output, updated_at) VALUES (?, ?, ?, ?)",
+                (run_id, page_name, json.dumps(output, default=str), time.time())
+            )
+
+    def load_routes(self, run_id):
+        """
+        Returns {page_name: output} for every route checkpointed in this run.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_name, output FROM route_outputs WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {page_name: json.loads(output) for page_name, output in rows}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_checkpoint_store():
+    """
+    Returns the process-wide checkpoint store, creating it on first use.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = CheckpointStore()
+        return _default_store
+
+
+def new_run_id(repo_url):
+    name = repo_url.rstrip("/").split("/")[-1]
+    if name.endswith(".git"):
+        name = name[:-4]
+    name = name or "repo"
+    return f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def checkpointed(node_name, node_fn):
+    """
+    Wraps a LangGraph node so its output is persisted after it runs. On resume
+    (state["resume"] is true), a node that already completed in this run
+    returns its stored output instead of running again.
+    """
+    success_flag = NODE_SUCCESS_FLAGS[node_name]
+
+    @functools.wraps(node_fn)
+    def wrapper(state):
+        run_id = state.get("run_id")
+        if not run_id:
+            return node_fn(state)
+
+        store = get_checkpoint_store()
+        if state.get("resume") and node_name not in ALWAYS_RERUN_NODES:
+            completed, output = store.load_node(run_id, node_name)
+            if completed:
+                logging.info(f"Resume: '{node_name}' already completed in run {run_id}; reusing its output.")
+                return output
+
+        output = node_fn(state)
+        store.save_node(run_id, node_name, output, completed=output.get(success_flag) is True)
+        return output
+
+    return wrapper
@@ -14,19 +14,32 @@ from langgraph_app.routers import (
     decide_after_selenium_gen,
     decide_after_report_gen
 )
+from langgraph_app.checkpoint import checkpointed, get_checkpoint_store, new_run_id
+from core.docker_runner import stop_container
+from core.llm_cache import get_llm_cache
+from core.http_fetcher import release_page_fetcher
+from core.artifact_store import release_artifact_store
+from core.llm_metering import metered_node, write_run_metrics
+from core.tracing import traced_node, write_run_trace
 from logger import logging
+import argparse
 import os
 import json 
 
 def build_qa_automation_graph():
     workflow = StateGraph(RepoState)
 
-    # 1. Add Nodes
-    workflow.add_node("clone_repo", clone_repo_node)
-    workflow.add_node("docker_runner", docker_runner_node)
-    workflow.add_node("extract_base_spec", extract_base_spec_node)
-    workflow.add_node("generate_selenium_tests", generate_selenium_tests_node)
-    workflow.add_node("generate_reports", generate_report_node)
+    # 1. Add Nodes (each persists its output so a failed run can be resumed,
+    # is traced as a span, and has its LLM calls metered under its name)
+    nodes = {
+        "clone_repo": clone_repo_node,
+        "docker_runner": docker_runner_node,
+        "extract_base_spec": extract_base_spec_node,
+        "generate_selenium_tests": generate_selenium_tests_node,
+        "generate_reports": generate_report_node,
+    }
+    for name, node_fn in nodes.items():
+        workflow.add_node(name, checkpointed(name, traced_node(name, metered_node(name, node_fn))))
 
     # 2. Set Entry Point
     workflow.set_entry_point("clone_repo")
@@ -82,7 +95,52 @@ def build_qa_automation_graph():
     app = workflow.compile()
     return app
 
+def build_initial_state(repo_url, target_dir, docker_image_name="fst_sandbox_app", workspace_dir=None, run_id=None, resume=False, repo_ref=None) -> RepoState:
+    """
+    Creates the starting RepoState for one repository, with every status,
+    error and result field unset, and registers the run with the checkpoint store.
+
+    Args:
+        run_id (str): Run to resume; a new ID is generated when omitted.
+        resume (bool): Reuse nodes and routes already completed under `run_id`.
+        repo_ref (str): Branch, tag or commit to check out; the default branch when None.
+    """
+    run_id = run_id or new_run_id(repo_url)
+    get_checkpoint_store().register_run(run_id, repo_url, workspace_dir)
+
+    state = {key: None for key in RepoState.__annotations__}
+    state.update(
+        repo_url=repo_url,
+        repo_ref=repo_ref,
+        target_dir=target_dir,
+        docker_image_name=docker_image_name,
+        workspace_dir=workspace_dir,
+        run_id=run_id,
+        resume=resume
+    )
+    return RepoState(**state)
+
+
+def stop_run_sandbox(run_id, final_state=None):
+    """
+    Removes the sandbox container a run started. The container ID comes from
+    the run's final state or, when the run crashed before returning one, from
+    the docker node's checkpoint.
+    """
+    container_id = (final_state or {}).get("sandbox_container_id")
+    if not container_id and run_id:
+        _, output = get_checkpoint_store().load_node(run_id, "docker_runner")
+        container_id = (output or {}).get("sandbox_container_id")
+    if container_id:
+        stop_container(container_id)
+
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run the QA automation workflow.")
+    arg_parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                            help="Resume a previous run (default: the latest run for this repository)")
+    args = arg_parser.parse_args()
+
     base_proj_dir = os.path.dirname(os.path.abspath(__file__))
 
     output_dir = os.path.join(base_proj_dir, "outputs")
@@ -90,24 +148,21 @@ if __name__ == "__main__":
 
     app = build_qa_automation_graph()
 
-    initial_state = RepoState(
-        repo_url="https://github.com/devmahmud/Django-Poll-App",
+    repo_url = "https://github.com/devmahmud/Django-Poll-App"
+    run_id = None
+    if args.resume:
+        run_id = get_checkpoint_store().latest_run_id(repo_url) if args.resume == "latest" else args.resume
+        if run_id is None:
+            logging.warning("No previous run to resume; starting a new one.")
+        else:
+            logging.info(f"Resuming run {run_id}.")
+
+    initial_state = build_initial_state(
+        repo_url=repo_url,
         target_dir=os.path.join(base_proj_dir, "repo"),
         docker_image_name="fst_sandbox_app",
-        clone_success=None,
-        docker_run_success=None,
-        base_spec_extraction_success=None,
-        selenium_test_generation_success=None,
-        report_generation_success=None,
-        error_message=None,
-        clone_error=None,
-        docker_error=None,
-        base_spec_error=None,
-        selenium_gen_error=None,
-        report_gen_error=None,
-        extracted_routes=None,
-        generated_test_scripts_paths=None,
-        final_report_paths=None
+        run_id=run_id,
+        resume=run_id is not None
     )
 
     logging.info("Starting Langraph QA Automation workflow...")
@@ -117,6 +172,23 @@ if __name__ == "__main__":
         final_state = app.invoke(initial_state)
         logging.info("\n--- Langraph Workflow Finished ---")
 
+        cache_stats = get_llm_cache().stats()
+        logging.info(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries on disk.")
+        fetch_stats = release_page_fetcher(initial_state["run_id"])
+        if fetch_stats:
+            logging.info(f"Page fetches: {fetch_stats['requests']} requests, {fetch_stats['bytes']} bytes, {fetch_stats['cache_hits']} cache hits.")
+        artifact_stats = release_artifact_store(initial_state["run_id"])
+        llm_metrics = write_run_metrics(initial_state["run_id"], output_dir)
+        trace_summary = write_run_trace(initial_state["run_id"], output_dir)
+        final_state = {
+            **final_state,
+            "llm_cache_stats": cache_stats,
+            "http_fetch_stats": fetch_stats,
+            "artifact_stats": artifact_stats,
+            "llm_metrics": llm_metrics,
+            "trace_summary": trace_summary,
+        }
+
         output_filename = os.path.join(output_dir, "final_state.json")
         try:
             with open(output_filename, 'w') as f:
@@ -129,6 +201,8 @@ if __name__ == "__main__":
             print("\n All workflow steps completed successfully!")
             for path in final_state.get("final_report_paths", []):
                 print(f"   Report: {path}")
+            if final_state.get("junit_path"):
+                print(f"   Test results: {final_state['test_results_path']} (JUnit: {final_state['junit_path']})")
         else:
             print("\n Workflow completed with errors or partial success. Check logs for details.")
             if final_state.get("error_message"):
@@ -147,3 +221,5 @@ if __name__ == "__main__":
     except Exception as e:
         logging.critical(f"An unhandled exception occurred during Langraph execution: {e}")
         print(f"\n Langraph execution crashed: {e}")
+    finally:
+        stop_run_sandbox(initial_state["run_id"], final_state)
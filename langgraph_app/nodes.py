@@ -1,5 +1,7 @@
+import contextvars
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add the parent directory to the Python path to allow importing from 'core'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -7,45 +9,120 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # Import all necessary functions from your core modules
 from core.clone_repo import clone_repo_from_url
 from core.docker_runner import build_and_run_docker_container
-from core.web_scraper import fetch_source_from_localhost, get_functional_spec_from_html, save_spec_to_markdown
-from core.spec_extractor import extract_routes_from_markdown, fetch_html_from_url, get_selenium_test_from_html, save_test_script
-from core.report_generator import generate_llm_report 
+from core.web_scraper import fetch_source_from_localhost, get_functional_spec_from_html, get_functional_spec_from_routes
+from core.spec_extractor import extract_routes_from_spec, fetch_html_from_url, get_selenium_test_from_html, save_test_script, stream_selenium_test_to_file
+from core.report_generator import generate_llm_reports, generate_template_reports, load_spec
+from core.test_results import build_route_result, write_results_json, write_junit_xml
+from core.html_reducer import reduce_html
 from core.testcase_runner import run_test_case
+from core.driver_pool import DriverPool, run_harness_test
+from core.route_manifest import RouteManifest, page_fingerprint
+from core.http_fetcher import get_page_fetcher
+from core.route_crawler import crawl_routes
+from core.urlconf_analyzer import extract_static_routes
+from core.test_validator import validate_test_script
+from core.llm_backends import backend_for, get_llm
+from core.artifact_store import get_artifact_store
+from core.llm_metering import metering_labels
+from core.tracing import span
 from logger import logging
 from langgraph_app.state import RepoState 
+from langgraph_app.checkpoint import get_checkpoint_store
+from config import LLM_MAX_WORKERS, TEST_MAX_WORKERS, TEST_EXECUTION_MODE, INCREMENTAL_REGENERATION, ROUTE_DISCOVERY, LLM_STREAMING, TEST_MAX_REGENERATIONS, REPORT_MODE, REPORT_LLM_OBSERVATIONS
 
-from prompt.functional_spec import SPEC_EXTRACTOR
-from prompt.generate_reports import GENERATE_REPORTS
-from prompt.generate_test_cases import TEST_CASES
+from prompt.functional_spec import SPEC_EXTRACTOR, SPEC_FROM_URLCONF
+from prompt.generate_reports import GENERATE_REPORTS, REPORT_OBSERVATIONS
+from prompt.generate_test_cases import TEST_CASES, TEST_CASES_HARNESS, TEST_CASES_REPAIR
 
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 
-api_key = os.environ['OPENAI_API_KEY']
-llm = ChatOpenAI(model = 'gpt-4o-mini', api_key = api_key)
+# Models are built on first use by the backend registry (see LLM_PROVIDER and
+# LLM_STAGE_BACKENDS), so importing this module needs no API key.
 parser = StrOutputParser()
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) # fst_generator root
+
+
+def workspace_paths(state: RepoState) -> dict:
+    """
+    Resolves where this run reads and writes its artifacts. Every run gets its
+    own workspace (the project root by default), so batch runs don't collide.
+    """
+    workspace_dir = state.get("workspace_dir") or PROJECT_ROOT
+    return {
+        "workspace_dir": workspace_dir,
+        "spec_path": os.path.join(workspace_dir, "outputs", "functional_specifications.md"),
+        "tests_dir": os.path.join(workspace_dir, "tests", "selenium"),
+        "screenshots_dir": os.path.join(workspace_dir, "screenshots"),
+        "testcase_output_dir": os.path.join(workspace_dir, "testcase_output"),
+        "reports_dir": os.path.join(workspace_dir, "reports"),
+        "route_manifest_path": os.path.join(workspace_dir, "outputs", "route_manifest.json"),
+        "test_results_path": os.path.join(workspace_dir, "outputs", "test_results.json"),
+        "junit_path": os.path.join(workspace_dir, "outputs", "junit.xml"),
+    }
+
+
+SPEC_ARTIFACT = "functional_specifications"
+
+
+def _register_test_artifacts(store, name, test_result, screenshots_dir):
+    """
+    Records a finished test's output file and screenshots in the run's
+    artifact store; their contents are only read if something asks for them.
+    """
+    if test_result.get("output_path") and os.path.exists(test_result["output_path"]):
+        store.put_file("test_output", name, test_result["output_path"])
+    for phase in ("before", "after"):
+        screenshot = os.path.join(screenshots_dir, f"{phase}_{name}.png")
+        if os.path.exists(screenshot):
+            store.put_file("screenshot", f"{phase}_{name}", screenshot)
+
+
 # --- Node 1: Clone Repository ---
 def clone_repo_node(state: RepoState) -> dict:
     logging.info("Langraph Node: Executing 'clone_repo_node'")
     repo_url = state["repo_url"]
     target_dir = state["target_dir"]
     try:
-        clone_repo_from_url(repo_url, target_dir)
-        return {"clone_success": True, "clone_error": None}
+        commit_sha = clone_repo_from_url(repo_url, target_dir, ref=state.get("repo_ref"))
     except Exception as e:
         error_msg = f"Clone failed: {e}"
         logging.error(error_msg)
         return {"clone_success": False, "clone_error": error_msg, "error_message": error_msg}
 
+    # The route table is read from the source right away, before the sandbox
+    # exists; a project the analyzer cannot read just falls back to the crawl.
+    try:
+        urlconf = extract_static_routes(target_dir)
+    except Exception as e:
+        logging.warning(f"URLconf analysis failed: {e}")
+        urlconf = {"routes": [], "url_table": []}
+    return {
+        "clone_success": True,
+        "clone_error": None,
+        "repo_commit_sha": commit_sha,
+        "static_routes": urlconf["routes"],
+        "url_table": urlconf["url_table"]
+    }
+
 # --- Node 2: Build and Run Docker ---
 def docker_runner_node(state: RepoState) -> dict:
     logging.info("Langraph Node: Executing 'docker_runner_node'")
     target_dir = state["target_dir"]
     image_name = state["docker_image_name"]
     try:
-        build_and_run_docker_container(target_dir, image_name)
-        return {"docker_run_success": True, "docker_error": None}
+        sandbox = build_and_run_docker_container(target_dir, image_name)
+        return {
+            "docker_run_success": True,
+            "docker_error": None,
+            "docker_image_tag": sandbox["image_tag"],
+            "docker_image_reused": sandbox["image_reused"],
+            "sandbox_container_id": sandbox["container_id"],
+            "sandbox_host_port": sandbox["host_port"],
+            "base_url": sandbox["base_url"],
+            "sandbox_time_to_ready": sandbox["time_to_ready"],
+            "sandbox_bootstrap_timings": sandbox["bootstrap_timings"]
+        }
     except Exception as e:
         error_msg = f"Docker build/run failed: {e}"
         logging.error(error_msg)
@@ -54,83 +131,300 @@ def docker_runner_node(state: RepoState) -> dict:
 # --- Node 3: Extract Base Functional Spec ---
 def extract_base_spec_node(state: RepoState) -> dict:
     logging.info("Langraph Node: Executing 'extract_base_spec_node'")
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) 
-    output_spec_path = os.path.join(base_dir, "outputs", "functional_specifications.md")
+    output_spec_path = workspace_paths(state)["spec_path"]
 
     try:
-        html = fetch_source_from_localhost()
-        if not html:
-            raise ValueError("Failed to fetch HTML source from localhost.")
-        spec_content = get_functional_spec_from_html(html, SPEC_EXTRACTOR, llm, parser)
+        fetcher = get_page_fetcher(state.get("run_id"))
+        artifacts = get_artifact_store(state.get("run_id"))
+        static_routes = state.get("static_routes") or []
+
+        if ROUTE_DISCOVERY == "urlconf" and static_routes:
+            # Ground-truth endpoints from the URLconf: no homepage HTML is sent to the LLM.
+            spec_content = get_functional_spec_from_routes(state.get("url_table"), SPEC_FROM_URLCONF, get_llm("spec"), parser)
+            html_reduction_stats = {}
+        else:
+            html = fetch_source_from_localhost(state["base_url"], fetcher)
+            if not html:
+                raise ValueError("Failed to fetch HTML source from localhost.")
+            artifacts.put("html", "home", html)
+            reduced_html, reduction_stats = reduce_html(html, page="home")
+            spec_content = get_functional_spec_from_html(reduced_html, SPEC_EXTRACTOR, get_llm("spec"), parser)
+            html_reduction_stats = {"home": reduction_stats}
         if "Error from OpenAI" in spec_content: # Basic check for OpenAI errors
             raise ValueError(f"OpenAI error during spec generation: {spec_content}")
 
-        save_spec_to_markdown(spec_content, output_spec_path)
+        # Later nodes read the spec from the store, but a resumed run skips this
+        # node and reads the file, so it must be on disk before the checkpoint.
+        artifacts.put("spec", SPEC_ARTIFACT, spec_content, path=output_spec_path, wait=True)
 
-        return {
+        result = {
             "base_spec_extraction_success": True,
-            "base_spec_error": None
+            "base_spec_error": None,
+            "html_reduction_stats": html_reduction_stats
             # "initial_html_source": html,
             # "functional_spec_content": spec_content
         }
+        if ROUTE_DISCOVERY == "urlconf" and static_routes:
+            result["extracted_routes"] = static_routes
+        elif ROUTE_DISCOVERY in ("crawl", "urlconf"):
+            crawl = crawl_routes(state["base_url"], fetcher, seed_paths=[path for _, path in static_routes])
+            result["extracted_routes"] = crawl["routes"]
+        return result
     except Exception as e:
         error_msg = f"Base spec extraction failed: {e}"
         logging.error(error_msg)
         return {"base_spec_extraction_success": False, "base_spec_error": error_msg, "error_message": error_msg}
 
 # --- Node 4: Generate Selenium Tests for Each Route ---
+def _generate_test_for_route(name, path, base_url, tests_output_dir, test_prompt, manifest=None, fetcher=None, store=None):
+    """
+    Fetches the page HTML for a single route, asks the LLM for a Selenium script
+    and saves it. With a route manifest, a route whose page fingerprint is
+    unchanged since the last run keeps its existing script instead.
+
+    Returns (script path, HTML reduction stats, regenerated, stream stats,
+    generation attempts), or raises with a route-specific message.
+    """
+    html = fetch_html_from_url(path, base_url, fetcher)
+    if not html:
+        raise RuntimeError(f"Could not fetch HTML for {path}")
+
+    page_hash = page_fingerprint(html) if manifest is not None else None
+    if manifest is not None:
+        entry = manifest.reusable_script(name, path, page_hash, test_prompt, _test_model())
+        if entry:
+            logging.info(f"Page unchanged, reusing test for page: {name} ({path})")
+            return entry["script"], entry.get("html_reduction_stats"), False, None, 0
+
+    with metering_labels(route=name), span("generate test", "generate", route=name):
+        return _generate_and_validate(name, path, html, page_hash, tests_output_dir, test_prompt, manifest, store)
+
+
+def _test_model():
+    """
+    The "provider:model" that writes tests; a different one invalidates reused scripts.
+    """
+    return ":".join(filter(None, backend_for("tests")))
+
+
+def _generate_and_validate(name, path, html, page_hash, tests_output_dir, test_prompt, manifest, store):
+    logging.info(f"Generating test for page: {name} ({path})")
+    if store is not None:
+        store.put("html", name, html)
+    reduced_html, reduction_stats = reduce_html(html, page=name)
+    script_filename = os.path.join(tests_output_dir, f"test_{name}.py")
+    harness = TEST_EXECUTION_MODE == "harness"
+
+    # Scripts that fail the static checks go back to the LLM with their
+    # problems, within a per-route budget, before any browser is started.
+    prompt, repair_variables = test_prompt, None
+    for attempt in range(1, TEST_MAX_REGENERATIONS + 2):
+        test_code, stream_stats = _write_test_script(name, path, reduced_html, prompt, script_filename, repair_variables)
+        problems = validate_test_script(test_code, name, harness=harness)
+        if not problems:
+            break
+        logging.warning(f"Generated test for {name} failed validation (attempt {attempt}): {'; '.join(problems)}")
+        prompt = test_prompt + TEST_CASES_REPAIR
+        repair_variables = {
+            "previous_code": test_code,
+            "validation_errors": "\n".join(f"- {problem}" for problem in problems),
+        }
+    else:
+        # Keep the last attempt for inspection, but out of the way of the runner and reports.
+        os.replace(script_filename, f"{script_filename}.rejected")
+        raise RuntimeError(f"Generated test for {name} ({path}) failed validation after {attempt} attempt(s): {'; '.join(problems)}")
+
+    if store is not None:
+        # The script is already on disk for the test runner; reports take the code from here.
+        store.put("test_code", name, test_code, path=script_filename, persist=False)
+    if manifest is not None:
+        manifest.record_generation(name, path, page_hash, test_prompt, script_filename, reduction_stats, _test_model())
+    return script_filename, reduction_stats, True, stream_stats, attempt
+
+
+def _write_test_script(name, path, reduced_html, prompt, script_filename, extra_variables=None):
+    """
+    Runs one test generation into `script_filename`, streamed or in one call
+    depending on LLM_STREAMING. Returns (script code, stream stats or None
+    when not streaming).
+    """
+    if LLM_STREAMING:
+        try:
+            test_code, stream_stats = stream_selenium_test_to_file(reduced_html, name, path, prompt, get_llm("tests"), parser, script_filename, extra_variables)
+        except Exception as e:
+            raise RuntimeError(f"Could not generate test code for {name} ({path}): {e}")
+        logging.info(f"Streamed test for {name}: TTFB {stream_stats['ttfb_ms']} ms, {stream_stats['chunks_per_sec']} chunks/s.")
+        return test_code, stream_stats
+
+    test_code = get_selenium_test_from_html(reduced_html, name, path, prompt, get_llm("tests"), parser, extra_variables)
+    if not test_code:
+        raise RuntimeError(f"Could not generate test code for {name} ({path})")
+    return save_test_script(test_code, script_filename), None
+
+
 def generate_selenium_tests_node(state: RepoState) -> dict:
     logging.info("Langraph Node: Executing 'generate_selenium_tests_node'")
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) # fst_generator root
-    input_spec_path = os.path.join(base_dir, "outputs", "functional_specifications.md")
-    tests_output_dir = os.path.join(base_dir, "tests", "selenium")
-
-    generated_scripts = []
-    error_occurred = False
-    error_messages = []
+    paths = workspace_paths(state)
+    input_spec_path = paths["spec_path"]
+    tests_output_dir = paths["tests_dir"]
+    base_url = state["base_url"]
+    artifacts = get_artifact_store(state.get("run_id"))
+    os.makedirs(paths["screenshots_dir"], exist_ok=True)
 
     try:
-        routes = extract_routes_from_markdown(input_spec_path)
-        print("\n\n routes: ", routes)
+        if ROUTE_DISCOVERY in ("crawl", "urlconf") and state.get("extracted_routes") is not None:
+            routes = [tuple(route) for route in state["extracted_routes"]]
+        else:
+            routes = extract_routes_from_spec(artifacts.get("spec", SPEC_ARTIFACT, path=input_spec_path))
+        logging.info(f"Routes to test: {routes}")
         if not routes:
             logging.warning("No routes extracted from functional specification.")
-            return {"selenium_test_generation_success": True, "selenium_gen_error": None, "extracted_routes": [], "generated_test_scripts_paths": []}
+            return {"selenium_test_generation_success": True, "selenium_gen_error": None, "extracted_routes": [], "generated_test_scripts_paths": [], "route_errors": {}}
 
-        for name, path in routes:
-            logging.info(f"Generating test for page: {name} ({path})")
-            html = fetch_html_from_url(path)
-            if not html:
-                error_occurred = True
-                error_messages.append(f"Could not fetch HTML for {path}")
-                continue
-
-            test_code = get_selenium_test_from_html(html, name, path,TEST_CASES, llm, parser)
-            if not test_code:
-                error_occurred = True
-                error_messages.append(f"Could not generate test code for {name} ({path})")
-                continue
-
-            script_filename = os.path.join(tests_output_dir, f"test_{name}.py")
-            save_test_script(test_code, script_filename)
-            run_test_case(script_filename)
-            generated_scripts.append(script_filename)
-
-        if error_occurred:
-            combined_error_msg = "Some Selenium tests failed to generate: " + "; ".join(error_messages)
+        # LLM generation and test execution run on separate bounded pools, so a
+        # route's script starts running as soon as it is generated while other
+        # routes are still waiting on the model.
+        scripts_by_index = {}
+        errors_by_index = {}
+        html_reduction_stats = dict(state.get("html_reduction_stats") or {})
+        test_results = {}
+        llm_stream_stats = dict(state.get("llm_stream_stats") or {})
+        generation_attempts = {}
+        changed_routes = set()
+        manifest = RouteManifest(paths["route_manifest_path"]) if INCREMENTAL_REGENERATION else None
+
+        # Fetch every route's page in the background now; generation workers
+        # pick them up from the run's page cache (or wait on the in-flight request).
+        fetcher = get_page_fetcher(state.get("run_id"))
+        fetcher.prefetch(f"{base_url}{path}" for _, path in routes)
+
+        # Per-route checkpoints: on resume, routes whose script (and test run)
+        # already finished in this run are reused instead of regenerated.
+        run_id = state.get("run_id")
+        store = get_checkpoint_store() if run_id else None
+        route_records = store.load_routes(run_id) if store and state.get("resume") else {}
+
+        def checkpoint_route(name, **fields):
+            if store is None:
+                return
+            route_records[name] = {**route_records.get(name, {}), **fields}
+            store.save_route(run_id, name, route_records[name])
+
+        # In harness mode the generated scripts expose run_test(driver, ...) and share
+        # a pool of warm browsers instead of each starting their own Chrome.
+        harness_mode = TEST_EXECUTION_MODE == "harness"
+        test_prompt = TEST_CASES_HARNESS if harness_mode else TEST_CASES
+        driver_pool = DriverPool() if harness_mode else None
+
+        logging.info(f"Processing {len(routes)} routes with {LLM_MAX_WORKERS} LLM worker(s) and {TEST_MAX_WORKERS} test worker(s) in {TEST_EXECUTION_MODE} mode.")
+        try:
+            with ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS) as llm_pool, \
+                    ThreadPoolExecutor(max_workers=TEST_MAX_WORKERS) as test_pool:
+                def submit_test_run(index, script_filename):
+                    run = contextvars.copy_context().run
+                    if harness_mode:
+                        run_futures[test_pool.submit(
+                            run, run_harness_test, script_filename, driver_pool, base_url,
+                            output_dir=paths["testcase_output_dir"], screenshots_dir=paths["screenshots_dir"]
+                        )] = index
+                    else:
+                        run_futures[test_pool.submit(
+                            run, run_test_case, script_filename,
+                            output_dir=paths["testcase_output_dir"], base_url=base_url, cwd=paths["workspace_dir"]
+                        )] = index
+
+                run_futures = {}
+                generation_futures = {}
+                for index, (name, path) in enumerate(routes):
+                    record = route_records.get(name, {})
+                    if record.get("script") and os.path.exists(record["script"]):
+                        logging.info(f"Resume: reusing generated test for {name}.")
+                        scripts_by_index[index] = record["script"]
+                        html_reduction_stats[name] = record.get("html_reduction_stats")
+                        if record.get("changed", True):
+                            changed_routes.add(name)
+                        if record.get("test_result"):
+                            test_results[name] = record["test_result"]
+                            _register_test_artifacts(artifacts, name, test_results[name], paths["screenshots_dir"])
+                        else:
+                            submit_test_run(index, record["script"])
+                        continue
+                    # Run in a copy of this context so the worker's LLM calls keep the run/node
+                    # metering labels and its spans nest under this node's.
+                    future = llm_pool.submit(
+                        contextvars.copy_context().run,
+                        _generate_test_for_route, name, path, base_url, tests_output_dir, test_prompt, manifest, fetcher, artifacts
+                    )
+                    generation_futures[future] = index
+
+                for future in as_completed(generation_futures):
+                    index = generation_futures[future]
+                    try:
+                        script_filename, reduction_stats, regenerated, stream_stats, attempts = future.result()
+                    except Exception as e:
+                        errors_by_index[index] = str(e)
+                        continue
+                    scripts_by_index[index] = script_filename
+                    html_reduction_stats[routes[index][0]] = reduction_stats
+                    if regenerated:
+                        changed_routes.add(routes[index][0])
+                    if stream_stats:
+                        llm_stream_stats[f"test:{routes[index][0]}"] = stream_stats
+                    if attempts:
+                        generation_attempts[routes[index][0]] = attempts
+                    checkpoint_route(routes[index][0], script=script_filename, html_reduction_stats=reduction_stats, changed=regenerated)
+                    submit_test_run(index, script_filename)
+
+                for future in as_completed(run_futures):
+                    index = run_futures[future]
+                    try:
+                        name = routes[index][0]
+                        test_results[name] = future.result()
+                        _register_test_artifacts(artifacts, name, test_results[name], paths["screenshots_dir"])
+                        if manifest is not None and manifest.record_outcome(name, test_results[name]):
+                            changed_routes.add(name)
+                        checkpoint_route(name, test_result=test_results[name], changed=name in changed_routes)
+                    except Exception as e:
+                        errors_by_index[index] = f"Could not run test for {routes[index][0]}: {e}"
+        finally:
+            if driver_pool is not None:
+                driver_pool.close()
+
+        # Assemble results in route order, independent of completion order.
+        generated_scripts = [scripts_by_index[i] for i in sorted(scripts_by_index)]
+        test_results = {name: test_results[name] for name, _ in routes if name in test_results}
+        route_errors = {routes[i][0]: errors_by_index[i] for i in sorted(errors_by_index)}
+        changed_routes = [name for name, _ in routes if name in changed_routes or manifest is None]
+        logging.info(f"{len(changed_routes)}/{len(routes)} routes regenerated or changed outcome.")
+
+        if route_errors:
+            combined_error_msg = "Some Selenium tests failed to generate: " + "; ".join(route_errors.values())
             logging.error(combined_error_msg)
             return {
                 "selenium_test_generation_success": False,
                 "selenium_gen_error": combined_error_msg,
                 "error_message": combined_error_msg,
                 "extracted_routes": routes,
-                "generated_test_scripts_paths": generated_scripts
+                "generated_test_scripts_paths": generated_scripts,
+                "route_errors": route_errors,
+                "html_reduction_stats": html_reduction_stats,
+                "test_results": test_results,
+                "changed_routes": changed_routes,
+                "llm_stream_stats": llm_stream_stats,
+                "test_generation_attempts": generation_attempts
             }
         else:
             return {
                 "selenium_test_generation_success": True,
                 "selenium_gen_error": None,
                 "extracted_routes": routes,
-                "generated_test_scripts_paths": generated_scripts
+                "generated_test_scripts_paths": generated_scripts,
+                "route_errors": {},
+                "html_reduction_stats": html_reduction_stats,
+                "test_results": test_results,
+                "changed_routes": changed_routes,
+                "llm_stream_stats": llm_stream_stats,
+                "test_generation_attempts": generation_attempts
             }
     except Exception as e:
         error_msg = f"Selenium test generation failed: {e}"
@@ -141,10 +435,9 @@ def generate_selenium_tests_node(state: RepoState) -> dict:
 # --- Node 5: Generate Final LLM Report ---
 def generate_report_node(state: RepoState) -> dict:
     logging.info("Langraph Node: Executing 'generate_report_node'")
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) # fst_generator root
+    paths = workspace_paths(state)
     extracted_routes = state.get("extracted_routes", [])
     final_report_paths = []
-    error_occurred = False
     error_messages = []
 
     if not extracted_routes:
@@ -152,32 +445,69 @@ def generate_report_node(state: RepoState) -> dict:
         return {"report_generation_success": True, "report_gen_error": None, "final_report_paths": []}
 
     try:
+        # Every route's outcome as data first; the reports (and CI) are built from it.
+        artifacts = get_artifact_store(state.get("run_id"))
+        test_results = state.get("test_results") or {}
+        route_errors = state.get("route_errors") or {}
+        with span("structure results", "report"):
+            route_results = [
+                build_route_result(page_name, path, test_results.get(page_name), paths, artifacts, route_errors.get(page_name))
+                for page_name, path in extracted_routes
+            ]
+            write_results_json(route_results, paths["test_results_path"], state.get("run_id"))
+            write_junit_xml(route_results, paths["junit_path"])
+        logging.info(f"Structured test results saved to: {paths['test_results_path']} and {paths['junit_path']}")
+
+        # Routes whose test and outcome are unchanged keep their existing report.
+        changed_routes = state.get("changed_routes")
+        kept_reports, pages_to_report = {}, []
         for page_name, _ in extracted_routes:
-            logging.info(f"Generating LLM report for page: {page_name}")
-            try:
-                generate_llm_report(page_name, GENERATE_REPORTS, llm, parser)
-                report_path = os.path.join(base_dir, "reports", f"final_report_{page_name}.md")
-                final_report_paths.append(report_path)
-            except Exception as e:
-                error_occurred = True
-                error_messages.append(f"Report generation failed for {page_name}: {e}")
-                logging.error(f"Report generation failed for {page_name}: {e}")
-                continue 
-
-        if error_occurred:
+            report_path = os.path.join(paths["reports_dir"], f"final_report_{page_name}.md")
+            if changed_routes is not None and page_name not in changed_routes and os.path.exists(report_path):
+                logging.info(f"Route unchanged, keeping report for page: {page_name}")
+                kept_reports[page_name] = report_path
+            else:
+                pages_to_report.append(page_name)
+
+        results = {}
+        if pages_to_report and REPORT_MODE == "llm":
+            # All remaining reports go to the model as one batch.
+            results = generate_llm_reports(pages_to_report, GENERATE_REPORTS, get_llm("reports"), parser, paths["workspace_dir"], store=artifacts)
+        elif pages_to_report:
+            # Rendered locally; the model, if enabled, only writes the observations paragraphs.
+            llm = get_llm("reports") if REPORT_LLM_OBSERVATIONS else None
+            results = generate_template_reports(
+                [result for result in route_results if result["page"] in pages_to_report],
+                load_spec(paths["workspace_dir"], artifacts), paths["workspace_dir"],
+                REPORT_OBSERVATIONS, llm, parser, store=artifacts
+            )
+        for page_name, _ in extracted_routes:
+            if page_name in kept_reports:
+                final_report_paths.append(kept_reports[page_name])
+            elif results[page_name]["error"]:
+                error_messages.append(f"Report generation failed for {page_name}: {results[page_name]['error']}")
+                logging.error(f"Report generation failed for {page_name}: {results[page_name]['error']}")
+            else:
+                final_report_paths.append(results[page_name]["path"])
+
+        if error_messages:
             combined_error_msg = "Some LLM reports failed to generate: " + "; ".join(error_messages)
             logging.error(combined_error_msg)
             return {
                 "report_generation_success": False,
                 "report_gen_error": combined_error_msg,
                 "error_message": combined_error_msg,
-                "final_report_paths": final_report_paths
+                "final_report_paths": final_report_paths,
+                "test_results_path": paths["test_results_path"],
+                "junit_path": paths["junit_path"]
             }
         else:
             return {
                 "report_generation_success": True,
                 "report_gen_error": None,
-                "final_report_paths": final_report_paths
+                "final_report_paths": final_report_paths,
+                "test_results_path": paths["test_results_path"],
+                "junit_path": paths["junit_path"]
             }
     except Exception as e:
         error_msg = f"Overall report generation node failed: {e}"
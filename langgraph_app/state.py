@@ -1,12 +1,24 @@
-from typing import TypedDict, Optional, List, Tuple
+from typing import TypedDict, Optional, List, Tuple, Dict, Any
 
 class RepoState(TypedDict):
     """
     Represents the state of our repository operations and testing workflow.
     """
     repo_url: str
+    repo_ref: Optional[str] # Branch, tag or commit to test; the default branch when None
+    repo_commit_sha: Optional[str] # Commit the checkout was pinned to
     target_dir: str 
+    workspace_dir: Optional[str] # Root for this run's outputs/tests/reports; defaults to the project root
+    run_id: Optional[str] # Key of this run's checkpoints
+    resume: Optional[bool] # Reuse node and route outputs already checkpointed under run_id
     docker_image_name: str 
+    docker_image_tag: Optional[str] # Requirements-hash tag of the image the sandbox runs
+    docker_image_reused: Optional[bool] # True when the build was skipped for an existing image
+    sandbox_container_id: Optional[str] # ID of the running app container
+    sandbox_host_port: Optional[int] # Host port the sandbox app is published on
+    base_url: Optional[str] # Base URL of the sandbox app, e.g. http://localhost:49153
+    sandbox_time_to_ready: Optional[float] # Seconds from starting migrations/containers until the app answered HTTP
+    sandbox_bootstrap_timings: Optional[Dict[str, float]] # Per-phase seconds: makemigrations, migrate, server_start, ...
     
     # Status flags
     clone_success: Optional[bool]
@@ -25,5 +37,15 @@ class RepoState(TypedDict):
 
     # Data generated at various stages
     extracted_routes: Optional[List[Tuple[str, str]]] # List of (page_name, path) tuples
+    static_routes: Optional[List[Tuple[str, str]]] # Parameterless (page_name, path) routes found in the project's URLconf
+    url_table: Optional[List[Dict[str, Any]]] # Every URLconf route: route, name, view, module, is_regex, has_params
     generated_test_scripts_paths: Optional[List[str]] # Paths to generated test scripts
-    final_report_paths: Optional[List[str]] # Paths to final generated reports
\ No newline at end of file
+    final_report_paths: Optional[List[str]] # Paths to final generated reports
+    test_results_path: Optional[str] # JSON with every route's structured test result (status, assertions, inputs, errors, ...)
+    junit_path: Optional[str] # The same results as JUnit XML, for CI
+    route_errors: Optional[Dict[str, str]] # page_name -> error for routes that failed to generate or run
+    html_reduction_stats: Optional[Dict[str, Dict[str, int]]] # page_name -> {"before": chars, "after": chars} sent to the LLM
+    test_results: Optional[Dict[str, Dict[str, Any]]] # page_name -> exit_code, duration, timed_out, ... of its test run
+    llm_stream_stats: Optional[Dict[str, Dict[str, Any]]] # "test:<page>" -> ttfb_ms, duration_ms, chunks_per_sec, ... of streamed calls
+    test_generation_attempts: Optional[Dict[str, int]] # page_name -> generations needed to pass static validation (1 = first try)
+    changed_routes: Optional[List[str]] # Routes whose test was regenerated or whose outcome changed; only these get new reports
\ No newline at end of file
@@ -4,17 +4,28 @@ from datetime import datetime
 
 LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 log_path = os.path.join(os.getcwd(), "logs")
-
-os.makedirs(log_path, exist_ok=True)
 LOG_FILEPATH = os.path.join(log_path, LOG_FILE)
 
+
+class _LazyFileHandler(logging.FileHandler):
+    """
+    File handler that creates the logs directory and the log file on the
+    first record instead of at import, so importing the project touches no files.
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
 logging.basicConfig(
-    level=logging.INFO, 
+    level=logging.INFO,
     format="[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s",
     handlers=[
-        logging.FileHandler(LOG_FILEPATH),
+        _LazyFileHandler(LOG_FILEPATH),
         logging.StreamHandler()
     ]
 )
-
-logging.info("Logger setup is completed.")
\ No newline at end of file
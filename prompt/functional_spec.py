@@ -19,4 +19,26 @@ You're a senior software architect.
 
         HTML Source:
         {html_source}
-'''
\ No newline at end of file
+'''
+SPEC_FROM_URLCONF = '''
+You're a senior software architect.
+
+        From the route table of a Django project provided below (extracted from its URLconf: each line is a URL pattern, its URL name and the view behind it), generate a clear and concise **functional specification** in Markdown format.
+
+        Your output must contain ONLY the following sections in this order:
+
+        ## User Interaction Flows
+        - Describe the user's journey in exactly 4-6 short steps.
+        - Start from homepage → register → login → and so on.
+        - Include the route (`/path/`) in backticks inside each step.
+
+        ## URL Endpoints and their Purpose
+        - List each endpoint without URL parameters in the order it appears in the user flow.
+        - Use this exact format:
+          **Name (`/url/`)** — one-line purpose of that endpoint.
+
+        Be direct and simple. Infer each endpoint's purpose from its path, URL name and view. Do not invent endpoints that are not in the table.
+
+        Route Table:
+        {url_table}
+'''
@@ -8,7 +8,7 @@ GENERATE_REPORTS = """
         {test_code}
 
         ### Result of the Code:
-        {ouptut_test_code}        
+        {test_output}        
         
         Screenshots:
         - Before: screenshots/before_{page_name}.png
@@ -23,4 +23,17 @@ GENERATE_REPORTS = """
         - Final summary/observations
         
         Output only valid Markdown.
-"""
\ No newline at end of file
+"""
+
+# Template-rendered reports only ask the model for their closing paragraph.
+REPORT_OBSERVATIONS = """
+        You are a QA lead. Write the short observations paragraph for the `{page_name}` page's QA report.
+
+        Test result:
+        {result_summary}
+
+        Requirements:
+        - 2 to 4 sentences of plain prose, no headings, lists or Markdown
+        - State what the outcome means for the page and, if it did not pass, the most likely cause
+        - Do not restate the numbers above unless they matter
+"""
@@ -5,7 +5,7 @@ Write a standalone Python script using Selenium (not pytest) to test the `{page_
 Requirements:
 - Use `webdriver.Chrome(options=options)` to set headless mode using `Options()` (not `chrome_options`)
 - Use modern Selenium 4 syntax: `driver.find_element(By.XPATH, '...')`
-- Load the page from: http://localhost:8000{path}
+- Read the application base URL with `os.environ.get("SANDBOX_BASE_URL", "http://localhost:8000")` and load the page from that base URL + `{path}`
 - Take a screenshot before interacting with the form and save it as: screenshots/before_{page_name}.png
 - Fill in the form fields with test data
 - Submit the form using the correct button
@@ -17,4 +17,40 @@ Requirements:
 - Wrap execution logic under: `if __name__ == "__main__"`
 - Output only valid Python code, no markdown or explanations
 - This is the page HTML content:
-{html_content}'''
\ No newline at end of file
+{html_content}'''
+
+TEST_CASES_HARNESS = '''You are a senior QA automation engineer.
+
+Write a Python module using Selenium (not pytest) to test the `{page_name}` page of a Django web application.
+The module is run by a test harness that owns the browser: it imports the module and calls
+`run_test(driver, base_url, screenshots_dir)` with a ready headless Chrome `driver`, the application's base URL
+and the directory screenshots must be saved in.
+
+Requirements:
+- Define exactly one entry point: `def run_test(driver, base_url, screenshots_dir):`
+- Do NOT create, configure or quit a WebDriver; use only the `driver` argument
+- Use modern Selenium 4 syntax: `driver.find_element(By.XPATH, '...')`
+- Load the page from: `base_url + "{path}"`
+- Take a screenshot before interacting with the form and save it as: `os.path.join(screenshots_dir, "before_{page_name}.png")`
+- Fill in the form fields with test data
+- Submit the form using the correct button
+- Wait for 3 seconds after submission
+- Take a screenshot after submission and save it as: `os.path.join(screenshots_dir, "after_{page_name}.png")`
+- Print the screenshot file paths and the first 300 characters of the final HTML
+- Let exceptions propagate so the harness records the failure
+- Include all necessary imports at module level
+- Do not execute anything at import time and do not add an `if __name__ == "__main__"` block
+- Output only valid Python code, no markdown or explanations
+- This is the page HTML content:
+{html_content}'''
+
+# Appended to the test prompt when a generated script failed static validation.
+TEST_CASES_REPAIR = '''
+
+Your previous script for this page failed validation before it could be run:
+{validation_errors}
+
+Previous script:
+{previous_code}
+
+Return the complete corrected script that fixes every problem above and still meets all the requirements.'''
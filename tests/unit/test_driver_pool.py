@@ -0,0 +1,121 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from core.driver_pool import DriverPool, run_harness_test
+
+
+class StubDriver:
+    def __init__(self):
+        self.quit_calls = 0
+        self.visited = []
+
+    def quit(self):
+        self.quit_calls += 1
+
+    def execute_script(self, script):
+        pass
+
+    def execute_cdp_cmd(self, command, args):
+        pass
+
+    def get(self, url):
+        self.visited.append(url)
+
+
+@pytest.fixture
+def pool():
+    pool = DriverPool(size=1, driver_factory=StubDriver)
+    yield pool
+    pool.close()
+
+
+def acquire_in_thread(pool, acquired):
+    def target():
+        with pool.acquire() as driver:
+            acquired.append(driver)
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_returned_driver_is_reused(pool):
+    with pool.acquire() as first:
+        pass
+    with pool.acquire() as second:
+        pass
+    assert second is first
+    assert first.visited[-1] == "about:blank"
+
+
+def test_waiter_gets_a_replacement_when_the_held_driver_is_discarded(pool):
+    acquired = []
+    with pool.acquire() as held:
+        waiter = acquire_in_thread(pool, acquired)
+        time.sleep(0.1)
+        assert not acquired
+        # What a harness timeout does to the driver it kills.
+        held.pool_discard = True
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert acquired and acquired[0] is not held
+    assert held.quit_calls == 1
+
+
+def test_waiter_gets_a_replacement_when_reset_fails(pool):
+    acquired = []
+    with pool.acquire() as held:
+        held.get = None  # reset() fails on the next call
+        waiter = acquire_in_thread(pool, acquired)
+        time.sleep(0.1)
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert acquired and acquired[0] is not held
+
+
+def test_close_wakes_waiters():
+    pool = DriverPool(size=1, driver_factory=StubDriver)
+    errors = []
+
+    def target():
+        try:
+            with pool.acquire():
+                pass
+        except RuntimeError as e:
+            errors.append(e)
+
+    with pool.acquire():
+        waiter = threading.Thread(target=target, daemon=True)
+        waiter.start()
+        time.sleep(0.1)
+        pool.close()
+    waiter.join(5)
+    assert not waiter.is_alive() and errors
+
+
+def test_harness_test_saves_screenshots_in_the_given_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    test_file = tmp_path / "test_login.py"
+    test_file.write_text(
+        "import os\n\n"
+        "def run_test(driver, base_url, screenshots_dir):\n"
+        "    print('loading', base_url)\n"
+        "    with open(os.path.join(screenshots_dir, 'before_login.png'), 'w') as f:\n"
+        "        f.write('png')\n"
+    )
+    screenshots_dir = tmp_path / "run_a" / "screenshots"
+    stdout = sys.stdout
+    # Created in the test, not a fixture, so pytest's capture does not replace its stdout router.
+    pool = DriverPool(size=1, driver_factory=StubDriver)
+    try:
+        result = run_harness_test(str(test_file), pool, "http://localhost:8000",
+                                  output_dir=str(tmp_path / "output"), screenshots_dir=str(screenshots_dir))
+    finally:
+        pool.close()
+    assert result["exit_code"] == 0
+    assert (screenshots_dir / "before_login.png").exists()
+    assert not (tmp_path / "screenshots").exists()
+    assert "loading http://localhost:8000" in (tmp_path / "output" / "output_test_login.txt").read_text()
+    assert sys.stdout is stdout
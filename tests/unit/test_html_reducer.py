@@ -0,0 +1,96 @@
+import pytest
+
+from core.html_reducer import HtmlReducer, reduce_html
+
+PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+  <title>Sign in</title>
+  <meta charset="utf-8">
+  <link rel="stylesheet" href="/static/site.css">
+  <style>body { color: red; }</style>
+  <script>console.log("hi")</script>
+</head>
+<body>
+  <!-- navigation -->
+  <nav><a href="/">Home</a> <a href="/">Home</a></nav>
+  <div class="card" style="margin: 0" data-id="7">
+    <h1>Welcome <small>back</small></h1>
+    <form action="/login/" method="post" onsubmit="return check()">
+      <input type="hidden" name="csrfmiddlewaretoken" value="secret">
+      <label for="id_username">Username</label>
+      <input id="id_username" name="username" class="form-control" type="text">
+      <button type="submit" class="btn">Sign <span>in</span></button>
+    </form>
+  </div>
+  <svg><path d="M0 0"/></svg>
+</body>
+</html>'''
+
+
+def reduced(html, level):
+    return reduce_html(html, level=level)[0]
+
+
+def test_none_level_is_unchanged():
+    assert reduced(PAGE, "none") == PAGE
+
+
+def test_light_level_drops_noise_but_keeps_layout():
+    html = reduced(PAGE, "light")
+    for dropped in ("<script", "<style", "<svg", "navigation", "stylesheet", "csrfmiddlewaretoken", "onsubmit", "data-id", 'style="'):
+        assert dropped not in html
+    assert '<div class="card">' in html
+    assert '<input id="id_username" name="username" class="form-control" type="text">' in html
+
+
+def test_structural_level_keeps_only_what_tests_use():
+    html = reduced(PAGE, "structural")
+    assert "<div" not in html and "class=" not in html
+    assert '<form action="/login/" method="post">' in html
+    assert '<label for="id_username">Username</label>' in html
+    assert '<input id="id_username" name="username" type="text">' in html
+    assert "<title>Sign in</title>" in html
+
+
+def test_structural_level_drops_repeated_links():
+    assert reduced(PAGE, "structural").count('<a href="/">Home</a>') == 1
+
+
+@pytest.mark.parametrize("html, expected", [
+    ("<h1>Welcome <small>there</small></h1>", "<h1>Welcome there</h1>"),
+    ("<h1>Welcome<small> there</small>!</h1>", "<h1>Welcome there!</h1>"),
+    ('<a href="/a">Go <b>home</b></a>', '<a href="/a">Go home</a>'),
+    ("<button>Save<span>now</span></button>", "<button>Savenow</button>"),
+    ("<label>\n   Name\n</label>", "<label>Name</label>"),
+])
+def test_structural_level_keeps_word_boundaries_across_inline_tags(html, expected):
+    assert reduced(html, "structural") == expected
+
+
+@pytest.mark.parametrize("html, expected", [
+    ("<body><svg><g></g><form action=/x><input name=q></form></body>", '<form action="/x"><input name="q"></form>'),
+    ('<body><div><svg><g></div><a href="/x">X</a></body>', '<a href="/x">X</a>'),
+    ('<body><svg><a href="/in-svg"><title>t</title></a></svg><a href="/y">Y</a></body>', '<a href="/y">Y</a>'),
+    ('<body><div><noscript><p>no end</div><a href="/z">Z</a></body>', '<a href="/z">Z</a>'),
+    ('<body><svg><path d="M0"/><g><text>hi</text></g></svg><h1>Title</h1></body>', "<h1>Title</h1>"),
+])
+def test_unclosed_dropped_subtrees_do_not_swallow_the_page(html, expected):
+    assert reduced(html, "structural") == expected
+
+
+def test_chunked_feeding_matches_single_feed():
+    reducer = HtmlReducer("structural")
+    for start in range(0, len(PAGE), 7):
+        reducer.feed(PAGE[start:start + 7])
+    assert reducer.close() == reduced(PAGE, "structural")
+
+
+def test_stats_report_sizes():
+    html, stats = reduce_html(PAGE, level="structural")
+    assert stats == {"before": len(PAGE), "after": len(html)}
+
+
+def test_unknown_level_is_rejected():
+    with pytest.raises(ValueError):
+        HtmlReducer("aggressive")
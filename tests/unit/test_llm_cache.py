@@ -0,0 +1,64 @@
+import itertools
+import types
+
+import pytest
+
+from core import llm_cache
+from core.llm_cache import LLMCache, make_cache_key
+
+
+class FakeModel:
+    def __init__(self, model_name="gpt-4o-mini", temperature=0):
+        self.model_name = model_name
+        self.temperature = temperature
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A strictly increasing clock, so LRU order never depends on timer resolution.
+    ticks = itertools.count(1)
+    monkeypatch.setattr(llm_cache, "time", types.SimpleNamespace(time=lambda: next(ticks)))
+
+
+def test_cache_key_is_stable_and_ignores_variable_order():
+    llm = FakeModel()
+    first = make_cache_key("prompt", {"a": 1, "input": "x"}, llm)
+    assert first == make_cache_key("prompt", {"input": "x", "a": 1}, llm)
+
+
+@pytest.mark.parametrize("changed", [
+    dict(prompt="other prompt"),
+    dict(variables={"input": "y"}),
+    dict(llm=FakeModel(model_name="gpt-4.1-nano")),
+    dict(llm=FakeModel(temperature=0.7)),
+    dict(namespace="stream"),
+])
+def test_cache_key_covers_every_input(changed):
+    call = dict(prompt="prompt", variables={"input": "x"}, llm=FakeModel())
+    assert make_cache_key(**call) != make_cache_key(**dict(call, **changed))
+
+
+def test_get_and_set_count_hits_and_misses(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+    assert cache.get("k") is None
+    cache.set("k", "value")
+    assert cache.get("k") == "value"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1, "bytes": 5}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_bytes=10)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    cache.get("a")
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    LLMCache(path).set("k", "value")
+    assert LLMCache(path).get("k") == "value"
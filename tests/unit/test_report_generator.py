@@ -0,0 +1,33 @@
+from core.artifact_store import ArtifactStore
+from core.report_generator import generate_template_reports
+
+
+def route_result(page):
+    return {
+        "page": page, "path": f"/{page}/", "status": "passed", "exit_code": 0, "duration": 1.0,
+        "test_file": f"tests/selenium/test_{page}.py", "assertions": [], "inputs": [], "errors": [], "output_tail": "",
+        "screenshots": {phase: {"path": f"screenshots/{phase}_{page}.png", "exists": False} for phase in ("before", "after")},
+    }
+
+
+def test_failed_background_write_fails_only_its_page(tmp_path):
+    # A directory where the report file should go makes that one write fail.
+    (tmp_path / "reports" / "final_report_broken.md").mkdir(parents=True)
+    store = ArtifactStore()
+    try:
+        results = generate_template_reports(
+            [route_result("home"), route_result("broken")], "", str(tmp_path), store=store, html=False,
+        )
+    finally:
+        store.close()
+
+    assert results["home"] == {"path": str(tmp_path / "reports" / "final_report_home.md"), "error": None}
+    assert (tmp_path / "reports" / "final_report_home.md").read_text().startswith("# Final QA Report for home Page")
+    assert results["broken"]["path"] is None
+    assert results["broken"]["error"].startswith("Could not write report:")
+
+
+def test_reports_without_a_test_are_reported_missing(tmp_path):
+    missing = dict(route_result("about"), test_file=None)
+    results = generate_template_reports([missing], "", str(tmp_path), html=False)
+    assert results["about"] == {"path": None, "error": "Missing file: no generated test for about"}
@@ -0,0 +1,80 @@
+import pytest
+
+from core.route_crawler import crawl_routes, normalize_url
+
+BASE = "http://localhost:8000/polls/"
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("/accounts/login/", "/accounts/login/"),
+    ("detail/", "/polls/detail/"),
+    ("../about", "/about"),
+    ("http://localhost:8000//a//b/./c/../d/", "/a/b/d/"),
+    ("/search/?q=x#results", "/search/"),
+    ("HTTP://LOCALHOST:8000/Case/", "/Case/"),
+    ("http://localhost:8000", "/"),
+])
+def test_same_origin_links_are_canonical_paths(url, expected):
+    assert normalize_url(url, BASE) == expected
+
+
+@pytest.mark.parametrize("url", [
+    "", "   ", "#top", "mailto:a@example.com", "tel:123", "javascript:void(0)",
+    "https://example.com/polls/", "http://localhost:9000/polls/", "ftp://localhost:8000/file",
+    "/static/site.css", "/media/logo.PNG",
+])
+def test_other_origins_schemes_and_assets_are_skipped(url):
+    assert normalize_url(url, BASE) is None
+
+
+class StubFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    def prefetch(self, urls):
+        list(urls)
+
+    def fetch(self, url):
+        self.fetched.append(url)
+        return self.pages.get(url)
+
+
+def site(pages):
+    return StubFetcher({f"http://localhost:8000{path}": html for path, html in pages.items()})
+
+
+def test_crawl_follows_links_and_form_actions():
+    fetcher = site({
+        "/": '<a href="/polls/">Polls</a><form action="/search/" method="get"><input name="q"></form><form><input></form>',
+        "/polls/": '<a href="/">Home</a><a href="/polls/1/">First</a>',
+        "/polls/1/": "",
+        "/search/": "",
+    })
+    result = crawl_routes("http://localhost:8000", fetcher)
+    assert result["routes"] == [("home", "/"), ("polls", "/polls/"), ("search", "/search/"), ("polls_1", "/polls/1/")]
+    assert result["pages_visited"] == 4
+
+
+def test_crawl_never_fetches_denied_paths():
+    fetcher = site({
+        "/": '<a href="/accounts/logout/">Log out</a><a href="/admin/">Admin</a><a href="/polls/3/delete/">Delete</a>'
+             '<form action="/accounts/sign-out/" method="post"></form><a href="/administration-guide/">Guide</a>',
+        "/administration-guide/": "",
+    })
+    result = crawl_routes("http://localhost:8000", fetcher, seed_paths=["/accounts/logout/", "/polls/"])
+    assert [path for _, path in result["routes"]] == ["/", "/administration-guide/"]
+    assert set(result["denied"]) == {"/accounts/logout/", "/admin/", "/polls/3/delete/", "/accounts/sign-out/"}
+    assert not any("logout" in url or "delete" in url or url.endswith("/admin/") for url in fetcher.fetched)
+
+
+def test_empty_deny_pattern_follows_everything():
+    fetcher = site({"/": '<a href="/logout/">Log out</a>', "/logout/": ""})
+    result = crawl_routes("http://localhost:8000", fetcher, deny_pattern="")
+    assert [path for _, path in result["routes"]] == ["/", "/logout/"]
+
+
+def test_denied_paths_do_not_use_up_the_page_budget():
+    fetcher = site({"/": '<a href="/logout/">x</a><a href="/about/">About</a>', "/about/": ""})
+    result = crawl_routes("http://localhost:8000", fetcher, max_pages=2)
+    assert [path for _, path in result["routes"]] == ["/", "/about/"]
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from core.route_manifest import RouteManifest, page_fingerprint
+
+PAGE = "<form><input name='q'><button>Go</button></form>"
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    script = tmp_path / "test_home.py"
+    script.write_text("print('test')\n")
+    manifest = RouteManifest(str(tmp_path / "manifest.json"))
+    manifest.record_generation(
+        "home", "/", page_fingerprint(PAGE), "prompt", str(script), {}, model="gpt-4o-mini", reduction_level="structural",
+    )
+    return manifest
+
+
+def reuse(manifest, **overrides):
+    args = dict(page_name="home", path="/", page_hash=page_fingerprint(PAGE), prompt="prompt",
+                model="gpt-4o-mini", reduction_level="structural")
+    args.update(overrides)
+    return manifest.reusable_script(**args)
+
+
+def test_unchanged_route_reuses_its_script(manifest):
+    assert reuse(manifest)["path"] == "/"
+
+
+@pytest.mark.parametrize("overrides", [
+    dict(page_name="about"),
+    dict(path="/home/"),
+    dict(page_hash=page_fingerprint(PAGE + "<a href='/new/'>New</a>")),
+    dict(prompt="a different prompt"),
+    dict(model="gpt-4.1-nano"),
+    dict(reduction_level="light"),
+])
+def test_any_generation_input_change_invalidates_the_script(manifest, overrides):
+    assert reuse(manifest, **overrides) is None
+
+
+def test_edited_or_deleted_script_is_not_reused(manifest):
+    script = manifest.routes["home"]["script"]
+    with open(script, "a") as f:
+        f.write("# edited\n")
+    assert reuse(manifest) is None
+    os.remove(script)
+    assert reuse(manifest) is None
+
+
+def test_manifest_is_reloaded_from_disk(manifest):
+    assert reuse(RouteManifest(manifest.path)) is not None
+
+
+def test_fingerprint_ignores_formatting_and_csrf_tokens():
+    token_a = "<form><input type='hidden' name='csrfmiddlewaretoken' value='a'><input name='q'></form>"
+    token_b = "<form>\n  <input type='hidden' name='csrfmiddlewaretoken' value='b'>\n  <input name='q'>\n</form>"
+    assert page_fingerprint(token_a) == page_fingerprint(token_b)
+    assert page_fingerprint(token_a) != page_fingerprint(token_a.replace("name='q'", "name='email'"))
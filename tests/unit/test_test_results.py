@@ -0,0 +1,128 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from core.test_results import build_route_result, parse_test_code, parse_test_output, summarize_results, to_junit_xml
+
+TEST_CODE = '''from selenium.webdriver.support.ui import Select
+
+def main(driver):
+    driver.find_element("name", "email").send_keys("user@example.com")
+    Select(driver.find_element("name", "plan")).select_by_visible_text("Pro")
+    assert "Welcome" in driver.title
+    assert driver.find_element("id", "ok")
+'''
+
+TRACEBACK = '''Traceback (most recent call last):
+  File "/work/tests/test_login.py", line 30, in <module>
+    main(driver)
+  File "/work/tests/test_login.py", line 6, in main
+    assert "Welcome" in driver.title
+AssertionError: page has no welcome
+[ERROR] page has no welcome
+'''
+
+
+def test_test_code_assertions_and_inputs():
+    parsed = parse_test_code(TEST_CODE)
+    assert parsed["assertions"] == [
+        {"line": 6, "expression": '"Welcome" in driver.title'},
+        {"line": 7, "expression": 'driver.find_element("id", "ok")'},
+    ]
+    assert parsed["inputs"] == [
+        {"line": 4, "method": "send_keys", "value": "user@example.com"},
+        {"line": 5, "method": "select_by_visible_text", "value": "Pro"},
+    ]
+
+
+def test_unparsable_code_has_no_assertions_or_inputs():
+    assert parse_test_code("def broken(:") == {"assertions": [], "inputs": []}
+
+
+def test_traceback_gives_error_and_failed_line_without_duplicating_runner_error():
+    parsed = parse_test_output(TRACEBACK, "/other/checkout/test_login.py")
+    assert parsed == {"errors": [{"type": "AssertionError", "message": "page has no welcome"}], "failed_line": 6}
+
+
+def test_runner_errors_and_qualified_exceptions():
+    output = (
+        "[ERROR] Test exceeded 120s timeout\n"
+        "Traceback (most recent call last):\n"
+        '  File "x.py", line 1, in <module>\n'
+        "selenium.common.exceptions.NoSuchElementException: Message: no such element\n"
+    )
+    assert parse_test_output(output)["errors"] == [
+        {"type": "RunnerError", "message": "Test exceeded 120s timeout"},
+        {"type": "NoSuchElementException", "message": "Message: no such element"},
+    ]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    paths = {name: str(tmp_path / name) for name in ("tests_dir", "testcase_output_dir", "screenshots_dir")}
+    for directory in paths.values():
+        (tmp_path / directory).mkdir()
+    return paths
+
+
+def write_run(paths, page, code, output):
+    with open(f"{paths['tests_dir']}/test_{page}.py", "w") as f:
+        f.write(code)
+    with open(f"{paths['testcase_output_dir']}/output_test_{page}.txt", "w") as f:
+        f.write(output)
+
+
+def test_failed_route_marks_the_failing_assertion(paths):
+    write_run(paths, "login", TEST_CODE, TRACEBACK)
+    with open(f"{paths['screenshots_dir']}/before_login.png", "wb") as f:
+        f.write(b"png")
+    result = build_route_result("login", "/login/", {"exit_code": 1, "duration": 2.5}, paths)
+    assert result["status"] == "failed"
+    assert [a["outcome"] for a in result["assertions"]] == ["failed", "unknown"]
+    assert result["screenshots"]["before"]["exists"] and not result["screenshots"]["after"]["exists"]
+    assert result["output_tail"] == TRACEBACK
+
+
+@pytest.mark.parametrize("test_result, route_error, output, status", [
+    ({"exit_code": 0, "duration": 1.0}, None, "", "passed"),
+    ({"exit_code": None, "timed_out": True}, None, "[ERROR] Test exceeded 120s timeout\n", "timeout"),
+    ({"exit_code": -9, "memory_exceeded": True}, None, "", "error"),
+    ({"exit_code": 1}, None, "Traceback (most recent call last):\nValueError: bad\n", "error"),
+    (None, None, "", "not_run"),
+    (None, "script failed validation", "", "error"),
+])
+def test_route_status(paths, test_result, route_error, output, status):
+    write_run(paths, "home", TEST_CODE, output)
+    result = build_route_result("home", "/", test_result, paths, route_error=route_error)
+    assert result["status"] == status
+    if route_error:
+        assert result["errors"][0] == {"type": "GenerationError", "message": route_error}
+
+
+def route(page, status, duration=1.0, errors=(), output_tail=""):
+    return {
+        "page": page, "path": f"/{page}/", "status": status, "exit_code": 0 if status == "passed" else 1,
+        "duration": duration, "test_file": f"tests/test_{page}.py", "errors": list(errors), "output_tail": output_tail,
+    }
+
+
+def test_junit_xml_counts_and_elements():
+    results = [
+        route("home", "passed"),
+        route("login", "failed", errors=[{"type": "AssertionError", "message": "no form"}], output_tail="trace"),
+        route("search", "timeout", duration=120.0),
+        route("about", "not_run", duration=None),
+    ]
+    assert summarize_results(results)["duration"] == 122.0
+
+    suite = ET.fromstring(to_junit_xml(results)).find("testsuite")
+    assert {key: suite.get(key) for key in ("tests", "failures", "errors", "skipped")} == {
+        "tests": "4", "failures": "1", "errors": "1", "skipped": "1",
+    }
+    cases = {case.get("classname"): case for case in suite.findall("testcase")}
+    failure = cases["selenium.login"].find("failure")
+    assert (failure.get("type"), failure.get("message"), failure.text) == ("AssertionError", "no form", "trace")
+    assert cases["selenium.login"].find("system-out").text == "trace"
+    assert cases["selenium.search"].find("error").get("message") == "Test timeout (exit code 1)"
+    assert cases["selenium.about"].find("skipped") is not None
+    assert list(cases["selenium.home"]) == []
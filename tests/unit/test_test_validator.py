@@ -0,0 +1,85 @@
+import pytest
+
+from core.test_validator import validate_test_script
+
+STANDALONE = '''import os
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+
+def main():
+    driver = webdriver.Chrome(options=Options())
+    try:
+        driver.get(os.environ.get("SANDBOX_BASE_URL", "http://localhost:8000") + "/login/")
+        driver.save_screenshot("screenshots/before_login.png")
+        driver.save_screenshot(f"screenshots/after_{'login'}.png")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+HARNESS = '''import os
+
+from selenium.webdriver.common.by import By
+
+
+def run_test(driver, base_url, screenshots_dir):
+    driver.get(base_url + "/login/")
+    driver.save_screenshot(os.path.join(screenshots_dir, "before_login.png"))
+    driver.find_element(By.NAME, "username").send_keys("alice")
+    driver.save_screenshot(os.path.join(screenshots_dir, "after_login.png"))
+'''
+
+
+def test_valid_standalone_script_passes():
+    assert validate_test_script(STANDALONE, "login") == []
+
+
+def test_valid_harness_module_passes():
+    assert validate_test_script(HARNESS, "login", harness=True) == []
+
+
+def test_syntax_error_is_reported_alone():
+    problems = validate_test_script("def broken(:\n    pass\n", "login")
+    assert len(problems) == 1
+    assert problems[0].startswith("SyntaxError on line 1")
+
+
+def test_third_party_and_relative_imports_are_rejected():
+    code = "import requests\nfrom .helpers import x\n" + STANDALONE
+    problems = validate_test_script(code, "login")
+    assert any("import of 'requests' is not allowed" in p for p in problems)
+    assert any("relative import" in p for p in problems)
+
+
+def test_missing_screenshots_are_reported():
+    code = STANDALONE.replace('        driver.save_screenshot(f"screenshots/after_{\'login\'}.png")\n', "")
+    problems = validate_test_script(code, "login")
+    assert problems == ["Screenshot path screenshots/after_login.png is missing"]
+
+
+def test_standalone_script_must_quit_in_finally():
+    code = STANDALONE.replace("    finally:\n        driver.quit()\n", "    finally:\n        pass\n    driver.quit()\n")
+    assert validate_test_script(code, "login") == ["driver.quit() is not called in a finally block"]
+
+
+def test_harness_module_must_not_own_the_browser():
+    code = "from selenium import webdriver\n" + HARNESS + "    driver = webdriver.Chrome()\n    driver.quit()\n"
+    problems = validate_test_script(code, "login", harness=True)
+    assert any("must not call driver.quit()" in p for p in problems)
+    assert any("must not create a WebDriver" in p for p in problems)
+
+
+@pytest.mark.parametrize("signature", ["def run(driver, base_url, screenshots_dir):", "def run_test(driver, base_url):"])
+def test_harness_module_needs_run_test_entry_point(signature):
+    code = HARNESS.replace("def run_test(driver, base_url, screenshots_dir):", signature)
+    problems = validate_test_script(code, "login", harness=True)
+    assert "Missing module-level entry point `def run_test(driver, base_url, screenshots_dir):`" in problems
+
+
+def test_allowed_imports_can_be_extended():
+    code = "import requests\n" + STANDALONE
+    assert validate_test_script(code, "login", allowed_imports={"selenium", "requests"}) == []
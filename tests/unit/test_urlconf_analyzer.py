@@ -0,0 +1,142 @@
+import textwrap
+
+from core.urlconf_analyzer import UrlconfAnalyzer, extract_static_routes, route_page_name
+
+
+def write(root, relative_path, source):
+    path = root / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(textwrap.dedent(source))
+
+
+def make_project(root):
+    write(root, "manage.py", "")
+    write(root, "mysite/__init__.py", "")
+    write(root, "mysite/settings.py", 'ROOT_URLCONF = "mysite.urls"\n')
+    write(root, "mysite/urls.py", '''
+        from django.contrib import admin
+        from django.urls import include, path, re_path
+
+        from pages import views
+
+        extra_patterns = [
+            path("reports/", views.reports, name="reports"),
+        ]
+
+        urlpatterns = [
+            path("", views.home, name="home"),
+            path("admin/", admin.site.urls),
+            path("polls/", include("polls.urls")),
+            path("accounts/", include(("accounts.urls", "accounts"))),
+            path("shop/", include("shop.urls", namespace="store")),
+            path("extra/", include(extra_patterns)),
+            re_path(r"^about/$", views.about, name="about"),
+            re_path(r"^archive/(?P<year>[0-9]{4})/$", views.archive, name="archive"),
+            path("thirdparty/", include("allauth.urls")),
+        ]
+        urlpatterns += [path("contact/", views.ContactView.as_view(), name="contact")]
+    ''')
+    write(root, "polls/__init__.py", "")
+    write(root, "polls/urls.py", '''
+        from django.urls import path
+        from . import views
+
+        app_name = "polls"
+        urlpatterns = [
+            path("", views.index, name="index"),
+            path("<int:pk>/", views.detail, name="detail"),
+        ]
+    ''')
+    write(root, "accounts/__init__.py", "")
+    write(root, "accounts/urls.py", '''
+        from django.urls import path
+        from . import views
+
+        urlpatterns = [path("login/", views.login, name="login")]
+    ''')
+    write(root, "shop/__init__.py", "")
+    write(root, "shop/urls.py", '''
+        from django.urls import path
+        from . import views
+
+        app_name = "shop"
+        urlpatterns = [path("cart/", views.cart, name="cart")]
+    ''')
+
+
+def by_route(table):
+    return {entry["route"]: entry for entry in table}
+
+
+def test_routes_are_collected_across_includes(tmp_path):
+    make_project(tmp_path)
+    table = by_route(UrlconfAnalyzer(str(tmp_path)).analyze())
+    assert set(table) == {
+        "/", "/polls/", "/polls/<int:pk>/", "/accounts/login/", "/shop/cart/",
+        "/extra/reports/", "/about/", "/archive/(?P<year>[0-9]{4})/", "/contact/",
+    }
+    assert table["/"]["view"] == "views.home"
+    assert table["/contact/"]["view"] == "views.ContactView.as_view()"
+    assert table["/polls/"]["module"] == "polls.urls"
+
+
+def test_namespaces_come_from_app_name_tuples_and_include_keywords(tmp_path):
+    make_project(tmp_path)
+    table = by_route(UrlconfAnalyzer(str(tmp_path)).analyze())
+    assert table["/polls/"]["name"] == "polls:index"
+    assert table["/accounts/login/"]["name"] == "accounts:login"
+    # An explicit include(namespace=...) wins over the module's app_name.
+    assert table["/shop/cart/"]["name"] == "store:cart"
+    assert table["/"]["name"] == "home"
+
+
+def test_regex_routes_and_parameters(tmp_path):
+    make_project(tmp_path)
+    table = by_route(UrlconfAnalyzer(str(tmp_path)).analyze())
+    assert table["/about/"]["is_regex"] and not table["/about/"]["has_params"]
+    assert table["/archive/(?P<year>[0-9]{4})/"]["has_params"]
+    assert table["/polls/<int:pk>/"]["has_params"]
+    assert not table["/polls/"]["has_params"]
+
+
+def test_admin_and_third_party_includes_are_reported_unresolved(tmp_path):
+    make_project(tmp_path)
+    analyzer = UrlconfAnalyzer(str(tmp_path))
+    analyzer.analyze()
+    assert {"prefix": "admin/", "module": "admin.site.urls"} in analyzer.unresolved_includes
+    assert {"prefix": "thirdparty/", "module": "allauth.urls"} in analyzer.unresolved_includes
+
+
+def test_static_routes_skip_parameters_and_get_unique_names(tmp_path):
+    make_project(tmp_path)
+    result = extract_static_routes(str(tmp_path))
+    routes = dict(result["routes"])
+    assert routes["home"] == "/"
+    assert routes["index"] == "/polls/"
+    assert routes["login"] == "/accounts/login/"
+    assert "/polls/<int:pk>/" not in routes.values()
+    assert len(result["url_table"]) == 9
+
+
+def test_page_names_are_deduplicated():
+    taken = set()
+    assert route_page_name({"name": "polls:index", "route": "/polls/"}, taken) == "index"
+    assert route_page_name({"name": "shop:index", "route": "/shop/"}, taken) == "index_2"
+    assert route_page_name({"name": None, "route": "/about-us/"}, taken) == "about_us"
+    assert route_page_name({"name": None, "route": "/"}, taken) == "home"
+
+
+def test_missing_root_urlconf_gives_empty_table(tmp_path):
+    write(tmp_path, "manage.py", "")
+    assert UrlconfAnalyzer(str(tmp_path)).analyze() == []
+
+
+def test_circular_includes_terminate(tmp_path):
+    write(tmp_path, "manage.py", "")
+    write(tmp_path, "loop/__init__.py", "")
+    write(tmp_path, "loop/urls.py", '''
+        from django.urls import include, path
+        urlpatterns = [path("again/", include("loop.urls")), path("x/", view, name="x")]
+    ''')
+    table = UrlconfAnalyzer(str(tmp_path)).analyze("loop.urls")
+    assert [entry["route"] for entry in table] == ["/x/"]